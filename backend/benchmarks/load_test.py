@@ -0,0 +1,377 @@
+#!/usr/bin/env python
+"""
+End-to-end load test of the GraphQL API.
+
+Drives the real ASGI app in-process through httpx against the PostgreSQL
+database at ``DATABASE_URL`` (use a disposable one: the script creates the
+tables, seeds users, clients and appointments under a per-run prefix and
+deletes them again at the end). Scenarios:
+
+* ``login``: password login of random seeded users
+* ``create_appointment``: concurrent bookings aimed at a handful of slots;
+  reports accepted bookings, rejected conflicts and double bookings (slots
+  that ended up with overlapping appointments)
+* ``list_appointments``: first page of a user's appointments
+* ``search_clients``: admin phone search over clients with ``totalCount``
+
+Each scenario reports throughput, p50/p95/p99 latency and SQL statements per
+operation. Results are compared with ``benchmarks/baselines/load_test.json``:
+a p95, throughput or statement count per operation worse than the
+tolerance is a regression and the script exits non-zero. Statement counts
+get the tolerance too: ``create_appointment`` mixes accepted bookings and
+cheaper rejected conflicts, and their share varies between runs. The
+baseline records the machine it was measured on (``machine``); timings only
+compare on the same hardware, statement counts compare anywhere.
+
+Usage:
+    python benchmarks/load_test.py [--requests N] [--concurrency N]
+        [--scenario NAME ...] [--tolerance 0.2] [--update-baseline]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Dict, List
+
+# Add the parent directory to the path so we can import from src
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The load would otherwise trip the per-client limiter of a single test client
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx
+from nanoid import generate
+from sqlalchemy import delete, event, select, text
+
+from src.main.auth import get_password_hash
+from src.main.database import async_session, engine
+from src.main.models import (
+    Appointment, AppointmentStatus, Base, Client, ServiceType, User, appointment_attendees
+)
+from src.main.server import app
+
+BASELINE_FILE = Path(__file__).parent / "baselines" / "load_test.json"
+PASSWORD = "bench-password"
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+logger = logging.getLogger(__name__)
+for noisy in ("httpx", "src.main"):
+    logging.getLogger(noisy).setLevel(logging.WARNING)
+
+LOGIN = """
+mutation Login($username: String!, $password: String!) {
+  auth {
+    login(username: $username, password: $password) {
+      __typename
+      ... on LoginSuccess { token }
+    }
+  }
+}
+"""
+
+CREATE_APPOINTMENT = """
+mutation Book($input: AppointmentInput!) {
+  appointments {
+    createAppointment(input: $input) { success errors { message } }
+  }
+}
+"""
+
+LIST_APPOINTMENTS = """
+query MyAppointments {
+  appointments(first: 20) {
+    edges { node { id title startTime status attendees { id username } } }
+    pageInfo { hasNextPage endCursor }
+  }
+}
+"""
+
+SEARCH_CLIENTS = """
+query SearchClients($search: String!) {
+  clients(first: 20, filter: {search: $search}) {
+    totalCount
+    edges { node { id phone service status } }
+  }
+}
+"""
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Load test the GraphQL API")
+    parser.add_argument("--requests", type=int, default=200, help="Operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="Operations in flight")
+    parser.add_argument("--users", type=int, default=50, help="Seeded users (each with a client)")
+    parser.add_argument("--appointments", type=int, default=500, help="Seeded appointments")
+    parser.add_argument("--slots", type=int, default=5, help="Slots contended by create_appointment")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Record results as the new baseline")
+    return parser.parse_args()
+
+@dataclass
+class ScenarioResult:
+    """Measurements of one scenario."""
+    operations: int
+    seconds: float
+    latencies_ms: List[float] = field(repr=False)
+    statements: int
+    outcomes: Dict[str, int]
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.seconds
+
+    def percentile(self, p: int) -> float:
+        return statistics.quantiles(self.latencies_ms, n=100, method="inclusive")[p - 1]
+
+    def summary(self) -> dict:
+        return {
+            "throughput": round(self.throughput, 1),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "sql_per_op": round(self.statements / self.operations, 2),
+        }
+
+class StatementCounter:
+    """Counts SQL statements sent by the app's engine."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+class LoadTest:
+    """Seeded data and an HTTP client for one run."""
+
+    def __init__(self, args):
+        self.args = args
+        self.prefix = f"bench_{generate(size=6).lower().replace('-', '_')}"
+        self.users: List[str] = []
+        self.admin = f"{self.prefix}_admin"
+        self.tokens: Dict[str, str] = {}
+        # Far from seeded data so only the contended bookings can overlap
+        self.slot_base = datetime(2099, 1, 1, 9, tzinfo=UTC) + timedelta(days=random.randrange(3650))
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        self.statements = StatementCounter()
+
+    async def graphql(self, query: str, variables: dict = None, user: str = None) -> dict:
+        headers = {"Authorization": f"Bearer {self.tokens[user]}"} if user else {}
+        response = await self.client.post("/graphql/", json={"query": query, "variables": variables or {}}, headers=headers)
+        response.raise_for_status()
+        return response.json()
+
+    async def setup(self) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE SEQUENCE IF NOT EXISTS user_sequential_id_seq"))
+            await conn.run_sync(Base.metadata.create_all)
+
+        # One hash for everyone: seeding should not measure bcrypt
+        password = get_password_hash(PASSWORD)
+        services = list(ServiceType)
+        async with async_session() as session:
+            async with session.begin():
+                users = [
+                    User(username=self.admin, email=f"{self.admin}@example.com", password=password, is_admin=True)
+                ]
+                for i in range(self.args.users):
+                    username = f"{self.prefix}_user{i}"
+                    self.users.append(username)
+                    users.append(User(username=username, email=f"{username}@example.com", password=password))
+                session.add_all(users)
+                await session.flush()
+
+                session.add_all(
+                    Client(phone=f"+1555{random.randrange(10**7):07d}", service=random.choice(services), user_id=user.id)
+                    for user in users[1:]
+                )
+                start = datetime(2020, 1, 1, 8, tzinfo=UTC) + timedelta(days=random.randrange(3650))
+                for i in range(self.args.appointments):
+                    creator, attendee = random.sample(users[1:], 2)
+                    appointment = Appointment(
+                        title=f"{self.prefix} seeded {i}",
+                        startTime=start + timedelta(minutes=30 * i),
+                        durationMinutes=30,
+                        serviceType=random.choice(services),
+                        creatorId=creator.id,
+                        status=AppointmentStatus.SCHEDULED
+                    )
+                    appointment.attendees.append(attendee)
+                    session.add(appointment)
+
+        for username in [self.admin, *self.users]:
+            result = await self.graphql(LOGIN, {"username": username, "password": PASSWORD})
+            self.tokens[username] = result["data"]["auth"]["login"]["token"]
+        logger.info(f"Seeded {len(self.users)} users, clients and {self.args.appointments} appointments as {self.prefix}")
+
+    async def teardown(self) -> None:
+        await self.client.aclose()
+        async with async_session() as session:
+            async with session.begin():
+                user_ids = select(User.id).where(User.username.startswith(self.prefix))
+                appointment_ids = select(Appointment.id).where(Appointment.creatorId.in_(user_ids))
+                await session.execute(
+                    delete(appointment_attendees).where(appointment_attendees.c.appointment_id.in_(appointment_ids))
+                )
+                await session.execute(delete(Appointment).where(Appointment.creatorId.in_(user_ids)))
+                await session.execute(delete(Client).where(Client.user_id.in_(user_ids)))
+                await session.execute(delete(User).where(User.username.startswith(self.prefix)))
+        await engine.dispose()
+
+    async def double_bookings(self) -> int:
+        """Contended slots that hold more than one live appointment."""
+        async with async_session() as session:
+            return await session.scalar(text("""
+                SELECT COUNT(DISTINCT a.start_time) FROM appointments a
+                JOIN appointments b ON a.id < b.id
+                    AND a.start_time < b.end_time AND b.start_time < a.end_time
+                WHERE a.start_time >= :since AND b.start_time >= :since
+                    AND a.status != :cancelled AND b.status != :cancelled
+            """), {"since": self.slot_base, "cancelled": AppointmentStatus.CANCELLED.value})
+
+    async def run(self, name: str) -> ScenarioResult:
+        scenario = SCENARIOS[name]
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        latencies = []
+        outcomes = Counter()
+
+        async def one(i: int):
+            async with semaphore:
+                started = time.perf_counter()
+                outcomes[await scenario(self, i)] += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        statements_before = self.statements.count
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(self.args.requests)))
+        seconds = time.perf_counter() - started
+        if name == "create_appointment":
+            outcomes["double_booked_slots"] = await self.double_bookings()
+        return ScenarioResult(
+            operations=self.args.requests,
+            seconds=seconds,
+            latencies_ms=latencies,
+            statements=self.statements.count - statements_before,
+            outcomes=dict(outcomes)
+        )
+
+async def login(test: LoadTest, i: int) -> str:
+    result = await test.graphql(LOGIN, {"username": random.choice(test.users), "password": PASSWORD})
+    return "ok" if result["data"]["auth"]["login"]["__typename"] == "LoginSuccess" else "failed"
+
+async def create_appointment(test: LoadTest, i: int) -> str:
+    slot = test.slot_base + timedelta(hours=i % test.args.slots)
+    variables = {"input": {
+        "title": f"{test.prefix} contended {i}",
+        "startTime": slot.isoformat(),
+        "durationMinutes": 60,
+        "serviceType": ServiceType.HAIRCUT.value,
+    }}
+    result = await test.graphql(CREATE_APPOINTMENT, variables, user=random.choice(test.users))
+    return "booked" if result["data"]["appointments"]["createAppointment"]["success"] else "conflict"
+
+async def list_appointments(test: LoadTest, i: int) -> str:
+    result = await test.graphql(LIST_APPOINTMENTS, user=random.choice(test.users))
+    return "ok" if not result.get("errors") else "error"
+
+async def search_clients(test: LoadTest, i: int) -> str:
+    result = await test.graphql(SEARCH_CLIENTS, {"search": f"{random.randrange(100):02d}"}, user=test.admin)
+    return "ok" if not result.get("errors") else "error"
+
+SCENARIOS = {
+    "login": login,
+    "create_appointment": create_appointment,
+    "list_appointments": list_appointments,
+    "search_clients": search_clients,
+}
+
+async def machine_info() -> dict:
+    """Hardware and software the results were measured on, stored with the baseline."""
+    processor = platform.processor()
+    cpuinfo = Path("/proc/cpuinfo")
+    if cpuinfo.exists():
+        models = [line.split(":", 1)[1].strip() for line in cpuinfo.read_text().splitlines() if line.startswith("model name")]
+        processor = models[0] if models else processor
+    async with engine.connect() as conn:
+        postgres = await conn.scalar(text("SHOW server_version"))
+    return {
+        "system": f"{platform.system()} {platform.release()}",
+        "processor": processor,
+        "cpu_count": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "postgres": postgres,
+    }
+
+def regressions(name: str, current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Human readable regressions of ``current`` against ``baseline``."""
+    found = []
+    if current["p95_ms"] > baseline["p95_ms"] * (1 + tolerance):
+        found.append(f"{name}: p95 {baseline['p95_ms']} -> {current['p95_ms']} ms")
+    if current["throughput"] < baseline["throughput"] * (1 - tolerance):
+        found.append(f"{name}: throughput {baseline['throughput']} -> {current['throughput']} ops/s")
+    if current["sql_per_op"] > baseline["sql_per_op"] * (1 + tolerance):
+        found.append(f"{name}: SQL statements per op {baseline['sql_per_op']} -> {current['sql_per_op']}")
+    return found
+
+async def main(args) -> int:
+    """Run the scenarios and compare them with the baseline; returns the exit code."""
+    test = LoadTest(args)
+    results = {}
+    try:
+        await test.setup()
+        machine = await machine_info()
+        for name in args.scenario or SCENARIOS:
+            result = await test.run(name)
+            results[name] = result.summary()
+            stats = results[name]
+            logger.info(
+                f"{name:<20} {stats['throughput']:>8.1f} ops/s  p50 {stats['p50_ms']:>7.1f}  "
+                f"p95 {stats['p95_ms']:>7.1f}  p99 {stats['p99_ms']:>7.1f} ms  "
+                f"{stats['sql_per_op']:>5.1f} SQL/op  {result.outcomes}"
+            )
+            if result.outcomes.get("double_booked_slots"):
+                logger.warning(f"❌ {result.outcomes['double_booked_slots']} slots were double booked")
+    finally:
+        await test.teardown()
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    if args.update_baseline:
+        BASELINE_FILE.parent.mkdir(exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps({**baseline, **results, "machine": machine}, indent=2, sort_keys=True) + "\n")
+        logger.info(f"✅ Baseline written to {BASELINE_FILE}")
+        return 0
+    if not baseline:
+        logger.info("No baseline recorded yet, run with --update-baseline")
+        return 0
+    if baseline.get("machine") != machine:
+        logger.warning(f"Baseline was recorded on {baseline.get('machine')}, timings may not be comparable")
+
+    found = [
+        regression
+        for name, stats in results.items() if name in baseline
+        for regression in regressions(name, stats, baseline[name], args.tolerance)
+    ]
+    for regression in found:
+        logger.error(f"❌ {regression}")
+    if not found:
+        logger.info(f"✅ No regressions beyond {args.tolerance:.0%} of the baseline")
+    return 1 if found else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
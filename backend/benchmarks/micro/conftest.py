@@ -0,0 +1,91 @@
+"""
+Micro-benchmarks of per-row and per-request hot paths.
+
+Run with pytest-benchmark from the backend directory:
+
+    pytest benchmarks/micro                                  # measure
+    pytest benchmarks/micro --benchmark-save=baseline        # record a baseline
+    pytest benchmarks/micro --benchmark-compare              # compare with the latest baseline
+
+Baselines live in ``benchmarks/micro/baselines`` (one folder per interpreter
+and platform) and are committed, so an optimization can be proven against the
+recorded numbers. Comparing fails when a benchmark's median regresses by more
+than 50% unless ``--benchmark-compare-fail`` says otherwise.
+"""
+import sys
+from datetime import datetime, UTC
+from pathlib import Path
+
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+
+# Add the backend directory to the path so we can import from src
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.main.models import (
+    Appointment, AppointmentStatus, Client, ClientCategory, ClientStatus, ServiceType, User
+)
+
+BASELINES = Path(__file__).parent / "baselines"
+
+def pytest_configure(config):
+    """Default to the committed baselines and a regression threshold."""
+    if config.option.benchmark_storage == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BASELINES}"
+    if config.option.benchmark_compare and not config.option.benchmark_compare_fail:
+        config.option.benchmark_compare_fail = [parse_compare_fail("median:50%")]
+
+def run_coroutine(coroutine):
+    """Result of a coroutine that completes without suspending, minus event loop overhead."""
+    try:
+        coroutine.send(None)
+    except StopIteration as e:
+        return e.value
+    coroutine.close()
+    raise RuntimeError("coroutine suspended; benchmark it under an event loop instead")
+
+@pytest.fixture
+def run():
+    return run_coroutine
+
+def make_user(i: int) -> User:
+    return User(
+        id=f"user{i:017d}", username=f"user{i}", email=f"user{i}@example.com",
+        first_name="Ana", last_name="Silva", enabled=True, is_admin=False
+    )
+
+@pytest.fixture
+def user() -> User:
+    return make_user(1)
+
+@pytest.fixture
+def appointment() -> Appointment:
+    appointment = Appointment(
+        id="appointment0000000001",
+        title="Hair Cut with Ana",
+        description="Prefers the window seat",
+        startTime=datetime(2025, 6, 2, 9, 30, tzinfo=UTC),
+        durationMinutes=45,
+        status=AppointmentStatus.CONFIRMED,
+        serviceType=ServiceType.HAIRCUT,
+        creatorId="user00000000000000001"
+    )
+    appointment.creator = make_user(1)
+    appointment.attendees = [make_user(2), make_user(3)]
+    return appointment
+
+@pytest.fixture
+def client() -> Client:
+    return Client(
+        id="client000000000000001",
+        phone="+15555550123",
+        service=ServiceType.MASSAGE,
+        status=ClientStatus.ACTIVE,
+        notes="Allergic to lavender",
+        category=ClientCategory.REGULAR,
+        loyalty_points=120,
+        total_spent=845.5,
+        last_visit=datetime(2025, 5, 20, 15, tzinfo=UTC),
+        visit_count=12,
+        user_id="user00000000000000002"
+    )
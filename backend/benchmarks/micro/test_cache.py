@@ -0,0 +1,31 @@
+import pytest
+
+from src.main.cache import RedisCache, build_cache_key, cache, cache_decorator
+
+@pytest.fixture
+def local_cache(monkeypatch) -> RedisCache:
+    """The global cache without Redis or lookup listeners: the in-process path only."""
+    monkeypatch.setattr(cache, "redis", None)
+    monkeypatch.setattr(cache, "_local_cache", {})
+    monkeypatch.setattr(RedisCache, "lookup_listeners", [])
+    return cache
+
+def test_build_cache_key(benchmark):
+    args = (object(), "V1StGXR8_Z5jdHi6B-myT", 2025)
+    kwargs = {"status": "ACTIVE", "limit": 20}
+    assert benchmark(build_cache_key, "clients", "list_clients", args, kwargs).startswith("clients:list_clients:")
+
+def test_cached_call_hit(benchmark, local_cache, run):
+    @cache_decorator(expire_in=60, prefix="bench")
+    async def lookup(self, key, page=1):
+        return {"key": key, "page": page}
+
+    run(lookup(None, "V1StGXR8_Z5jdHi6B-myT", page=2))
+    assert benchmark(lambda: run(lookup(None, "V1StGXR8_Z5jdHi6B-myT", page=2)))["page"] == 2
+
+def test_redis_cache_get_hit(benchmark, local_cache, run):
+    run(local_cache.set("user:V1StGXR8_Z5jdHi6B-myT", {"id": "V1StGXR8_Z5jdHi6B-myT"}, expire_in=60))
+    assert benchmark(lambda: run(local_cache.get("user:V1StGXR8_Z5jdHi6B-myT"))) is not None
+
+def test_redis_cache_get_miss(benchmark, local_cache, run):
+    assert benchmark(lambda: run(local_cache.get("user:missing"))) is None
@@ -0,0 +1,20 @@
+from collections import namedtuple
+
+from src.main.schema_types import CLIENT_TYPE_FIELDS, AppointmentType, ClientType, UserType
+
+# Stands in for a SQLAlchemy Row: attribute access by column key
+ClientRow = namedtuple("ClientRow", [attribute for attribute, _ in CLIENT_TYPE_FIELDS.values()])
+
+def test_user_type_from_db(benchmark, user):
+    assert benchmark(UserType.from_db, user).username == "user1"
+
+def test_appointment_type_from_db(benchmark, appointment):
+    result = benchmark(AppointmentType.from_db, appointment)
+    assert result.service_type == "Hair Cut" and len(result.attendees) == 2
+
+def test_client_type_from_db(benchmark, client):
+    assert benchmark(ClientType.from_db, client).category == "REGULAR"
+
+def test_client_type_from_row(benchmark, client):
+    row = ClientRow(*(getattr(client, key) for key in ClientRow._fields))
+    assert benchmark(ClientType.from_row, row).category == "REGULAR"
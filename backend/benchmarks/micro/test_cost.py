@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String
+
+from src.main.models import ServiceType, calculate_appointment_cost, service_catalog
+
+def test_calculate_appointment_cost(benchmark):
+    assert benchmark(calculate_appointment_cost, ServiceType.HAIRCOLOR, 90) == 75.0
+
+def test_calculate_appointment_cost_raw_value(benchmark):
+    assert benchmark(calculate_appointment_cost, "Massage", 60) == 75.0
+
+def test_calculate_appointment_cost_expression(benchmark):
+    benchmark(calculate_appointment_cost, Column("service_type", String), Column("duration_minutes", Integer))
+
+def test_estimate_costs_1000_rows(benchmark):
+    services = [service.value for service in ServiceType] * 100
+    durations = [30, 45, 60, 90, 120] * 200
+    assert len(benchmark(service_catalog.estimate_costs, services, durations)) == 1000
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Script to bulk-import clients from a legacy CSV export
+
+Creates a user (username = email) and a client for every valid row, or a
+client for an existing user matched by email. Rows are validated in batches
+of --batch-size and loaded through COPY into a staging table, then merged in
+one transaction; nothing is written if the import fails. Use --dry-run to
+validate a file and see what would be imported.
+
+Expected columns: email, phone, service and optionally first_name,
+last_name, status, category and notes.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.main.auth import get_password_hash
+from src.main.client_import import import_clients
+from src.main.config import settings
+from src.main.database import engine
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Bulk-import clients from a CSV file")
+    parser.add_argument("csv", type=Path, help="CSV file to import")
+    parser.add_argument("--password", required=True, help="Initial password of every created user")
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE, help="Rows per validation and COPY batch")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and report without writing anything")
+    return parser.parse_args()
+
+async def main(args) -> None:
+    try:
+        started = time.perf_counter()
+        with args.csv.open(newline="", encoding="utf-8-sig") as file:
+            report = await import_clients(
+                engine, file, get_password_hash(args.password),
+                batch_size=args.batch_size, dry_run=args.dry_run
+            )
+        elapsed = time.perf_counter() - started
+        for issue in report.issues:
+            logger.warning(f"  line {issue.line}: {issue.field}: {issue.message}")
+        logger.info(
+            f"Read {report.rows:,} rows in {elapsed:.1f}s: {report.imported:,} imported "
+            f"({report.existing_users:,} for existing users), {report.duplicates:,} duplicates, "
+            f"{report.invalid:,} invalid"
+        )
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(main(args))
+        logger.info("✅ Dry run finished, nothing was written" if args.dry_run else "✅ Clients imported")
+    except Exception as e:
+        logger.error(f"❌ Client import failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Script to convert and maintain the monthly partitions of appointments and service_history
+
+Run with --convert once (in a maintenance window) to rebuild the plain tables as
+partitioned tables, then schedule it without flags (e.g. nightly cron) to create
+upcoming partitions and archive expired ones.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.main.database import engine
+from src.main.partitions import PARTITIONED_TABLES, convert_to_partitioned, maintain_partitions
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage monthly table partitions")
+    parser.add_argument("--convert", action="store_true", help="Convert plain tables to partitioned tables first")
+    parser.add_argument("--ahead", type=int, help="Months of future partitions to keep ready")
+    parser.add_argument("--retention", type=int, help="Months to keep attached before archiving (0 disables)")
+    return parser.parse_args()
+
+async def main(args) -> None:
+    try:
+        if args.convert:
+            for spec in PARTITIONED_TABLES:
+                async with engine.begin() as conn:
+                    await convert_to_partitioned(conn, spec)
+        await maintain_partitions(engine, months_ahead=args.ahead, retention_months=args.retention)
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+        logger.info("✅ Partition maintenance completed")
+    except Exception as e:
+        logger.error(f"❌ Partition maintenance failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script to verify client loyalty aggregates against service history
+
+Reports every client whose loyalty_points, total_spent, visit_count or
+last_visit has drifted from its service_history rows. Pass --fix to rewrite
+the drifted clients from history.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.main.database import async_session, engine
+from src.main.service_completion import reconcile_client_aggregates
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Reconcile client aggregates with service history")
+    parser.add_argument("--fix", action="store_true", help="Rewrite drifted clients from history")
+    return parser.parse_args()
+
+async def main(args) -> int:
+    try:
+        async with async_session() as session:
+            async with session.begin():
+                drifts = await reconcile_client_aggregates(session, fix=args.fix)
+        for drift in drifts:
+            logger.info(
+                f"{drift.client_id}: points {drift.loyalty_points}->{drift.expected_loyalty_points}, "
+                f"spent {drift.total_spent:.2f}->{drift.expected_total_spent:.2f}, "
+                f"visits {drift.visit_count}->{drift.expected_visit_count}"
+            )
+        return len(drifts)
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    args = parse_args()
+    drifted = asyncio.run(main(args))
+    if drifted == 0:
+        logger.info("✅ All client aggregates match service history")
+    elif args.fix:
+        logger.info(f"✅ Fixed {drifted} drifted clients")
+    else:
+        logger.error(f"❌ {drifted} clients have drifted aggregates")
+        sys.exit(1)
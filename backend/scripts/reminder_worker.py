@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script to run a standalone appointment reminder worker
+
+Drains the outbox until interrupted, delivering each reminder through the
+--backend delivery backend. Workers coordinate through row locks, so
+reminder throughput scales by starting more of them, on any host that
+reaches the database. Set REMINDERS_ENABLED instead to run a worker inside
+each app process.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.main.config import settings
+from src.main.database import engine
+from src.main.outbox import DELIVERY_BACKENDS, ReminderWorker, get_delivery_backend
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Deliver appointment reminders from the outbox")
+    parser.add_argument("--backend", choices=sorted(DELIVERY_BACKENDS), default=settings.REMINDER_BACKEND, help="Delivery backend")
+    return parser.parse_args()
+
+async def main(args) -> None:
+    worker = ReminderWorker(get_delivery_backend(args.backend))
+    logger.info(f"Delivering reminders through the {args.backend} backend")
+    try:
+        await worker.run()
+    finally:
+        await worker.backend.close()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        logger.info("✅ Reminder worker stopped")
+    except Exception as e:
+        logger.error(f"❌ Reminder worker failed: {str(e)}")
+        sys.exit(1)
@@ -0,0 +1,224 @@
+"""
+Revenue and utilization analytics over service history.
+
+History rows are streamed from the database in chunks of plain column tuples
+(never ORM objects) into columnar NumPy arrays, and every report is computed
+with vectorized group-bys (``np.bincount`` over integer codes), so summarizing
+a year of history costs a few array passes rather than a Python loop per row.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+from sqlalchemy import Float, String, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.main.config import settings
+from src.main.models import ServiceHistory, ServiceType
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86_400
+EPOCH = date(1970, 1, 1)
+
+# Stable integer code per service type, used as the group-by key
+SERVICE_TYPES: List[ServiceType] = list(ServiceType)
+SERVICE_CODES: Dict[str, int] = {service.value: code for code, service in enumerate(SERVICE_TYPES)}
+
+@dataclass
+class HistoryColumns:
+    """Service history in columnar form, one array entry per history row."""
+    service: np.ndarray      # int16 index into SERVICE_TYPES
+    provider: np.ndarray     # int32 index into providers
+    day: np.ndarray          # int64 days since the epoch (UTC)
+    cost: np.ndarray         # float64
+    duration: np.ndarray     # float64 minutes
+    rating: np.ndarray       # float64, NaN when unrated
+    providers: List[str]
+
+    def __len__(self) -> int:
+        return len(self.cost)
+
+@dataclass
+class GroupSummary:
+    """Aggregates for one group of history rows."""
+    key: str
+    revenue: float
+    service_count: int
+    total_minutes: float
+    average_satisfaction: Optional[float]
+    utilization: Optional[float] = None
+
+@dataclass
+class RevenueSummary:
+    """Full revenue and utilization report for a date range."""
+    total_revenue: float
+    service_count: int
+    total_minutes: float
+    average_satisfaction: Optional[float]
+    by_service_type: List[GroupSummary]
+    by_provider: List[GroupSummary]
+    by_day: List[GroupSummary]
+
+def columns_from_rows(rows: List[tuple], providers: Dict[str, int]) -> HistoryColumns:
+    """Convert a chunk of (service_type, provider, epoch, cost, duration, rating) tuples.
+
+    ``providers`` maps provider names to codes and is extended in place so
+    codes stay consistent across chunks.
+    """
+    if not rows:
+        return empty_columns(list(providers))
+    service, provider, epoch, cost, duration, rating = zip(*rows)
+    provider_codes = [providers.setdefault(name, len(providers)) for name in provider]
+    return HistoryColumns(
+        service=np.fromiter((SERVICE_CODES.get(s, SERVICE_CODES[ServiceType.OTHER.value]) for s in service),
+                            dtype=np.int16, count=len(rows)),
+        provider=np.asarray(provider_codes, dtype=np.int32),
+        day=np.floor_divide(np.asarray(epoch, dtype=np.float64), SECONDS_PER_DAY).astype(np.int64),
+        cost=np.asarray(cost, dtype=np.float64),
+        duration=np.asarray(duration, dtype=np.float64),
+        rating=np.asarray(rating, dtype=np.float64),
+        providers=list(providers)
+    )
+
+def empty_columns(providers: Optional[List[str]] = None) -> HistoryColumns:
+    """An empty set of history columns."""
+    return HistoryColumns(
+        service=np.empty(0, dtype=np.int16),
+        provider=np.empty(0, dtype=np.int32),
+        day=np.empty(0, dtype=np.int64),
+        cost=np.empty(0, dtype=np.float64),
+        duration=np.empty(0, dtype=np.float64),
+        rating=np.empty(0, dtype=np.float64),
+        providers=providers or []
+    )
+
+def concat_columns(chunks: List[HistoryColumns], providers: List[str]) -> HistoryColumns:
+    """Concatenate per-chunk columns into a single set of arrays."""
+    if not chunks:
+        return empty_columns(providers)
+    return HistoryColumns(
+        service=np.concatenate([c.service for c in chunks]),
+        provider=np.concatenate([c.provider for c in chunks]),
+        day=np.concatenate([c.day for c in chunks]),
+        cost=np.concatenate([c.cost for c in chunks]),
+        duration=np.concatenate([c.duration for c in chunks]),
+        rating=np.concatenate([c.rating for c in chunks]),
+        providers=providers
+    )
+
+async def load_history(
+    session: AsyncSession,
+    date_from: datetime,
+    date_to: datetime,
+    chunk_size: Optional[int] = None
+) -> HistoryColumns:
+    """Stream service history in ``[date_from, date_to)`` into columnar arrays."""
+    chunk_size = chunk_size or settings.ANALYTICS_CHUNK_SIZE
+    stmt = (
+        select(
+            cast(ServiceHistory.service_type, String),
+            ServiceHistory.provider_name,
+            cast(func.extract("epoch", ServiceHistory.date_of_service), Float),
+            ServiceHistory.service_cost,
+            ServiceHistory.service_duration,
+            ServiceHistory.satisfaction_rating
+        )
+        .where(ServiceHistory.date_of_service >= date_from)
+        .where(ServiceHistory.date_of_service < date_to)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    providers: Dict[str, int] = {}
+    chunks = []
+    result = await session.stream(stmt)
+    async for rows in result.partitions(chunk_size):
+        chunks.append(columns_from_rows(rows, providers))
+    return concat_columns(chunks, list(providers))
+
+def _group(codes: np.ndarray, columns: HistoryColumns, size: int) -> Dict[str, np.ndarray]:
+    """Vectorized per-code sums needed by every report."""
+    rated = ~np.isnan(columns.rating)
+    return {
+        "revenue": np.bincount(codes, weights=columns.cost, minlength=size),
+        "count": np.bincount(codes, minlength=size),
+        "minutes": np.bincount(codes, weights=columns.duration, minlength=size),
+        "rating_sum": np.bincount(codes[rated], weights=columns.rating[rated], minlength=size),
+        "rating_count": np.bincount(codes[rated], minlength=size),
+    }
+
+def _summaries(
+    keys: List[str],
+    sums: Dict[str, np.ndarray],
+    utilization: Optional[np.ndarray] = None
+) -> List[GroupSummary]:
+    """Turn per-code sums into summaries, skipping empty groups."""
+    summaries = []
+    for code in np.flatnonzero(sums["count"]):
+        rating_count = sums["rating_count"][code]
+        summaries.append(GroupSummary(
+            key=keys[code],
+            revenue=round(float(sums["revenue"][code]), 2),
+            service_count=int(sums["count"][code]),
+            total_minutes=float(sums["minutes"][code]),
+            average_satisfaction=float(sums["rating_sum"][code] / rating_count) if rating_count else None,
+            utilization=round(float(utilization[code]), 4) if utilization is not None else None
+        ))
+    return summaries
+
+def summarize(columns: HistoryColumns, minutes_per_day: Optional[int] = None) -> RevenueSummary:
+    """Compute revenue per service type, provider and day plus provider utilization.
+
+    Utilization is booked minutes over available minutes, where a provider is
+    available ``minutes_per_day`` on each day they performed at least one service.
+    """
+    minutes_per_day = minutes_per_day or settings.BUSINESS_HOURS_PER_DAY * 60
+
+    by_service = _summaries(
+        [service.value for service in SERVICE_TYPES],
+        _group(columns.service.astype(np.intp), columns, len(SERVICE_TYPES))
+    )
+
+    provider_codes = columns.provider.astype(np.intp)
+    provider_sums = _group(provider_codes, columns, len(columns.providers))
+    utilization = None
+    if len(columns):
+        # Distinct (provider, day) pairs give the days each provider worked
+        first_day = columns.day.min()
+        span = int(columns.day.max() - first_day) + 1
+        worked = np.unique(provider_codes * span + (columns.day - first_day))
+        active_days = np.bincount(worked // span, minlength=len(columns.providers))
+        utilization = provider_sums["minutes"] / np.maximum(active_days * minutes_per_day, 1)
+    by_provider = _summaries(columns.providers, provider_sums, utilization)
+
+    by_day = []
+    if len(columns):
+        first_day = int(columns.day.min())
+        day_codes = (columns.day - first_day).astype(np.intp)
+        span = int(day_codes.max()) + 1
+        keys = [(EPOCH + timedelta(days=first_day + offset)).isoformat() for offset in range(span)]
+        by_day = _summaries(keys, _group(day_codes, columns, span))
+
+    rated = ~np.isnan(columns.rating)
+    return RevenueSummary(
+        total_revenue=round(float(columns.cost.sum()), 2),
+        service_count=len(columns),
+        total_minutes=float(columns.duration.sum()),
+        average_satisfaction=float(columns.rating[rated].mean()) if rated.any() else None,
+        by_service_type=by_service,
+        by_provider=by_provider,
+        by_day=by_day
+    )
+
+async def revenue_report(session: AsyncSession, date_from: datetime, date_to: datetime) -> RevenueSummary:
+    """Load history for a date range and summarize it."""
+    columns = await load_history(session, date_from, date_to)
+    logger.debug(f"Summarizing {len(columns)} history rows from {date_from} to {date_to}")
+    return summarize(columns)
+
+__all__ = [
+    "HistoryColumns", "GroupSummary", "RevenueSummary", "columns_from_rows",
+    "load_history", "summarize", "revenue_report"
+]
@@ -1,6 +1,8 @@
 """
 Authentication and authorization implementation.
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
 import time
 from enum import Enum
@@ -19,6 +21,7 @@ from src.main.config import settings
 from src.main.database import get_session
 from src.main.models import User
 from src.main.cache import RedisCache
+from src.main.metrics import BCRYPT_QUEUE_DEPTH, RATE_LIMIT_REJECTIONS
 
 if TYPE_CHECKING:
     from src.main.typing import CustomContext
@@ -26,6 +29,8 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt is deliberately slow; run it off the event loop on a bounded pool
+bcrypt_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_WORKERS, thread_name_prefix="bcrypt")
 security = HTTPBearer()
 cache = RedisCache()
 
@@ -124,6 +129,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a stored password against a provided password."""
     return pwd_context.verify(plain_password, hashed_password)
 
+async def _run_bcrypt(func, *args):
+    BCRYPT_QUEUE_DEPTH.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, func, *args)
+    finally:
+        BCRYPT_QUEUE_DEPTH.dec()
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bcrypt thread pool."""
+    return await _run_bcrypt(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt thread pool."""
+    return await _run_bcrypt(verify_password, plain_password, hashed_password)
+
 async def create_token(subject: str, token_type: TokenType) -> str:
     """Create a JWT token."""
     try:
@@ -291,6 +311,8 @@ async def get_current_user(
 
 async def check_rate_limit(info: Info['CustomContext', None]) -> None:
     """Check rate limiting for the current user/IP."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
     try:
         request = info.context.request
         if not request or not request.client:
@@ -312,6 +334,7 @@ async def check_rate_limit(info: Info['CustomContext', None]) -> None:
             await cache.set(key, str(count), expire_in=60)  # 1 minute window
 
             if count > settings.RATE_LIMIT_PER_MINUTE:
+                RATE_LIMIT_REJECTIONS.inc()
                 current_time = int(time.time())
                 window_end = (current_time // 60 + 1) * 60
                 remaining = window_end - current_time
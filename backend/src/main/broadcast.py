@@ -0,0 +1,180 @@
+"""
+Appointment change events, broadcast to GraphQL subscriptions on every worker.
+
+Mutations publish an ``AppointmentEvent`` after their transaction commits.
+Each worker keeps one bounded queue per open subscription and hands every
+event to all of them; no subscriber ever queries the database for an event.
+With Redis available, events are published on a Redis channel instead, and
+every worker (the publishing one included) relays what it receives on that
+channel to its local subscribers, so a booking made on one worker reaches
+front-desk screens connected to any other. Without Redis, events only reach
+subscribers of the worker that published them.
+
+A subscriber that falls behind loses its oldest events rather than growing
+its queue or slowing down publishers.
+"""
+import asyncio
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Iterator, List, Optional, Set
+import logging
+
+import orjson
+from sqlalchemy import select
+
+from src.main.cache import cache
+from src.main.config import settings
+from src.main.models import Appointment, appointment_attendees
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class AppointmentEvent:
+    """Snapshot of an appointment right after a committed change."""
+    kind: str  # CREATED, UPDATED, DELETED or COMPLETED
+    appointment_id: str
+    title: str
+    start_time: datetime
+    duration_minutes: int
+    status: str
+    service_type: str
+    creator_id: str
+    attendee_ids: List[str] = field(default_factory=list)
+    previous_start_time: Optional[datetime] = None
+
+    def to_json(self) -> bytes:
+        return orjson.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "AppointmentEvent":
+        values = orjson.loads(data)
+        for name in ("start_time", "previous_start_time"):
+            if values[name] is not None:
+                values[name] = datetime.fromisoformat(values[name])
+        return cls(**values)
+
+    def visible_to(self, user_id: str, is_admin: bool) -> bool:
+        return is_admin or user_id == self.creator_id or user_id in self.attendee_ids
+
+    def starts_between(self, date_from: Optional[datetime], date_to: Optional[datetime]) -> bool:
+        """Whether the appointment starts, or started before a move, in ``[date_from, date_to)`` (aware bounds)."""
+        return any(
+            (date_from is None or start >= date_from) and (date_to is None or start < date_to)
+            for start in (self.start_time, self.previous_start_time) if start is not None
+        )
+
+async def appointment_event(
+    session,
+    appointment: Appointment,
+    kind: str,
+    previous_start_time: Optional[datetime] = None
+) -> AppointmentEvent:
+    """Event for ``appointment``; call inside the transaction that changes it."""
+    attendee_ids = list(await session.scalars(
+        select(appointment_attendees.c.user_id).where(appointment_attendees.c.appointment_id == appointment.id)
+    ))
+    return AppointmentEvent(
+        kind=kind,
+        appointment_id=appointment.id,
+        title=appointment.title,
+        start_time=appointment.startTime,
+        duration_minutes=appointment.durationMinutes,
+        status=str(appointment.status),
+        service_type=str(appointment.serviceType),
+        creator_id=appointment.creatorId,
+        attendee_ids=attendee_ids,
+        previous_start_time=previous_start_time
+    )
+
+class Subscription:
+    """Bounded queue of events for one subscriber."""
+
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+
+    def put(self, event: AppointmentEvent) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped in (1, 100, 10_000):
+                logger.warning(f"Slow subscriber dropped {self.dropped} appointment events")
+        self.queue.put_nowait(event)
+
+    async def get(self) -> AppointmentEvent:
+        return await self.queue.get()
+
+class AppointmentBroadcast:
+    """In-process fan-out of appointment events, relayed across workers through Redis."""
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._subscriptions: Set[Subscription] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    @contextmanager
+    def subscribe(self) -> Iterator[Subscription]:
+        subscription = Subscription(settings.SUBSCRIPTION_QUEUE_SIZE)
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def deliver(self, event: AppointmentEvent) -> None:
+        """Hand ``event`` to every subscriber of this worker."""
+        for subscription in tuple(self._subscriptions):
+            subscription.put(event)
+
+    async def publish(self, event: AppointmentEvent) -> None:
+        """Publish a committed change; never raises, the change itself already happened."""
+        if self._listener is not None and cache.redis:
+            try:
+                await cache.redis.publish(self.channel, event.to_json())
+                return
+            except Exception as e:
+                logger.warning(f"Redis publish failed, delivering locally only: {str(e)}")
+        self.deliver(event)
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            pubsub = cache.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.deliver(AppointmentEvent.from_json(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Appointment event listener failed: {str(e)}, retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                await pubsub.close()
+
+    def start(self) -> None:
+        """Relay events from Redis to local subscribers, when Redis is available."""
+        if cache.redis and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+# Global appointment event broadcast
+appointment_events = AppointmentBroadcast(settings.SUBSCRIPTION_CHANNEL)
+
+__all__ = ["AppointmentEvent", "AppointmentBroadcast", "appointment_event", "appointment_events"]
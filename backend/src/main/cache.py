@@ -3,8 +3,7 @@ Redis cache implementation with in-memory fallback for the application.
 """
 import pickle
 from datetime import datetime, timedelta
-from typing import Any, Optional
-import redis.asyncio as redis
+from typing import Any, Callable, List, Optional
 from functools import wraps
 import logging
 
@@ -12,14 +11,27 @@ from src.main.config import settings
 
 logger = logging.getLogger(__name__)
 
+# INCRBY that leaves missing keys missing instead of starting them at zero
+INCR_EXISTING_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
 class RedisCache:
     """Cache implementation with Redis and in-memory fallback."""
 
+    # Called as listener(key, hit) after every get(), for tracing and metrics
+    lookup_listeners: List[Callable[[str, bool], None]] = []
+
     def __init__(self):
         self._local_cache = {}  # In-memory cache
         self.redis = None
         if settings.REDIS_ENABLED:
             try:
+                # Imported here so deployments without Redis never load the client
+                import redis.asyncio as redis
                 self.redis = redis.from_url(
                     settings.REDIS_URL,
                     encoding="utf-8",
@@ -51,8 +63,23 @@ class RedisCache:
             await self.redis.close()
             self.redis = None
 
+    @classmethod
+    def add_lookup_listener(cls, listener: Callable[[str, bool], None]) -> None:
+        """Register a callback notified of every cache hit or miss."""
+        if listener not in cls.lookup_listeners:
+            cls.lookup_listeners.append(listener)
+
     async def get(self, key: str) -> Any:
         """Get value from cache."""
+        value = await self._get(key)
+        for listener in self.lookup_listeners:
+            try:
+                listener(key, value is not None)
+            except Exception as e:
+                logger.error(f"Cache lookup listener failed: {str(e)}")
+        return value
+
+    async def _get(self, key: str) -> Any:
         # Check local cache first
         if key in self._local_cache:
             value, expire_at = self._local_cache[key]
@@ -113,24 +140,79 @@ class RedisCache:
 
         return success
 
-    async def incr(self, key: str) -> int:
-        """Increment counter."""
+    async def incr(self, key: str, amount: int = 1) -> int:
+        """Increment counter by ``amount`` (which may be negative)."""
         # Use local cache for counter if Redis is not available
         if not self.redis:
-            value = self._local_cache.get(key, (0, datetime.max))[0]
-            value += 1
-            self._local_cache[key] = (value, datetime.max)
-            return value
+            return self._local_incr(key, amount)
 
         try:
-            return await self.redis.incr(key)
+            return await self.redis.incrby(key, amount)
         except Exception as e:
             logger.error(f"Redis incr error for {key}: {str(e)}")
             # Fallback to local cache
-            value = self._local_cache.get(key, (0, datetime.max))[0]
-            value += 1
-            self._local_cache[key] = (value, datetime.max)
-            return value
+            return self._local_incr(key, amount)
+
+    def _local_incr(self, key: str, amount: int) -> int:
+        """Increment a local counter, keeping its expiration."""
+        value, expire_at = self._local_cache.get(key, (0, datetime.max))
+        if expire_at <= datetime.now():
+            value, expire_at = 0, datetime.max
+        value += amount
+        self._local_cache[key] = (value, expire_at)
+        return value
+
+    async def incr_existing(self, key: str, amount: int = 1) -> Optional[int]:
+        """Increment a counter only if it exists; returns None, creating nothing, if it is missing.
+
+        Unlike ``incr`` this never recreates an expired counter as a partial
+        count without an expiration.
+        """
+        if self.redis:
+            try:
+                return await self.redis.eval(INCR_EXISTING_SCRIPT, 1, key, amount)
+            except Exception as e:
+                logger.error(f"Redis incr error for {key}: {str(e)}")
+
+        value, expire_at = self._local_cache.get(key, (None, datetime.max))
+        if value is None or expire_at <= datetime.now():
+            return None
+        self._local_cache[key] = (value + amount, expire_at)
+        return value + amount
+
+    async def get_counters(self, keys: List[str]) -> List[Optional[int]]:
+        """Get several counters in one round trip; missing counters are None.
+
+        Counters are stored as plain integers (not pickled) so they can be
+        updated atomically with ``incr``, which is why they are read here
+        rather than through ``get``.
+        """
+        if self.redis:
+            try:
+                values = await self.redis.mget(keys)
+                return [int(value) if value is not None else None for value in values]
+            except Exception as e:
+                logger.error(f"Redis mget error for {keys}: {str(e)}")
+
+        now = datetime.now()
+        counters = []
+        for key in keys:
+            value, expire_at = self._local_cache.get(key, (None, datetime.max))
+            counters.append(int(value) if value is not None and expire_at > now else None)
+        return counters
+
+    async def set_counter(self, key: str, value: int, expire_in: Optional[int] = None) -> bool:
+        """Set a counter to an absolute value with optional expiration in seconds."""
+        expire_at = datetime.max if expire_in is None else datetime.now() + timedelta(seconds=expire_in)
+        self._local_cache[key] = (int(value), expire_at)
+
+        if self.redis:
+            try:
+                await self.redis.set(key, int(value), ex=expire_in)
+            except Exception as e:
+                logger.error(f"Redis set error for {key}: {str(e)}")
+                return False
+        return True
 
     async def expire(self, key: str, seconds: int) -> bool:
         """Set expiration on key."""
@@ -154,15 +236,18 @@ class RedisCache:
 # Global cache instance
 cache = RedisCache()
 
+def build_cache_key(prefix: str, name: str, args: tuple, kwargs: dict) -> str:
+    """Cache key for a call of ``name``; the first positional argument (self) is skipped."""
+    arg_str = ':'.join(str(a) for a in args[1:])
+    kwarg_str = ':'.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+    return f"{prefix}:{name}:{arg_str}:{kwarg_str}"
+
 def cache_decorator(expire_in: Optional[int] = None, prefix: str = ""):
     """Decorator for caching function results."""
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Build cache key
-            arg_str = ':'.join(str(a) for a in args[1:])  # Skip self
-            kwarg_str = ':'.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
-            cache_key = f"{prefix}:{func.__name__}:{arg_str}:{kwarg_str}"
+            cache_key = build_cache_key(prefix, func.__name__, args, kwargs)
 
             # Try to get from cache
             result = await cache.get(cache_key)
@@ -182,4 +267,4 @@ def cache_decorator(expire_in: Optional[int] = None, prefix: str = ""):
     return decorator
 
 # Export cache instance and decorator
-__all__ = ['cache', 'cache_decorator']
+__all__ = ['cache', 'cache_decorator', 'build_cache_key']
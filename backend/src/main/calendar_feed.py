@@ -0,0 +1,195 @@
+"""
+Per-user iCalendar feeds of appointments for phone and desktop calendars.
+
+``GET /calendar/{user_id}.ics?token=...`` serves the appointments a user
+created or attends, starting ``CALENDAR_FEED_PAST_DAYS`` ago. Calendar apps
+cannot send bearer tokens, so feeds are authorized by an HMAC of the user id
+and the user's ``calendar_feed_version`` (``feed_token``), handed out by the
+``calendarFeedUrl`` query. The ``resetCalendarFeedUrl`` mutation bumps the
+version, revoking every URL issued before.
+
+Calendar apps poll aggressively, and most polls find nothing new. Each
+request first runs one aggregate query (latest ``updated_at`` and row count
+of the feed's appointments) to build the ``ETag`` and ``Last-Modified``
+validators; a matching ``If-None-Match`` or ``If-Modified-Since`` answers
+``304`` without reading any appointment. Otherwise events are rendered
+batch by batch from a server-side cursor and streamed.
+"""
+import base64
+import hashlib
+import hmac
+from datetime import datetime, timedelta, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import AsyncIterator, Optional
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, or_, select, update
+
+from src.main.config import settings
+from src.main.database import async_session, engine
+from src.main.models import Appointment, AppointmentStatus, User, appointment_attendees
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "text/calendar; charset=utf-8"
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# iCalendar STATUS per appointment status
+EVENT_STATUS = {
+    AppointmentStatus.SCHEDULED: "TENTATIVE",
+    AppointmentStatus.CONFIRMED: "CONFIRMED",
+    AppointmentStatus.COMPLETED: "CONFIRMED",
+    AppointmentStatus.CANCELLED: "CANCELLED",
+    AppointmentStatus.DECLINED: "CANCELLED",
+}
+
+def feed_token(user_id: str, version: int) -> str:
+    """Token authorizing the calendar feed of ``user_id`` at feed ``version``."""
+    message = f"calendar:{user_id}:{version}".encode()
+    digest = hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:24]).decode()
+
+def feed_path(user_id: str, version: int) -> str:
+    return f"/calendar/{user_id}.ics?token={feed_token(user_id, version)}"
+
+async def rotate_feed_token(session, user_id: str) -> str:
+    """Revoke the user's feed URLs and return the new feed path; call inside a transaction."""
+    version = await session.scalar(
+        update(User)
+        .where(User.id == user_id)
+        .values(calendar_feed_version=User.calendar_feed_version + 1)
+        .returning(User.calendar_feed_version)
+        .execution_options(synchronize_session=False)
+    )
+    if version is None:
+        raise ValueError("User not found")
+    logger.info(f"Calendar feed token rotated for user {user_id}")
+    return feed_path(user_id, version)
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545, 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "")
+    )
+
+def fold(line: str) -> bytes:
+    """Content line folded at 75 octets, never splitting a UTF-8 sequence."""
+    data = line.encode()
+    parts = []
+    limit = 75
+    while len(data) > limit:
+        cut = limit
+        while data[cut] & 0xC0 == 0x80:
+            cut -= 1
+        parts.append(data[:cut])
+        data = data[cut:]
+        limit = 74  # continuation lines start with a space
+    parts.append(data)
+    return b"\r\n ".join(parts) + b"\r\n"
+
+def _timestamp(value: datetime) -> str:
+    return value.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+def render_event(row) -> bytes:
+    service = str(row.serviceType.value if hasattr(row.serviceType, "value") else row.serviceType)
+    lines = (
+        "BEGIN:VEVENT",
+        f"UID:{row.id}@{settings.CALENDAR_FEED_DOMAIN}",
+        f"DTSTAMP:{_timestamp(row.updated_at)}",
+        f"LAST-MODIFIED:{_timestamp(row.updated_at)}",
+        f"DTSTART:{_timestamp(row.startTime)}",
+        f"DTEND:{_timestamp(row.end_time)}",
+        f"SUMMARY:{escape_text(row.title)}",
+        f"DESCRIPTION:{escape_text(service)}",
+        f"CATEGORIES:{escape_text(service)}",
+        f"STATUS:{EVENT_STATUS.get(row.status, 'CONFIRMED')}",
+        "END:VEVENT",
+    )
+    return b"".join(fold(line) for line in lines)
+
+def _conditions(user_id: str, since: datetime) -> list:
+    attending = select(appointment_attendees.c.appointment_id).where(appointment_attendees.c.user_id == user_id)
+    return [
+        or_(Appointment.creatorId == user_id, Appointment.id.in_(attending)),
+        Appointment.startTime >= since,
+    ]
+
+def window_start(now: Optional[datetime] = None) -> datetime:
+    """Oldest start time in feeds; moves once a day so validators stay stable within a day."""
+    today = (now or datetime.now(UTC)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+
+def entity_tag(user_id: str, since: datetime, last_modified: datetime, count: int) -> str:
+    # Deletions lower the count; moving the window changes ``since``
+    key = f"{user_id}|{since.isoformat()}|{last_modified.isoformat()}|{count}"
+    return f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+def not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Whether the client's validators still match (If-None-Match takes precedence)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+async def _events(user_id: str, since: datetime) -> AsyncIterator[bytes]:
+    yield fold("BEGIN:VCALENDAR") + fold("VERSION:2.0") + fold(f"PRODID:-//{settings.APP_NAME}//Calendar feed//EN")
+    yield fold("CALSCALE:GREGORIAN") + fold("METHOD:PUBLISH") + fold(f"X-WR-CALNAME:{escape_text(settings.APP_NAME)}")
+    # Core rows are keyed by column name; label them with the attribute names render_event reads
+    statement = (
+        select(
+            Appointment.id, Appointment.title, Appointment.startTime.label("startTime"), Appointment.end_time,
+            Appointment.serviceType.label("serviceType"), Appointment.status, Appointment.updated_at
+        )
+        .where(*_conditions(user_id, since))
+        .order_by(Appointment.startTime, Appointment.id)
+        .execution_options(yield_per=settings.CALENDAR_FEED_BATCH_SIZE)
+    )
+    async with engine.connect() as conn:
+        result = await conn.stream(statement)
+        async for rows in result.partitions():
+            yield b"".join(render_event(row) for row in rows)
+    yield fold("END:VCALENDAR")
+
+router = APIRouter(prefix="/calendar", tags=["calendar"])
+
+@router.get("/{user_id}.ics")
+async def calendar_feed(request: Request, user_id: str, token: str = Query(...)):
+    """iCalendar feed of a user's appointments, with conditional GET support."""
+    since = window_start()
+    async with async_session() as session:
+        user = (await session.execute(
+            select(User.enabled, User.calendar_feed_version).where(User.id == user_id)
+        )).one_or_none()
+        if (
+            user is None or not user.enabled
+            or not hmac.compare_digest(token, feed_token(user_id, user.calendar_feed_version))
+        ):
+            raise HTTPException(status_code=404, detail="Calendar not found")
+        last_modified, count = (await session.execute(
+            select(func.max(Appointment.updated_at), func.count()).where(*_conditions(user_id, since))
+        )).one()
+    last_modified = last_modified or EPOCH
+
+    etag = entity_tag(user_id, since, last_modified, count)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified.astimezone(UTC), usegmt=True),
+        "Cache-Control": f"private, max-age={settings.CALENDAR_FEED_MAX_AGE}",
+    }
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = 'inline; filename="appointments.ics"'
+    return StreamingResponse(_events(user_id, since), media_type=MEDIA_TYPE, headers=headers)
+
+__all__ = ["router", "feed_token", "feed_path", "rotate_feed_token", "render_event", "escape_text", "fold", "entity_tag", "not_modified"]
@@ -0,0 +1,263 @@
+"""
+Bulk import of clients, each with its user, from a legacy CSV export.
+
+The CSV is read as a stream in batches of ``IMPORT_BATCH_SIZE`` rows. Each
+batch is normalized and validated column-wise with numpy (email, phone,
+service, status, category, notes), and rows repeating an email already seen
+in the batch are dropped. Valid rows are COPY'd into a temporary staging
+table; once the whole file is staged, a handful of set-based statements
+finish the job in the same transaction:
+
+* rows repeating an email staged earlier in the file are dropped;
+* one join against ``users`` finds emails that already have a user: those
+  users get a client profile unless they already have one, in which case the
+  row is reported as a duplicate;
+* new users are inserted (username = email) with the given password hash,
+  then their clients.
+
+Nothing is written if the import fails, and ``dry_run`` rolls everything
+back after computing the report. Expected columns: ``email``, ``phone``,
+``service`` and optionally ``first_name``, ``last_name``, ``status``
+(default ACTIVE), ``category`` (default NEW) and ``notes``. Enum columns
+accept member names or values in any case.
+"""
+import csv
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.main.config import settings
+from src.main.models import ClientCategory, ClientStatus, ServiceType, generate_nanoid
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("email", "phone", "service")
+OPTIONAL_COLUMNS = ("first_name", "last_name", "status", "category", "notes")
+
+STAGING_COLUMNS = (
+    "line", "user_id", "client_id", "email", "first_name", "last_name",
+    "phone", "service", "status", "category", "notes"
+)
+
+# Separators people type into phone numbers
+PHONE_SEPARATORS = str.maketrans("", "", " -.()/")
+PHONE_DIGITS = (7, 15)  # E.164 allows at most 15 digits
+EMAIL_MAX_LENGTH = 254
+NOTES_MAX_LENGTH = 500
+
+def _spellings(enum) -> Tuple[np.ndarray, np.ndarray]:
+    # Upper-cased names and values, sorted, with the value each stands for
+    spellings = {}
+    for member in enum:
+        spellings[member.name.upper()] = spellings[member.value.upper()] = member.value
+    keys = sorted(spellings)
+    return np.array(keys), np.array([spellings[key] for key in keys])
+
+SERVICES = _spellings(ServiceType)
+STATUSES = _spellings(ClientStatus)
+CATEGORIES = _spellings(ClientCategory)
+
+class ImportIssue(NamedTuple):
+    """A rejected CSV row: its line number, the offending column and why."""
+    line: int
+    field: str
+    message: str
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    imported: int = 0
+    existing_users: int = 0  # imported clients attached to an existing user
+    duplicates: int = 0
+    invalid: int = 0
+    issues: List[ImportIssue] = field(default_factory=list)
+
+    def add_issues(self, issues: Iterable[ImportIssue], invalid: bool = True) -> None:
+        issues = list(issues)
+        if invalid:
+            self.invalid += len(issues)
+        else:
+            self.duplicates += len(issues)
+        room = settings.IMPORT_MAX_REPORTED_ISSUES - len(self.issues)
+        self.issues.extend(issues[:max(room, 0)])
+
+def _column(rows: List[Dict[str, str]], name: str) -> np.ndarray:
+    return np.char.strip(np.array([row.get(name) or "" for row in rows], dtype=str))
+
+def _canonical(values: np.ndarray, spellings: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Enum values for upper-cased names or values, and which of them are known."""
+    keys, canonical = spellings
+    index = np.minimum(np.searchsorted(keys, values), len(keys) - 1)
+    known = keys[index] == values
+    return np.where(known, canonical[index], values), known
+
+def validate_batch(lines: List[int], rows: List[Dict[str, str]]) -> Tuple[List[tuple], List[ImportIssue]]:
+    """Normalize and validate a batch of CSV rows.
+
+    Returns staging records (without ids) for valid rows and one issue per
+    rejected row, naming the first column that failed.
+    """
+    if not rows:
+        return [], []
+    email = np.char.lower(_column(rows, "email"))
+    phone = np.char.translate(_column(rows, "phone"), PHONE_SEPARATORS)
+    service, known_service = _canonical(np.char.upper(_column(rows, "service")), SERVICES)
+    status = np.char.upper(_column(rows, "status"))
+    status, known_status = _canonical(np.where(status == "", ClientStatus.ACTIVE.name, status), STATUSES)
+    category = np.char.upper(_column(rows, "category"))
+    category, known_category = _canonical(np.where(category == "", ClientCategory.NEW.name, category), CATEGORIES)
+    notes = _column(rows, "notes")
+
+    at = np.char.find(email, "@")
+    digits = np.char.lstrip(phone, "+")
+    digit_count = np.char.str_len(digits)
+    _, first_seen = np.unique(email, return_index=True)
+    unique = np.zeros(len(rows), dtype=bool)
+    unique[first_seen] = True
+
+    checks = (
+        ("email", (at > 0) & (np.char.count(email, "@") == 1)
+            & (np.char.rfind(email, ".") > at + 1) & (np.char.str_len(email) <= EMAIL_MAX_LENGTH),
+            "Invalid email address"),
+        ("email", unique, "Duplicate email in file"),
+        ("phone", np.char.isdigit(digits) & (digit_count >= PHONE_DIGITS[0]) & (digit_count <= PHONE_DIGITS[1]),
+            f"Phone number must have {PHONE_DIGITS[0]} to {PHONE_DIGITS[1]} digits"),
+        ("service", known_service, "Unknown service"),
+        ("status", known_status, "Unknown status"),
+        ("category", known_category, "Unknown category"),
+        ("notes", np.char.str_len(notes) <= NOTES_MAX_LENGTH, f"Notes exceed {NOTES_MAX_LENGTH} characters"),
+    )
+    failed = np.zeros(len(rows), dtype=bool)
+    issues = []
+    for name, valid, message in checks:
+        rejected = ~valid & ~failed
+        issues.extend(ImportIssue(lines[i], name, message) for i in np.flatnonzero(rejected))
+        failed |= rejected
+    issues.sort()
+
+    first_name = _column(rows, "first_name")
+    last_name = _column(rows, "last_name")
+    records = [
+        (lines[i], str(email[i]), str(first_name[i]) or None, str(last_name[i]) or None, str(phone[i]),
+         str(service[i]), str(status[i]), str(category[i]), str(notes[i]) or None)
+        for i in np.flatnonzero(~failed)
+    ]
+    return records, issues
+
+def read_batches(file, batch_size: int) -> Iterator[Tuple[List[int], List[Dict[str, str]]]]:
+    """Line numbers and rows of a CSV file, ``batch_size`` rows at a time."""
+    reader = csv.DictReader(file)
+    missing = [name for name in REQUIRED_COLUMNS if name not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    rows = ((reader.line_num, row) for row in reader)
+    while batch := list(islice(rows, batch_size)):
+        lines, values = zip(*batch)
+        yield list(lines), list(values)
+
+async def _stage(connection, file, batch_size: int, report: ImportReport) -> None:
+    await connection.execute("""
+        CREATE TEMP TABLE client_import (
+            line integer PRIMARY KEY,
+            user_id varchar(21) NOT NULL,
+            client_id varchar(21) NOT NULL,
+            email varchar NOT NULL,
+            first_name varchar,
+            last_name varchar,
+            phone varchar(20) NOT NULL,
+            service varchar NOT NULL,
+            status varchar NOT NULL,
+            category varchar NOT NULL,
+            notes varchar(500),
+            existing_user boolean NOT NULL DEFAULT FALSE
+        ) ON COMMIT DROP
+    """)
+    for lines, rows in read_batches(file, batch_size):
+        report.rows += len(rows)
+        records, issues = validate_batch(lines, rows)
+        report.add_issues(issues)
+        await connection.copy_records_to_table(
+            "client_import",
+            records=[(line, generate_nanoid(), generate_nanoid(), *values) for line, *values in records],
+            columns=STAGING_COLUMNS
+        )
+        logger.info(f"client_import: {report.rows:,} rows read, {report.invalid:,} invalid")
+    await connection.execute("ANALYZE client_import")
+
+async def _merge(connection, password_hash: str, report: ImportReport) -> None:
+    def duplicates(rows, message: str) -> None:
+        report.add_issues((ImportIssue(row["line"], "email", message) for row in rows), invalid=False)
+
+    duplicates(await connection.fetch("""
+        DELETE FROM client_import a USING client_import b
+        WHERE a.email = b.email AND a.line > b.line
+        RETURNING a.line
+    """), "Duplicate email in file")
+
+    report.existing_users = int((await connection.execute("""
+        UPDATE client_import s SET user_id = u.id, existing_user = TRUE
+        FROM users u WHERE lower(u.email) = s.email
+    """)).split()[-1])
+    duplicated = await connection.fetch("""
+        DELETE FROM client_import s USING clients c
+        WHERE s.existing_user AND c.user_id = s.user_id
+        RETURNING s.line
+    """)
+    report.existing_users -= len(duplicated)
+    duplicates(duplicated, "A client with this email already exists")
+
+    # Usernames are emails; a user may already have this one as a username
+    duplicates(await connection.fetch("""
+        WITH inserted AS (
+            INSERT INTO users (id, username, email, password, first_name, last_name, enabled, is_admin)
+            SELECT user_id, email, email, $1, first_name, last_name, TRUE, FALSE
+            FROM client_import WHERE NOT existing_user
+            ORDER BY line
+            ON CONFLICT DO NOTHING
+            RETURNING id
+        )
+        DELETE FROM client_import s
+        WHERE NOT s.existing_user AND NOT EXISTS (SELECT 1 FROM inserted i WHERE i.id = s.user_id)
+        RETURNING s.line
+    """, password_hash), "A user with this username already exists")
+
+    report.imported = int((await connection.execute("""
+        INSERT INTO clients (id, phone, service, status, notes, category,
+                             loyalty_points, total_spent, visit_count, user_id)
+        SELECT client_id, phone, service, status, notes, category, 0, 0.0, 0, user_id
+        FROM client_import
+        ORDER BY line
+    """)).split()[-1])
+
+async def import_clients(
+    engine: AsyncEngine,
+    file,
+    password_hash: str,
+    batch_size: int = None,
+    dry_run: bool = False
+) -> ImportReport:
+    """Import the clients of a CSV text stream; see the module docstring."""
+    report = ImportReport()
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        connection = raw.driver_connection
+        transaction = connection.transaction()
+        await transaction.start()
+        try:
+            await _stage(connection, file, batch_size or settings.IMPORT_BATCH_SIZE, report)
+            await _merge(connection, password_hash, report)
+        except BaseException:
+            await transaction.rollback()
+            raise
+        if dry_run:
+            await transaction.rollback()
+        else:
+            await transaction.commit()
+    report.issues.sort()
+    return report
+
+__all__ = ["ImportIssue", "ImportReport", "validate_batch", "read_batches", "import_clients"]
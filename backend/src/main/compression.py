@@ -0,0 +1,147 @@
+"""
+Response compression middleware with Brotli and GZip.
+
+Responses of at least ``COMPRESSION_MINIMUM_SIZE`` bytes are compressed with
+Brotli when the client accepts ``br`` and the optional ``brotli`` package is
+installed, otherwise with GZip. Streamed responses are compressed chunk by
+chunk and flushed after every chunk so clients still receive rows as they are
+produced. Responses that already carry a ``Content-Encoding``, server-sent
+events and media types that are compressed already pass through untouched.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+from src.main.config import settings
+
+# Media types that gain nothing from another compression pass
+SKIP_MEDIA_TYPES = (
+    "text/event-stream",
+    "application/zip",
+    "application/gzip",
+    "application/vnd.apache.parquet",
+    "application/octet-stream",
+    "image/",
+    "video/",
+)
+
+class _Compressor:
+    """Incremental compressor for one response."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            # wbits=31 writes a gzip header and trailer
+            self._zlib = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + (self._brotli.flush() if flush else b"")
+        return self._zlib.compress(data) + (self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else b"")
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported encoding for an ``Accept-Encoding`` header value."""
+    accepted = {
+        part.split(";", 1)[0].lower()
+        for part in accept_encoding.replace(" ", "").split(",")
+        if not part.endswith(";q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses above a size threshold."""
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = None
+        if scope["type"] == "http":
+            encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _skip(self, headers: Headers) -> bool:
+        media_type = headers.get("content-type", "")
+        return "content-encoding" in headers or media_type.startswith(SKIP_MEDIA_TYPES)
+
+    def _set_headers(self, start: Message, content_length: Optional[int]) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk decides the encoding
+            self.start_message = message
+            self.passthrough = self._skip(Headers(raw=message["headers"]))
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        start, self.start_message = self.start_message, None
+
+        if start is not None:
+            if not self.passthrough and (more_body or len(body) >= self.minimum_size):
+                self.compressor = _Compressor(self.encoding)
+                if more_body:
+                    self._set_headers(start, None)
+                else:
+                    message["body"] = body = self.compressor.finish(body)
+                    self._set_headers(start, len(body))
+            else:
+                self.passthrough = True
+            await self.send(start)
+            if self.passthrough or not more_body:
+                await self.send(message)
+                return
+
+        if not self.passthrough:
+            message["body"] = (
+                self.compressor.compress(body, flush=True) if more_body else self.compressor.finish(body)
+            )
+        await self.send(message)
+
+__all__ = ["CompressionMiddleware", "choose_encoding"]
@@ -1,7 +1,7 @@
 """
 Application configuration settings.
 """
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from urllib.parse import urlparse, parse_qs
@@ -20,7 +20,12 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "127.0.0.1"
     PORT: int = 8000
-    WORKERS: int = 1
+    WORKERS: Optional[int] = None  # None: one worker per CPU
+    KEEP_ALIVE_TIMEOUT: int = 75  # above typical load balancer idle timeouts
+    BACKLOG: int = 2048
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+    LIMIT_CONCURRENCY: Optional[int] = None
+    MAX_REQUESTS_PER_WORKER: Optional[int] = None
 
     # Database
     DATABASE_URL: str = Field(
@@ -32,6 +37,13 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 10
     DB_ECHO: bool = False
+    FAST_BOOT: bool = False  # skip create_all at startup; tables come from migrations
+
+    # Table partitioning
+    PARTITIONING_ENABLED: bool = False
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_MONTHS: int = 36
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"
 
     @field_validator("DATABASE_URL")
     def validate_database_url(cls, v: str) -> str:
@@ -80,6 +92,27 @@ class Settings(BaseSettings):
     CORS_ALLOW_METHODS: List[str] = ["*"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
 
+    # GraphQL
+    GRAPHQL_DOCUMENT_CACHE_SIZE: int = 500
+    PERSISTED_QUERY_CACHE_SIZE: int = 1000
+    PERSISTED_QUERY_TTL: int = 86_400
+    GRAPHQL_PUBLIC_QUERY_FIELDS: List[str] = ["hello", "ping", "systemInfo"]
+    GRAPHQL_PUBLIC_MAX_AGE: int = 30
+    SUBSCRIPTION_QUEUE_SIZE: int = 100
+    SUBSCRIPTION_CHANNEL: str = "appointment-events"
+    SUBSCRIPTION_AUTH_RECHECK_SECONDS: int = 60  # how soon a disabled user's subscriptions end
+    MAX_PAGE_SIZE: int = 100
+    GRAPHQL_MAX_DEPTH: int = 10
+    GRAPHQL_DEFAULT_LIST_SIZE: int = 10
+    GRAPHQL_COST_BUDGETS: Dict[str, int] = {"anonymous": 300, "user": 2000, "admin": 10_000}
+    GRAPHQL_ROLE_CACHE_TTL: int = 300
+
+    # Compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_BURST: int = 100
@@ -93,6 +126,52 @@ class Settings(BaseSettings):
     SECURITY_ALGORITHM: str = "pbkdf2_sha512"
     SECURITY_PASSWORD_HASH: str = "bcrypt"
     SECURITY_PASSWORD_ITERATIONS: int = 100_000
+    BCRYPT_WORKERS: int = 2
+
+    # Service catalog
+    SERVICE_CATALOG_FROM_DB: bool = False
+
+    # Reporting
+    ANALYTICS_CHUNK_SIZE: int = 50_000
+    BUSINESS_HOURS_PER_DAY: int = 8
+    DASHBOARD_RECONCILE_SECONDS: int = 60
+    DASHBOARD_RECONCILER_ENABLED: bool = True  # recount periodically in each app process, not only on expiry
+
+    # Exports
+    EXPORT_BATCH_SIZE: int = 5_000
+
+    # Client import
+    IMPORT_BATCH_SIZE: int = 10_000
+    IMPORT_MAX_REPORTED_ISSUES: int = 1_000
+
+    # Calendar feeds
+    CALENDAR_FEED_PAST_DAYS: int = 30
+    CALENDAR_FEED_MAX_AGE: int = 300
+    CALENDAR_FEED_BATCH_SIZE: int = 1_000
+    CALENDAR_FEED_DOMAIN: str = "appointments.local"  # right-hand side of event UIDs
+
+    # Reminders
+    REMINDERS_ENABLED: bool = False  # run a reminder worker in each app process
+    REMINDER_LEAD_MINUTES: int = 120
+    REMINDER_BACKEND: str = "log"
+    REMINDER_FILE_PATH: str = "reminders.ndjson"
+    REMINDER_POLL_SECONDS: float = 5.0
+    REMINDER_HORIZON_SECONDS: int = 300
+    REMINDER_LEASE_SECONDS: int = 120
+    REMINDER_TICK_SECONDS: float = 1.0
+    REMINDER_BATCH_SIZE: int = 500
+    REMINDER_MAX_ATTEMPTS: int = 5
+    REMINDER_RETRY_SECONDS: float = 30.0
+    REMINDER_RETENTION_DAYS: int = 30
+
+    # Observability
+    TRACING_ENABLED: bool = False
+    TRACING_HEADER: str = "X-Debug-Trace"
+    TRACING_SLOW_RESOLVER_MS: float = 50.0
+    METRICS_ENABLED: bool = True
+    METRICS_MAX_OPERATIONS: int = 200
+    HEALTH_CHECK_TIMEOUT: float = 0.5
+    HEALTH_CACHE_MS: int = 250
 
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -0,0 +1,84 @@
+"""
+Generated converters from ORM objects and result rows to GraphQL types.
+
+``make_converter`` compiles one straight-line function per GraphQL type from a
+field table: each output field reads one attribute and applies one coercion,
+with no per-field helper calls, ``hasattr`` probing or string round trips.
+
+Converters never load anything. For mapped instances they read loaded
+values straight from the instance ``__dict__`` (going through the
+instrumented descriptor for every column costs more than the rest of the
+conversion), and attributes left unloaded, e.g. by ``load_only`` because the
+client did not select the field, convert like ``None``. Converters built with
+``mapped=False`` accept SQLAlchemy ``Row`` objects selected with the mapped
+attribute names as keys; columns missing from the row also convert like
+``None``. A computed field is None when any attribute it reads is missing.
+"""
+from datetime import datetime
+from string import Formatter
+from typing import Any, Callable, Dict, Sequence, Tuple
+import logging
+
+from src.main.models import calculate_appointment_cost
+
+logger = logging.getLogger(__name__)
+
+# Coercion per kind; ``{v}`` is the attribute value
+COERCIONS: Dict[str, str] = {
+    "id": "_str({v}) if {v} is not None else '0'",
+    "text": "_str({v})",
+    "bool": "_bool({v})",
+    "str": "_str({v}) if {v} is not None else ''",  # StrEnum members convert to their value
+    "optional_str": "_str({v}) if {v} is not None else None",
+    "int": "_int({v}) if {v} is not None else 0",
+    "float": "_float({v}) if {v} is not None else 0.0",
+    "datetime": "{v} if {v} is not None else _now()",
+    "raw": "{v}",
+}
+
+def make_converter(
+    cls: type,
+    fields: Dict[str, Tuple[str, str]],
+    computed: Dict[str, str] = None,
+    extra: Sequence[str] = (),
+    mapped: bool = True
+) -> Callable[..., Any]:
+    """Compile ``convert(obj, *extra)`` building ``cls`` from the attributes of ``obj``.
+
+    ``fields`` maps each output field to ``(attribute, kind)``, ``kind`` being a
+    key of ``COERCIONS``. ``computed`` maps output fields to expressions over the
+    local names of already read attributes, evaluated only when all of them
+    are loaded. ``extra`` names converter arguments
+    passed through unchanged (e.g. already converted relationships). ``mapped``
+    selects reading mapped instances or rows (see the module docstring).
+    """
+    lines = [f"def convert(obj{''.join(', ' + name for name in extra)}):"]
+    if mapped:
+        lines.append("    loaded = obj.__dict__")
+    arguments = []
+    for i, (name, (attribute, kind)) in enumerate(fields.items()):
+        if mapped:
+            lines.append(f"    v{i} = loaded.get({attribute!r})")
+        else:
+            lines.append(f"    v{i} = _getattr(obj, {attribute!r}, None)")
+        arguments.append(f"{name}={COERCIONS[kind].format(v=f'v{i}')}")
+    locals_by_attribute = {attribute: f"v{i}" for i, (attribute, _) in enumerate(fields.values())}
+    for name, expression in (computed or {}).items():
+        # Inputs left unloaded mean the field was not selected; skip the computation
+        inputs = [locals_by_attribute[field] for _, field, _, _ in Formatter().parse(expression) if field]
+        guard = " and ".join(f"{local} is not None" for local in dict.fromkeys(inputs)) or "True"
+        arguments.append(f"{name}=({expression.format(**locals_by_attribute)}) if {guard} else None")
+    arguments.extend(f"{name}={name}" for name in extra)
+    lines.append(f"    return _cls({', '.join(arguments)})")
+
+    namespace = {
+        "_cls": cls, "_str": str, "_int": int, "_float": float, "_bool": bool,
+        "_getattr": getattr,
+        "_now": datetime.now, "_cost": calculate_appointment_cost,
+    }
+    source = "\n".join(lines)
+    exec(compile(source, f"<converter {cls.__name__}>", "exec"), namespace)
+    logger.debug(f"Generated converter for {cls.__name__}:\n{source}")
+    return namespace["convert"]
+
+__all__ = ["make_converter", "COERCIONS"]
@@ -0,0 +1,176 @@
+"""
+Dashboard summary served from counters instead of COUNT(*) queries.
+
+The three dashboard numbers live as integer counters in the shared cache.
+Appointment and client mutations adjust them after commit, and a periodic
+reconciliation recounts them from the database in one round trip to correct
+any drift (including appointments that have since started and are no longer
+upcoming). A dashboard poll therefore reads three counters and never touches
+Postgres unless the counters are missing.
+
+Mutations only adjust counters that exist. An expired counter stays missing
+until the next recount instead of restarting from zero as a partial count
+with no expiration.
+"""
+import asyncio
+from datetime import date, datetime, time, timedelta, UTC
+from typing import Optional
+import logging
+
+from sqlalchemy import func, select
+
+from src.main.cache import cache
+from src.main.config import settings
+from src.main.database import async_session
+from src.main.models import Appointment, AppointmentStatus, Client, ClientStatus
+
+logger = logging.getLogger(__name__)
+
+CLIENTS_KEY = "dashboard:clients"
+UPCOMING_KEY = "dashboard:upcoming"
+DAY_KEY_PREFIX = "dashboard:day"
+
+# Appointments in these statuses are not counted on the dashboard
+EXCLUDED_STATUSES = (AppointmentStatus.CANCELLED, AppointmentStatus.DECLINED)
+
+def day_key(day: date) -> str:
+    """Counter key for the number of appointments on a given (UTC) day."""
+    return f"{DAY_KEY_PREFIX}:{day.isoformat()}"
+
+def _as_utc(value: datetime) -> datetime:
+    return value.astimezone(UTC) if value.tzinfo else value.replace(tzinfo=UTC)
+
+class DashboardCounters:
+    """Maintains and serves the dashboard summary counters."""
+
+    def __init__(self):
+        self._reconcile_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def counter_ttl(self) -> int:
+        # Counters outlive a couple of missed reconciliations, then expire so a
+        # stale value is never served forever if the reconciler stops.
+        return settings.DASHBOARD_RECONCILE_SECONDS * 3
+
+    async def get_summary(self) -> dict:
+        """Current dashboard numbers, recounting from the database only if a counter is missing."""
+        counters = await self._counters(datetime.now(UTC).date())
+        if any(value is None for value in counters):
+            return await self.reconcile(only_missing=True)
+        return self._summary(*counters)
+
+    async def _counters(self, today: date) -> list:
+        return await cache.get_counters([CLIENTS_KEY, day_key(today), UPCOMING_KEY])
+
+    @staticmethod
+    def _summary(total_clients: int, todays: int, upcoming: int) -> dict:
+        return {
+            "total_clients": total_clients,
+            "todays_appointments_count": todays,
+            "upcoming_appointments_count": upcoming,
+        }
+
+    async def reconcile(self, only_missing: bool = False) -> dict:
+        """Recount all three numbers from the database and reset the counters.
+
+        With ``only_missing``, counters another caller filled while this one
+        waited for the lock are returned instead, so concurrent polls that
+        all found a counter missing recount only once.
+        """
+        async with self._reconcile_lock:
+            now = datetime.now(UTC)
+            today = now.date()
+            if only_missing:
+                counters = await self._counters(today)
+                if all(value is not None for value in counters):
+                    return self._summary(*counters)
+
+            day_start = datetime.combine(today, time.min, tzinfo=UTC)
+            counted = Appointment.status.notin_(EXCLUDED_STATUSES)
+
+            stmt = select(
+                select(func.count()).select_from(Client)
+                .where(Client.status == ClientStatus.ACTIVE)
+                .scalar_subquery(),
+                select(func.count()).select_from(Appointment)
+                .where(counted)
+                .where(Appointment.startTime >= day_start)
+                .where(Appointment.startTime < day_start + timedelta(days=1))
+                .scalar_subquery(),
+                select(func.count()).select_from(Appointment)
+                .where(counted)
+                .where(Appointment.startTime >= now)
+                .scalar_subquery()
+            )
+            async with async_session() as session:
+                total_clients, todays, upcoming = (await session.execute(stmt)).one()
+
+            await cache.set_counter(CLIENTS_KEY, total_clients, expire_in=self.counter_ttl)
+            await cache.set_counter(day_key(today), todays, expire_in=self.counter_ttl)
+            await cache.set_counter(UPCOMING_KEY, upcoming, expire_in=self.counter_ttl)
+            logger.debug(f"Dashboard reconciled: {total_clients} clients, {todays} today, {upcoming} upcoming")
+            return self._summary(total_clients, todays, upcoming)
+
+    async def _adjust_appointment(self, start_time: datetime, amount: int) -> None:
+        start_time = _as_utc(start_time)
+        now = datetime.now(UTC)
+        # Only today's counter is maintained incrementally; other days are
+        # counted by the reconciliation that runs once they become today.
+        if start_time.date() == now.date():
+            await cache.incr_existing(day_key(now.date()), amount)
+        if start_time >= now:
+            await cache.incr_existing(UPCOMING_KEY, amount)
+
+    async def appointment_added(self, start_time: datetime) -> None:
+        """Count a newly booked appointment."""
+        await self._safely(self._adjust_appointment(start_time, 1))
+
+    async def appointment_removed(self, start_time: datetime) -> None:
+        """Stop counting a deleted or cancelled appointment."""
+        await self._safely(self._adjust_appointment(start_time, -1))
+
+    async def appointment_moved(self, old_start: datetime, new_start: datetime) -> None:
+        """Move an appointment between days and in or out of the upcoming window."""
+        await self.appointment_removed(old_start)
+        await self.appointment_added(new_start)
+
+    async def client_added(self) -> None:
+        """Count a newly created active client."""
+        await self._safely(cache.incr_existing(CLIENTS_KEY, 1))
+
+    async def _safely(self, update) -> None:
+        # Counter updates run after the commit; a cache failure must never fail
+        # the mutation, the next reconciliation repairs the drift.
+        try:
+            await update
+        except Exception as e:
+            logger.error(f"Dashboard counter update failed: {str(e)}")
+
+    async def _run_reconciler(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Dashboard reconciliation failed: {str(e)}")
+            await asyncio.sleep(settings.DASHBOARD_RECONCILE_SECONDS)
+
+    def start(self) -> None:
+        """Start the periodic reconciliation task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_reconciler())
+
+    async def stop(self) -> None:
+        """Stop the periodic reconciliation task."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Global dashboard counters instance
+dashboard = DashboardCounters()
+
+__all__ = ["dashboard", "DashboardCounters"]
@@ -0,0 +1,150 @@
+"""
+Cache of parsed and validated GraphQL documents.
+
+Parsing and validating a query against the schema costs far more CPU than
+resolving most of our fields, yet clients send the same handful of query
+texts over and over. Documents are kept in a bounded LRU keyed by the sha256
+of the query text (so persisted queries and plain queries share entries),
+together with the validation errors for the active rule set. A repeated
+query then costs one hash and one dict lookup before execution starts.
+"""
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from graphql import DocumentNode, GraphQLError
+from strawberry.extensions import SchemaExtension
+
+from src.main.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CachedDocument:
+    """A parsed document and its validation errors per rule set."""
+    document: DocumentNode
+    validation: Dict[tuple, List[GraphQLError]] = field(default_factory=dict)
+
+class DocumentCacheStore:
+    """Bounded LRU of query hash to parsed document, with hit/miss counters."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._documents: "OrderedDict[str, CachedDocument]" = OrderedDict()
+        self.parse_hits = 0
+        self.parse_misses = 0
+        self.validation_hits = 0
+        self.validation_misses = 0
+
+    @staticmethod
+    def key(query: str) -> str:
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    def get_document(self, key: str) -> Optional[DocumentNode]:
+        entry = self._documents.get(key)
+        if entry is None:
+            self.parse_misses += 1
+            return None
+        self._documents.move_to_end(key)
+        self.parse_hits += 1
+        return entry.document
+
+    def put_document(self, key: str, document: DocumentNode) -> None:
+        self._documents[key] = CachedDocument(document)
+        self._documents.move_to_end(key)
+        if len(self._documents) > self.maxsize:
+            self._documents.popitem(last=False)
+
+    def get_errors(self, key: str, rules: tuple) -> Optional[List[GraphQLError]]:
+        entry = self._documents.get(key)
+        errors = entry.validation.get(rules) if entry is not None else None
+        if errors is None:
+            self.validation_misses += 1
+            return None
+        self.validation_hits += 1
+        return list(errors)
+
+    def put_errors(self, key: str, rules: tuple, errors: List[GraphQLError]) -> None:
+        entry = self._documents.get(key)
+        if entry is not None:
+            entry.validation[rules] = list(errors)
+
+    def clear(self) -> None:
+        self._documents.clear()
+        self.parse_hits = self.parse_misses = 0
+        self.validation_hits = self.validation_misses = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @staticmethod
+    def _rate(hits: int, misses: int) -> float:
+        total = hits + misses
+        return hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Counters and hit rates for monitoring."""
+        return {
+            "size": len(self._documents),
+            "maxsize": self.maxsize,
+            "parse_hits": self.parse_hits,
+            "parse_misses": self.parse_misses,
+            "parse_hit_rate": self._rate(self.parse_hits, self.parse_misses),
+            "validation_hits": self.validation_hits,
+            "validation_misses": self.validation_misses,
+            "validation_hit_rate": self._rate(self.validation_hits, self.validation_misses),
+        }
+
+# Global document cache shared by every request in this worker
+document_cache = DocumentCacheStore(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+class DocumentCache(SchemaExtension):
+    """Serve parsing and validation from ``document_cache``.
+
+    Registered as a class (not an instance) so each request gets its own
+    extension object; the store itself is shared. On a miss the normal
+    parse/validate step runs and its result is stored once it returns.
+    """
+
+    store: DocumentCacheStore = document_cache
+
+    def _key(self) -> Optional[str]:
+        query = self.execution_context.query
+        return self.store.key(query) if query else None
+
+    def on_parse(self) -> Iterator[None]:
+        key = self._key()
+        if key is None:
+            yield
+            return
+
+        execution_context = self.execution_context
+        if not execution_context.graphql_document:
+            execution_context.graphql_document = self.store.get_document(key)
+            if execution_context.graphql_document is None:
+                yield
+                # Syntax errors leave no document and are not cached
+                if execution_context.graphql_document is not None:
+                    self.store.put_document(key, execution_context.graphql_document)
+                return
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        key = self._key()
+        execution_context = self.execution_context
+        rules: Tuple = tuple(execution_context.validation_rules)
+        if key is None or execution_context.errors is not None:
+            yield
+            return
+
+        execution_context.errors = self.store.get_errors(key, rules)
+        if execution_context.errors is None:
+            yield
+            if execution_context.errors is not None:
+                self.store.put_errors(key, rules, execution_context.errors)
+            return
+        yield
+
+__all__ = ["DocumentCache", "DocumentCacheStore", "document_cache"]
@@ -0,0 +1,235 @@
+"""
+Streaming exports of service history and appointments for accounting.
+
+``GET /exports/{dataset}`` streams every row whose date falls in
+``[start, end)`` as CSV, NDJSON or (when ``pyarrow`` is installed) Parquet.
+Rows come from a server-side cursor (``AsyncConnection.stream`` with
+``yield_per``) in batches of ``EXPORT_BATCH_SIZE``; each batch is encoded and
+sent before the next is fetched, and Parquet files get one row group per
+batch. Memory use is bounded by the batch size whatever the date range.
+
+Exports are limited to administrators.
+"""
+import csv
+import io
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+from src.main.auth import get_current_user
+from src.main.config import settings
+from src.main.database import async_session, engine
+from src.main.models import Appointment, ServiceHistory, service_catalog
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """One exported column: its header, source and Parquet type."""
+    name: str
+    source: object  # mapped attribute, or None for a column computed from the row
+    arrow_type: str  # "string", "int64", "float64" or "timestamp"
+    compute: Optional[Callable[[Any], object]] = None  # reads the row mapping, keyed by column name
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """A table that can be exported, filtered and ordered by a date column."""
+    model: type
+    date_column: object
+    columns: Tuple[ExportColumn, ...]
+
+    def statement(self, start: datetime, end: datetime):
+        # Labelled with the export names: Core rows are keyed by column, not attribute, names
+        sources = [column.source.label(column.name) for column in self.columns if column.source is not None]
+        return (
+            select(*sources)
+            .where(self.date_column >= start, self.date_column < end)
+            .order_by(self.date_column, self.model.id)
+        )
+
+EXPORTS: Dict[str, ExportDataset] = {
+    "service_history": ExportDataset(
+        model=ServiceHistory,
+        date_column=ServiceHistory.date_of_service,
+        columns=(
+            ExportColumn("id", ServiceHistory.id, "string"),
+            ExportColumn("client_id", ServiceHistory.client_id, "string"),
+            ExportColumn("date_of_service", ServiceHistory.date_of_service, "timestamp"),
+            ExportColumn("service_type", ServiceHistory.service_type, "string"),
+            ExportColumn("provider_name", ServiceHistory.provider_name, "string"),
+            ExportColumn("service_duration", ServiceHistory.service_duration, "int64"),
+            ExportColumn("service_cost", ServiceHistory.service_cost, "float64"),
+            ExportColumn("loyalty_points_earned", ServiceHistory.loyalty_points_earned, "int64"),
+            ExportColumn("points_redeemed", ServiceHistory.points_redeemed, "int64"),
+            ExportColumn("satisfaction_rating", ServiceHistory.satisfaction_rating, "int64"),
+            ExportColumn("package_id", ServiceHistory.package_id, "string"),
+            ExportColumn("notes", ServiceHistory.notes, "string"),
+        )
+    ),
+    "appointments": ExportDataset(
+        model=Appointment,
+        date_column=Appointment.startTime,
+        columns=(
+            ExportColumn("id", Appointment.id, "string"),
+            ExportColumn("start_time", Appointment.startTime, "timestamp"),
+            ExportColumn("end_time", Appointment.end_time, "timestamp"),
+            ExportColumn("duration_minutes", Appointment.durationMinutes, "int64"),
+            ExportColumn("status", Appointment.status, "string"),
+            ExportColumn("service_type", Appointment.serviceType, "string"),
+            ExportColumn("creator_id", Appointment.creatorId, "string"),
+            ExportColumn("title", Appointment.title, "string"),
+            ExportColumn(
+                "estimated_cost", None, "float64",
+                compute=lambda row: round(service_catalog.estimate_cost(row["service_type"], row["duration_minutes"]), 2)
+            ),
+        )
+    ),
+}
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def _records(dataset: ExportDataset, rows: Sequence) -> List[list]:
+    """Export values in column order for a batch of rows."""
+    records = []
+    for row in rows:
+        mapping = row._mapping
+        records.append([
+            column.compute(mapping) if column.compute else _plain(mapping[column.name])
+            for column in dataset.columns
+        ])
+    return records
+
+def _plain(value):
+    # Enum members export as their value
+    return value.value if hasattr(value, "value") else value
+
+async def _batches(dataset: ExportDataset, start: datetime, end: datetime) -> AsyncIterator[List[list]]:
+    statement = dataset.statement(start, end).execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    exported = 0
+    async with engine.connect() as conn:
+        result = await conn.stream(statement)
+        async for rows in result.partitions():
+            exported += len(rows)
+            yield _records(dataset, rows)
+    logger.info(f"Exported {exported} rows from {dataset.model.__tablename__}")
+
+async def stream_csv(dataset: ExportDataset, start: datetime, end: datetime) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.name for column in dataset.columns])
+    async for records in _batches(dataset, start, end):
+        writer.writerows(records)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+async def stream_ndjson(dataset: ExportDataset, start: datetime, end: datetime) -> AsyncIterator[bytes]:
+    names = [column.name for column in dataset.columns]
+    async for records in _batches(dataset, start, end):
+        yield b"".join(orjson.dumps(dict(zip(names, record))) + b"\n" for record in records)
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting bytes until they are drained into the response."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+def _arrow_schema(dataset: ExportDataset):
+    types = {
+        "string": pyarrow.string(),
+        "int64": pyarrow.int64(),
+        "float64": pyarrow.float64(),
+        "timestamp": pyarrow.timestamp("us", tz="UTC"),
+    }
+    return pyarrow.schema([(column.name, types[column.arrow_type]) for column in dataset.columns])
+
+async def stream_parquet(dataset: ExportDataset, start: datetime, end: datetime) -> AsyncIterator[bytes]:
+    schema = _arrow_schema(dataset)
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for records in _batches(dataset, start, end):
+            columns = list(zip(*records))
+            writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+STREAMERS = {"csv": stream_csv, "ndjson": stream_ndjson, "parquet": stream_parquet}
+
+async def require_admin(request: Request) -> None:
+    """Reject requests without an administrator's bearer token."""
+    auth_header = request.headers.get("Authorization", "")
+    if not auth_header.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Authentication required")
+    async with async_session() as session:
+        try:
+            user = await get_current_user(session=session, token=auth_header[7:])
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=401, detail=str(e))
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail="Only administrators can export data")
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+@router.get("/{name}")
+async def export(
+    name: str,
+    request: Request,
+    start: datetime = Query(..., description="Inclusive lower bound of the date column"),
+    end: datetime = Query(..., description="Exclusive upper bound of the date column"),
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$")
+):
+    """Stream a dataset as CSV, NDJSON or Parquet."""
+    dataset = EXPORTS.get(name)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {name}")
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if format == "parquet" and pyarrow is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+    await require_admin(request)
+
+    filename = f"{name}_{start:%Y%m%d}_{end:%Y%m%d}.{format}"
+    return StreamingResponse(
+        STREAMERS[format](dataset, start, end),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+__all__ = ["router", "EXPORTS", "ExportDataset", "ExportColumn", "stream_csv", "stream_ndjson", "stream_parquet"]
@@ -2,8 +2,13 @@
 Main GraphQL schema module that composes queries and mutations.
 """
 import strawberry
+from src.main.document_cache import DocumentCache
+from src.main.metrics import OperationMetrics
+from src.main.query_cost import QueryCostLimiter
+from src.main.tracing import RequestTracing
 from src.main.queries import Query
-from src.main.mutations import AppointmentMutations, ClientMutations, AuthMutations
+from src.main.subscriptions import Subscription
+from src.main.mutations import AppointmentMutations, ClientMutations, AuthMutations, PackageMutations
 from typing import Optional, List
 
 @strawberry.type
@@ -18,9 +23,16 @@ class Mutation:
     clients: ClientMutations = strawberry.field(
         resolver=lambda: ClientMutations()
     )
+    packages: PackageMutations = strawberry.field(
+        resolver=lambda: PackageMutations()
+    )
 
-# Create the schema with both Query and Mutation classes
+# Create the schema with the Query, Mutation and Subscription classes; parsed and
+# validated documents are cached so repeated (and persisted) queries skip both
+# steps, and over-budget operations are rejected before any resolver runs
 schema = strawberry.Schema(
     query=Query,
-    mutation=Mutation
+    mutation=Mutation,
+    subscription=Subscription,
+    extensions=[RequestTracing, OperationMetrics, DocumentCache, QueryCostLimiter]
 )
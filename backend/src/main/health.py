@@ -0,0 +1,117 @@
+"""
+Liveness and readiness checks.
+
+Liveness only proves the event loop is serving requests. Readiness checks the
+dependencies: the connection pool must have a free connection, the database
+must answer ``SELECT 1`` and Redis must answer ``PING``, each within
+``HEALTH_CHECK_TIMEOUT`` seconds. Results are cached for
+``HEALTH_CACHE_MS`` and concurrent probes share one in-flight check, so a
+probe storm costs at most one query and one ping per interval.
+
+Redis is reported but does not affect readiness: the cache falls back to
+process memory when Redis is down.
+"""
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+import logging
+
+from sqlalchemy import text
+
+from src.main.cache import cache
+from src.main.config import settings
+from src.main.database import engine
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HealthStatus:
+    """Result of one round of dependency checks."""
+    database: bool
+    redis: Optional[bool]  # None when Redis is disabled
+    pool_saturated: bool
+    pool_checked_out: int
+    pool_capacity: Optional[int]  # None when overflow is unbounded
+
+    @property
+    def ready(self) -> bool:
+        return self.database and not self.pool_saturated
+
+    def to_dict(self) -> dict:
+        return {"ready": self.ready, **asdict(self)}
+
+class HealthChecker:
+    """Runs dependency checks and caches the result briefly."""
+
+    def __init__(self):
+        self._status: Optional[HealthStatus] = None
+        self._checked_at = 0.0
+        self._pending: Optional[asyncio.Future] = None
+
+    def _pool_usage(self):
+        pool = engine.sync_engine.pool
+        checked_out = pool.checkedout()
+        if settings.DB_MAX_OVERFLOW < 0:
+            return checked_out, None, False
+        capacity = pool.size() + settings.DB_MAX_OVERFLOW
+        return checked_out, capacity, checked_out >= capacity
+
+    async def _check_database(self) -> bool:
+        try:
+            async with asyncio.timeout(settings.HEALTH_CHECK_TIMEOUT):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            return True
+        except Exception as e:
+            logger.warning(f"Database health check failed: {str(e) or type(e).__name__}")
+            return False
+
+    async def _check_redis(self) -> Optional[bool]:
+        if not settings.REDIS_ENABLED:
+            return None
+        if cache.redis is None:
+            return False
+        try:
+            async with asyncio.timeout(settings.HEALTH_CHECK_TIMEOUT):
+                await cache.redis.ping()
+            return True
+        except Exception as e:
+            logger.warning(f"Redis health check failed: {str(e) or type(e).__name__}")
+            return False
+
+    async def _run_checks(self) -> HealthStatus:
+        checked_out, capacity, saturated = self._pool_usage()
+        if saturated:
+            # Waiting for a connection would only add to the queue
+            database = self._status.database if self._status else False
+            redis = await self._check_redis()
+        else:
+            database, redis = await asyncio.gather(self._check_database(), self._check_redis())
+        return HealthStatus(
+            database=database,
+            redis=redis,
+            pool_saturated=saturated,
+            pool_checked_out=checked_out,
+            pool_capacity=capacity
+        )
+
+    async def status(self) -> HealthStatus:
+        """Dependency status, at most ``HEALTH_CACHE_MS`` old."""
+        if self._status is not None and (time.monotonic() - self._checked_at) * 1000 < settings.HEALTH_CACHE_MS:
+            return self._status
+        if self._pending is not None:
+            return await asyncio.shield(self._pending)
+
+        self._pending = asyncio.ensure_future(self._run_checks())
+        try:
+            self._status = await asyncio.shield(self._pending)
+            self._checked_at = time.monotonic()
+            return self._status
+        finally:
+            self._pending = None
+
+# Global health checker instance
+health = HealthChecker()
+
+__all__ = ["health", "HealthChecker", "HealthStatus"]
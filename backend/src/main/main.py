@@ -0,0 +1,114 @@
+"""
+Command line entry points for running the API server.
+
+``start`` runs the production server: one uvicorn worker process per CPU
+(or ``WORKERS``), uvloop and httptools when installed, keep-alive longer than
+the load balancer's idle timeout, a deep accept backlog and graceful draining
+on SIGTERM (in-flight requests get ``GRACEFUL_SHUTDOWN_TIMEOUT`` seconds to
+finish). ``dev`` runs a single auto-reloading worker.
+
+Workers import the app themselves rather than inheriting a preloaded copy:
+the database engine and Redis client are created at import time and their
+connections must not be shared across forked processes. The parent only
+validates the settings before spawning, so a bad configuration fails once
+instead of in every worker.
+
+Each worker also runs the app's background tasks: the dashboard reconciler
+(one recount every ``DASHBOARD_RECONCILE_SECONDS`` per worker) and, with
+``REMINDERS_ENABLED``, a reminder worker. Reminder workers claim messages
+with ``SKIP LOCKED`` and the recount is idempotent, so this is safe, only
+redundant. With many workers, set ``DASHBOARD_RECONCILER_ENABLED=false``
+(counters are then recounted when they expire) and run reminders from
+``scripts/reminder_worker.py`` instead.
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import tempfile
+from typing import Optional
+import logging
+
+import uvicorn
+
+from src.main.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP = "src.main.server:app"
+
+def _loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+def _http() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+def worker_count(workers: Optional[int] = None) -> int:
+    """Requested workers, falling back to ``WORKERS`` and then the CPU count."""
+    return max(workers or settings.WORKERS or os.cpu_count() or 1, 1)
+
+def _prepare_multiprocess_metrics() -> None:
+    # Each worker writes metrics to files in this directory; stale ones must
+    # go so values from a previous run are not aggregated. Only those files:
+    # the directory is operator supplied and may hold anything else
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or tempfile.mkdtemp(prefix="appointment-metrics-")
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=f"Run the {settings.APP_NAME} API server")
+    parser.add_argument("--host", default=settings.HOST, help="Bind address")
+    parser.add_argument("--port", type=int, default=settings.PORT, help="Bind port")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: WORKERS or CPU count)")
+    return parser.parse_args(argv)
+
+def start(argv=None) -> None:
+    """Run the production server."""
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL), format=settings.LOG_FORMAT)
+    args = parse_args(argv)
+    workers = worker_count(args.workers)
+    if workers > 1:
+        _prepare_multiprocess_metrics()
+
+    loop, http = _loop(), _http()
+    logger.info(f"Starting {workers} worker(s) on {args.host}:{args.port} (loop={loop}, http={http})")
+    background = [name for name, enabled in (
+        ("dashboard reconciler", settings.DASHBOARD_RECONCILER_ENABLED),
+        ("reminder worker", settings.REMINDERS_ENABLED),
+    ) if enabled]
+    if workers > 1 and background:
+        logger.info(f"Each worker runs its own {' and '.join(background)}")
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.BACKLOG,
+        timeout_keep_alive=settings.KEEP_ALIVE_TIMEOUT,
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        limit_concurrency=settings.LIMIT_CONCURRENCY,
+        limit_max_requests=settings.MAX_REQUESTS_PER_WORKER,
+        proxy_headers=True,
+        access_log=settings.DEBUG,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+def dev(argv=None) -> None:
+    """Run a single auto-reloading development server."""
+    args = parse_args(argv)
+    uvicorn.run(
+        APP,
+        host=args.host,
+        port=args.port,
+        reload=True,
+        reload_dirs=["src"],
+        log_level="debug" if settings.DEBUG else settings.LOG_LEVEL.lower(),
+    )
+
+if __name__ == "__main__":
+    start()
@@ -0,0 +1,159 @@
+"""
+Prometheus metrics for the API.
+
+Collected series:
+
+* ``http_request_duration_seconds{operation}``: request latency, labelled with
+  the GraphQL operation name (or the route path outside GraphQL)
+* ``http_requests_in_flight``: requests currently being served
+* ``db_pool_size``, ``db_pool_max_overflow``, ``db_pool_checked_out``: pool
+  capacity and usage, maintained from pool checkout/checkin events
+* ``cache_lookups_total{prefix, result}``: cache hits and misses per key
+  prefix; the hit ratio is ``hit / (hit + miss)`` per prefix
+* ``rate_limit_rejections_total``: requests refused by the rate limiter
+* ``bcrypt_queue_depth``: password hashes waiting for or running on the
+  bcrypt thread pool
+
+Label children are created once and reused, so recording a request is a few
+counter increments with no allocations. When ``PROMETHEUS_MULTIPROC_DIR`` is
+set (the launcher does this for ``WORKERS > 1``) every worker writes its
+values to memory-mapped files and ``/metrics`` aggregates all workers.
+"""
+import os
+import time
+from typing import Dict, Iterator, Tuple
+import logging
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from strawberry.extensions import SchemaExtension
+
+from src.main.cache import RedisCache
+from src.main.config import settings
+from src.main.database import engine
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+OTHER_OPERATION = "other"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by GraphQL operation name or route",
+    ["operation"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served",
+    multiprocess_mode="livesum"
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size", multiprocess_mode="livesum")
+DB_POOL_MAX_OVERFLOW = Gauge("db_pool_max_overflow", "Connections allowed beyond the pool size", multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", multiprocess_mode="livesum")
+CACHE_LOOKUPS = Counter("cache_lookups", "Cache lookups by key prefix and result", ["prefix", "result"])
+RATE_LIMIT_REJECTIONS = Counter("rate_limit_rejections", "Requests rejected by the rate limiter")
+BCRYPT_QUEUE_DEPTH = Gauge(
+    "bcrypt_queue_depth",
+    "Password hashes queued or running on the bcrypt thread pool",
+    multiprocess_mode="livesum"
+)
+
+_operation_latency: Dict[str, Histogram] = {}
+_cache_lookups: Dict[Tuple[str, bool], Counter] = {}
+
+def _latency_for(operation: str) -> Histogram:
+    child = _operation_latency.get(operation)
+    if child is None:
+        # Operation names come from clients; cap the label set
+        if len(_operation_latency) >= settings.METRICS_MAX_OPERATIONS:
+            operation = OTHER_OPERATION
+            child = _operation_latency.get(operation)
+        if child is None:
+            child = _operation_latency[operation] = REQUEST_LATENCY.labels(operation)
+    return child
+
+def _record_cache_lookup(key: str, hit: bool) -> None:
+    prefix = key.split(":", 1)[0]
+    child = _cache_lookups.get((prefix, hit))
+    if child is None:
+        child = _cache_lookups[(prefix, hit)] = CACHE_LOOKUPS.labels(prefix, "hit" if hit else "miss")
+    child.inc()
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    DB_POOL_CHECKED_OUT.inc()
+
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    DB_POOL_CHECKED_OUT.dec()
+
+def install_collectors() -> None:
+    """Hook the pool and cache into the metrics."""
+    pool = engine.sync_engine.pool
+    if not event.contains(pool, "checkout", _on_checkout):
+        event.listen(pool, "checkout", _on_checkout)
+        event.listen(pool, "checkin", _on_checkin)
+        DB_POOL_SIZE.set(settings.DB_POOL_SIZE)
+        DB_POOL_MAX_OVERFLOW.set(settings.DB_MAX_OVERFLOW)
+    RedisCache.add_lookup_listener(_record_cache_lookup)
+
+install_collectors()
+
+class OperationMetrics(SchemaExtension):
+    """Label the current request with its GraphQL operation name."""
+
+    def on_operation(self) -> Iterator[None]:
+        yield
+        request = getattr(self.execution_context.context, "request", None)
+        if request is not None:
+            request.state.graphql_operation = self.execution_context.operation_name or "anonymous"
+
+class MetricsMiddleware:
+    """ASGI middleware tracking in-flight requests and latency."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            IN_FLIGHT.dec()
+            operation = state.get("graphql_operation")
+            if operation is None:
+                route = scope.get("route")
+                operation = getattr(route, "path", None) or "unmatched"
+            _latency_for(operation).observe(time.perf_counter() - start)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition-format metrics of this worker, or of all workers in multiprocess mode."""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess files on shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+__all__ = [
+    "MetricsMiddleware", "OperationMetrics", "render_metrics", "mark_worker_dead",
+    "RATE_LIMIT_REJECTIONS", "BCRYPT_QUEUE_DEPTH"
+]
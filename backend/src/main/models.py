@@ -1,4 +1,4 @@
-from sqlalchemy import String, Column, DateTime, Integer, Boolean, Float, ForeignKey, Table, text, func, event
+from sqlalchemy import String, Column, DateTime, Integer, Boolean, Float, ForeignKey, Index, JSON, Table, text, func, event
 from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship, declarative_mixin, declared_attr
 from sqlalchemy.sql.expression import cast
@@ -8,6 +8,8 @@ from sqlalchemy.orm import declarative_base, registry, Session
 from enum import StrEnum
 from datetime import datetime, timezone, UTC, timedelta
 from nanoid import generate
+
+from src.main.service_catalog import ServiceCatalog
 from enum import StrEnum
 import logging
 
@@ -51,51 +53,18 @@ class ServiceType(StrEnum):
 
     @classmethod
     def get_duration_minutes(cls, service: 'ServiceType') -> int:
-        durations = {
-            cls.HAIRCUT: 30,
-            cls.MANICURE: 45,
-            cls.PEDICURE: 60,
-            cls.FACIAL: 60,
-            cls.MASSAGE: 60,
-            cls.HAIRCOLOR: 120,
-            cls.HAIRSTYLE: 45,
-            cls.MAKEUP: 60,
-            cls.WAXING: 30,
-            cls.OTHER: 30
-        }
-        return durations.get(service, 30)
+        return service_catalog.duration_minutes(service)
 
     @classmethod
     def get_base_cost(cls, service: 'ServiceType') -> float:
-        costs = {
-            cls.HAIRCUT: 30.0,
-            cls.MANICURE: 25.0,
-            cls.PEDICURE: 35.0,
-            cls.FACIAL: 65.0,
-            cls.MASSAGE: 75.0,
-            cls.HAIRCOLOR: 100.0,
-            cls.HAIRSTYLE: 45.0,
-            cls.MAKEUP: 55.0,
-            cls.WAXING: 30.0,
-            cls.OTHER: 40.0
-        }
-        return costs.get(service, 40.0)
+        return service_catalog.base_cost(service)
 
     @classmethod
     def get_loyalty_points(cls, service: 'ServiceType') -> int:
-        points = {
-            cls.HAIRCUT: 10,
-            cls.MANICURE: 8,
-            cls.PEDICURE: 12,
-            cls.FACIAL: 15,
-            cls.MASSAGE: 20,
-            cls.HAIRCOLOR: 25,
-            cls.HAIRSTYLE: 12,
-            cls.MAKEUP: 15,
-            cls.WAXING: 10,
-            cls.OTHER: 10
-        }
-        return points.get(service, 10)
+        return service_catalog.loyalty_points(service)
+
+# Durations, prices and points for every service, built once at import
+service_catalog = ServiceCatalog(ServiceType)
 
 def generate_nanoid():
     return generate(size=21)
@@ -106,7 +75,7 @@ Base = declarative_base()
 @declarative_mixin
 class TimestampMixin:
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     def touch(self):
         self.updated_at = datetime.now(UTC)
@@ -134,6 +103,8 @@ class User(TimestampMixin, Base):
     last_name = Column(String)
     enabled = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
+    # Part of the calendar feed token; bumping it revokes every issued feed URL
+    calendar_feed_version = Column(Integer, nullable=False, default=0, server_default=text("0"))
 
     created_appointments = relationship(
         "Appointment",
@@ -235,6 +206,16 @@ class ServiceHistory(TimestampMixin, Base):
     client = relationship("Client", back_populates="service_history")
     package = relationship("ServicePackage", back_populates="service_history")
 
+class ServiceCatalogEntry(TimestampMixin, Base):
+    """Editable price list overriding the built-in service catalog defaults."""
+    __tablename__ = "service_catalog"
+    __table_args__ = {'extend_existing': True}
+
+    service_type = Column(String(50), primary_key=True)
+    duration_minutes = Column(Integer, nullable=False)
+    base_cost = Column(Float, nullable=False)
+    loyalty_points = Column(Integer, nullable=False, default=0)
+
 class ServicePackage(TimestampMixin, Base):
     __tablename__ = "service_packages"
     __table_args__ = {'extend_existing': True}
@@ -253,7 +234,36 @@ class ServicePackage(TimestampMixin, Base):
     last_session_date = Column(DateTime(timezone=True), nullable=True)
     average_satisfaction = Column(Float, nullable=True)
 
+class OutboxMessage(TimestampMixin, Base):
+    """Message written in the same transaction as the change it announces, sent later by a worker."""
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        Index(
+            "ix_outbox_messages_pending", "topic", "available_at",
+            postgresql_where=text("delivered_at IS NULL AND cancelled_at IS NULL")
+        ),
+        Index("ix_outbox_messages_aggregate", "aggregate_id"),
+        {'extend_existing': True}
+    )
+
+    id = Column(String(21), primary_key=True, default=generate_nanoid)
+    topic = Column(String(50), nullable=False)
+    aggregate_id = Column(String(21), nullable=False)
+    payload = Column(JSON, nullable=False)
+    available_at = Column(DateTime(timezone=True), nullable=False)
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String(500), nullable=True)
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
+
 def calculate_appointment_cost(service_type: Union[ServiceType, Column], duration_minutes: Union[int, Column]) -> Union[float, Column, Cast]:
+    # Plain values: a single catalog lookup
+    if isinstance(service_type, str) and isinstance(duration_minutes, (int, float)):
+        if service_type not in service_catalog:
+            ServiceType(service_type)  # Raises for unknown services
+        return service_catalog.estimate_cost(service_type, duration_minutes)
+
     # Handle SQL expression case
     if hasattr(service_type, 'is_clause_element'):
         base_cost = 40.0  # Default cost for SQL expressions
@@ -261,37 +271,28 @@ def calculate_appointment_cost(service_type: Union[ServiceType, Column], duratio
         # Return the SQL expression directly as a Column type
         return cast(base_cost * cast(duration_minutes, Float) / default_duration, Float)
 
-    # Handle direct value case
+    # Service value with a SQL duration expression
     service_instance = service_type if isinstance(service_type, ServiceType) else ServiceType(service_type)
     base_cost = ServiceType.get_base_cost(service_instance)
     default_duration = ServiceType.get_duration_minutes(service_instance)
+    return cast(base_cost * cast(duration_minutes, Float) / default_duration, Float)
 
-    if hasattr(duration_minutes, 'is_clause_element'):
-        # Return the SQL expression directly as a Column type
-        return cast(base_cost * cast(duration_minutes, Float) / default_duration, Float)
-
-    # Handle numeric value case
-    if hasattr(duration_minutes, 'is_clause_element'):
-        # Already handled above
-        return cast(base_cost * cast(duration_minutes, Float) / default_duration, Float)
-    else:
-        # Direct numeric value comparison is safe here
-        if isinstance(duration_minutes, int) or isinstance(duration_minutes, float):
-            duration_numeric = float(duration_minutes)
-            if duration_numeric != default_duration:
-                return float(base_cost * (duration_numeric / default_duration))
-            return float(base_cost)
-        else:
-            # This should not happen due to the checks above, but adding as a fallback
-            return cast(base_cost * cast(duration_minutes, Float) / default_duration, Float)
+# Upper bound on appointment length; lets overlap checks bound start_time on
+# both sides so a partitioned appointments table prunes to one or two months.
+MAX_APPOINTMENT_DURATION = timedelta(hours=24)
 
 def validate_appointment(mapper, connection, target):
-    target.end_time = target.startTime + timedelta(minutes=target.durationMinutes)
+    # Longer appointments would escape the bounded overlap check below
+    duration = timedelta(minutes=target.durationMinutes)
+    if not timedelta(0) < duration <= MAX_APPOINTMENT_DURATION:
+        raise ValueError(f"Duration must be between 1 minute and {MAX_APPOINTMENT_DURATION.total_seconds() / 3600:.0f} hours")
+    target.end_time = target.startTime + duration
 
     # Check for overlapping appointments
     stmt = text("""
         SELECT COUNT(1) FROM appointments
         WHERE status != :cancelled
+        AND start_time > :window_start
         AND (:start_time < end_time AND :end_time > start_time)
         AND id != :id
     """)
@@ -299,6 +300,7 @@ def validate_appointment(mapper, connection, target):
         stmt,
         {
             'cancelled': AppointmentStatus.CANCELLED.value,
+            'window_start': target.startTime - MAX_APPOINTMENT_DURATION,
             'start_time': target.startTime,
             'end_time': target.end_time,
             'id': target.id or ''
@@ -13,15 +13,22 @@ from src.main.models import (
     ClientCategory, ClientStatus, ServicePackage, calculate_appointment_cost
 )
 from src.main.auth import (
-    check_auth, create_token, TokenType, get_password_hash, verify_password
+    check_auth, create_token, TokenType, get_password_hash_async, verify_password_async
 )
 from src.main.typing import CustomContext
 from src.main.database import async_session
 from src.main.schema_types import (
     AppointmentInput, AppointmentType, ClientInput, ClientType,
     MutationResponse, ValidationError, LoginSuccess, LoginError, LoginResult,
-    UserType
+    UserType, ServiceRecordInput, USER_PROJECTION
 )
+from src.main.projection import field_selections
+from src.main.service_completion import complete_appointment, record_service
+from src.main.dashboard import dashboard
+from src.main.broadcast import appointment_event, appointment_events
+from src.main.calendar_feed import rotate_feed_token
+from src.main.outbox import cancel_reminders, schedule_reminder
+from src.main.packages import redeem_package_session
 
 logger = logging.getLogger(__name__)
 
@@ -45,40 +52,30 @@ class AuthMutations:
 
             async with async_session() as session:
                 async with session.begin():
-                    # Use proper async SQLAlchemy query with explicit field selection
-                    query = select(
-                        User.id,
-                        User.username,
-                        User.password,
-                        User.enabled,
-                        User.is_admin
-                    ).where(User.username == username)
-                    result = await session.execute(query)
-                    row = result.one_or_none()
+                    # One query for the credentials and the user fields the client selected
+                    query = select(User).where(User.username == username).options(
+                        *USER_PROJECTION.load_options(
+                            field_selections(info, "user"), also=("password", "enabled")
+                        )
+                    )
+                    user = (await session.execute(query)).scalar_one_or_none()
 
-                    if not row:
+                    if not user:
                         logger.warning(f"User not found: {username}")
                         return LoginError(message="Invalid username or password")
 
-                    # Access fields directly from the row tuple
-                    user_id, _, stored_password, enabled, is_admin = row
-
                     # Check account status
-                    if not enabled:
+                    if not user.enabled:
                         logger.warning(f"Disabled account attempt: {username}")
                         return LoginError(message="Account is disabled")
 
                     # Verify password
-                    if not verify_password(password, str(stored_password)):
+                    if not await verify_password_async(password, str(user.password)):
                         logger.warning(f"Invalid password for user: {username}")
                         return LoginError(message="Invalid username or password")
 
                     # Generate token
-                    token = await create_token(str(user_id), TokenType.ACCESS)
-
-                    # Get complete user object for the response
-                    user_query = select(User).where(User.id == user_id)
-                    user = (await session.execute(user_query)).scalar_one()
+                    token = await create_token(str(user.id), TokenType.ACCESS)
 
                     logger.info(f"Login successful for user: {username}")
                     return LoginSuccess(token=token, user=UserType.from_db(user))
@@ -109,7 +106,7 @@ class AuthMutations:
                         return LoginError(message="Username already exists")
 
                     # Create new user with correct field names matching the model
-                    hashed_password = get_password_hash(password)
+                    hashed_password = await get_password_hash_async(password)
                     user_data = {
                         'username': username,
                         'password': hashed_password,
@@ -130,6 +127,14 @@ class AuthMutations:
             logger.error(f"Registration error: {str(e)}")
             return LoginError(message="An error occurred during registration")
 
+    @strawberry.mutation
+    async def reset_calendar_feed_url(self, info: Info[CustomContext, None]) -> str:
+        """Revoke the current user's calendar feed URLs and return the new one."""
+        current_user = await check_auth(info)
+        async with async_session() as session:
+            async with session.begin():
+                return await rotate_feed_token(session, str(current_user.id))
+
 @strawberry.type
 class AppointmentMutations:
     """Namespace for appointment-related mutations."""
@@ -152,17 +157,21 @@ class AppointmentMutations:
                     appointment_data = {
                         'title': input.title,
                         'description': input.description,
-                        'start_time': input.start_time,
-                        'duration_minutes': input.duration_minutes,
-                        'service_type': ServiceType(input.service_type),
-                        'creator_id': creator_id,
+                        'startTime': input.start_time,
+                        'durationMinutes': input.duration_minutes,
+                        'serviceType': ServiceType(input.service_type),
+                        'creatorId': creator_id,
                         'status': AppointmentStatus.SCHEDULED
                     }
                     appointment = Appointment(**appointment_data)
                     session.add(appointment)
                     await session.flush()
+                    event = await appointment_event(session, appointment, "CREATED")
+                    await schedule_reminder(session, appointment, [event.creator_id], replace=False)
 
-                    return MutationResponse(success=True, errors=[])
+            await dashboard.appointment_added(input.start_time)
+            await appointment_events.publish(event)
+            return MutationResponse(success=True, errors=[])
         except Exception as e:
             logger.error(f"Error creating appointment: {str(e)}")
             return MutationResponse(
@@ -198,7 +207,7 @@ class AppointmentMutations:
 
                     # Compare with SQLAlchemy values properly converted
                     current_user_id = current_user.id.scalar_value() if hasattr(current_user.id, 'scalar_value') else current_user.id
-                    creator_id = appointment.creator_id.scalar_value() if hasattr(appointment.creator_id, 'scalar_value') else appointment.creator_id
+                    creator_id = appointment.creatorId
                     is_admin = current_user.is_admin.scalar_value() if hasattr(current_user.is_admin, 'scalar_value') else current_user.is_admin
 
                     if not bool(is_admin) and str(creator_id) != str(current_user_id):
@@ -210,19 +219,28 @@ class AppointmentMutations:
                             )]
                         )
 
+                    previous_start = appointment.startTime
+                    counted = appointment.status not in (AppointmentStatus.CANCELLED, AppointmentStatus.DECLINED)
+
                     # Update fields using setattr
                     update_data = {
                         'title': input.title,
                         'description': input.description,
-                        'start_time': input.start_time,
-                        'duration_minutes': input.duration_minutes,
-                        'service_type': ServiceType(input.service_type)
+                        'startTime': input.start_time,
+                        'durationMinutes': input.duration_minutes,
+                        'serviceType': ServiceType(input.service_type)
                     }
                     for key, value in update_data.items():
                         setattr(appointment, key, value)
 
                     await session.flush()
-                    return MutationResponse(success=True, errors=[])
+                    event = await appointment_event(session, appointment, "UPDATED", previous_start)
+                    await schedule_reminder(session, appointment, [event.creator_id, *event.attendee_ids])
+
+            if counted and previous_start != input.start_time:
+                await dashboard.appointment_moved(previous_start, input.start_time)
+            await appointment_events.publish(event)
+            return MutationResponse(success=True, errors=[])
         except Exception as e:
             logger.error(f"Error updating appointment: {str(e)}")
             return MutationResponse(
@@ -256,7 +274,7 @@ class AppointmentMutations:
                         )
                     # Compare with SQLAlchemy values properly converted
                     current_user_id = current_user.id.scalar_value() if hasattr(current_user.id, 'scalar_value') else current_user.id
-                    creator_id = appointment.creator_id.scalar_value() if hasattr(appointment.creator_id, 'scalar_value') else appointment.creator_id
+                    creator_id = appointment.creatorId
                     is_admin = current_user.is_admin.scalar_value() if hasattr(current_user.is_admin, 'scalar_value') else current_user.is_admin
 
                     if not bool(is_admin) and str(creator_id) != str(current_user_id):
@@ -268,8 +286,16 @@ class AppointmentMutations:
                             )]
                         )
 
+                    start_time = appointment.startTime
+                    counted = appointment.status not in (AppointmentStatus.CANCELLED, AppointmentStatus.DECLINED)
+                    event = await appointment_event(session, appointment, "DELETED")
+                    await cancel_reminders(session, appointment.id)
                     await session.delete(appointment)
-                    return MutationResponse(success=True, errors=[])
+
+            if counted:
+                await dashboard.appointment_removed(start_time)
+            await appointment_events.publish(event)
+            return MutationResponse(success=True, errors=[])
         except Exception as e:
             logger.error(f"Error deleting appointment: {str(e)}")
             return MutationResponse(
@@ -280,6 +306,61 @@ class AppointmentMutations:
                 )]
             )
 
+    @strawberry.mutation
+    async def complete_appointment(
+        self,
+        info: Info[CustomContext, None],
+        id: strawberry.ID,
+        provider_name: Optional[str] = None
+    ) -> MutationResponse:
+        """Mark an appointment as completed and record the service for its clients."""
+        current_user = await check_auth(info)
+
+        # Completion credits visits, spend and loyalty points, like recordService
+        is_admin = current_user.is_admin.scalar_value() if hasattr(current_user.is_admin, 'scalar_value') else current_user.is_admin
+        if not bool(is_admin):
+            return MutationResponse(
+                success=False,
+                errors=[ValidationError(
+                    field="permission",
+                    message="Only administrators can complete appointments"
+                )]
+            )
+
+        try:
+            async with async_session() as session:
+                async with session.begin():
+                    appointment = await session.get(Appointment, id)
+                    if not appointment:
+                        return MutationResponse(
+                            success=False,
+                            errors=[ValidationError(
+                                field="id",
+                                message="Appointment not found"
+                            )]
+                        )
+
+                    provider = provider_name or " ".join(
+                        part for part in (current_user.first_name, current_user.last_name) if part
+                    ) or str(current_user.username)
+                    if await complete_appointment(session, appointment, provider) is None:
+                        # Already completed: nothing changed, so nothing to announce
+                        return MutationResponse(success=True, errors=[])
+                    event = await appointment_event(session, appointment, "COMPLETED")
+                    await cancel_reminders(session, appointment.id)
+
+            await appointment_events.publish(event)
+            return MutationResponse(success=True, errors=[])
+        except Exception as e:
+            logger.error(f"Error completing appointment: {str(e)}")
+            return MutationResponse(
+                success=False,
+                errors=[ValidationError(
+                    field="appointment",
+                    message=str(e)
+                )]
+            )
+
 @strawberry.type
 class ClientMutations:
     """Namespace for client-related mutations."""
@@ -311,7 +392,8 @@ class ClientMutations:
                     session.add(client)
                     await session.flush()
 
-                    return MutationResponse(success=True, errors=[])
+            await dashboard.client_added()
+            return MutationResponse(success=True, errors=[])
         except Exception as e:
             logger.error(f"Error creating client: {str(e)}")
             return MutationResponse(
@@ -424,3 +506,115 @@ class ClientMutations:
                     message=str(e)
                 )]
             )
+
+    @strawberry.mutation
+    async def record_service(
+        self,
+        info: Info[CustomContext, None],
+        client_id: strawberry.ID,
+        input: ServiceRecordInput
+    ) -> MutationResponse:
+        """Record a completed service and update the client's loyalty aggregates."""
+        current_user = await check_auth(info)
+
+        # Clients must not record (or price) their own services
+        is_admin = current_user.is_admin.scalar_value() if hasattr(current_user.is_admin, 'scalar_value') else current_user.is_admin
+        if not bool(is_admin):
+            return MutationResponse(
+                success=False,
+                errors=[ValidationError(
+                    field="permission",
+                    message="Only administrators can record services"
+                )]
+            )
+
+        try:
+            async with async_session() as session:
+                async with session.begin():
+                    client = await session.get(Client, client_id)
+                    if not client:
+                        return MutationResponse(
+                            success=False,
+                            errors=[ValidationError(
+                                field="clientId",
+                                message="Client not found"
+                            )]
+                        )
+
+                    await record_service(
+                        session,
+                        str(client_id),
+                        service_type=ServiceType(input.service_type),
+                        provider_name=input.provider_name,
+                        date_of_service=input.date_of_service,
+                        service_cost=input.service_cost,
+                        service_duration=input.service_duration,
+                        points_redeemed=input.points_redeemed,
+                        satisfaction_rating=input.satisfaction_rating,
+                        feedback=input.feedback,
+                        notes=input.notes
+                    )
+                    return MutationResponse(success=True, errors=[])
+        except Exception as e:
+            logger.error(f"Error recording service: {str(e)}")
+            return MutationResponse(
+                success=False,
+                errors=[ValidationError(
+                    field="service",
+                    message=str(e)
+                )]
+            )
+
+@strawberry.type
+class PackageMutations:
+    """Namespace for service package mutations."""
+
+    @strawberry.mutation
+    async def redeem_package_session(
+        self,
+        info: Info[CustomContext, None],
+        package_id: strawberry.ID,
+        provider_name: Optional[str] = None,
+        satisfaction_rating: Optional[int] = None,
+        feedback: Optional[str] = None,
+        notes: Optional[str] = None
+    ) -> MutationResponse:
+        """Redeem one session of a service package."""
+        current_user = await check_auth(info)
+
+        # Redemptions credit visits and loyalty points, like recordService
+        is_admin = current_user.is_admin.scalar_value() if hasattr(current_user.is_admin, 'scalar_value') else current_user.is_admin
+        if not bool(is_admin):
+            return MutationResponse(
+                success=False,
+                errors=[ValidationError(
+                    field="permission",
+                    message="Only administrators can redeem package sessions"
+                )]
+            )
+
+        try:
+            provider = provider_name or " ".join(
+                part for part in (current_user.first_name, current_user.last_name) if part
+            ) or str(current_user.username)
+
+            async with async_session() as session:
+                async with session.begin():
+                    await redeem_package_session(
+                        session,
+                        str(package_id),
+                        provider_name=provider,
+                        satisfaction_rating=satisfaction_rating,
+                        feedback=feedback,
+                        notes=notes
+                    )
+            return MutationResponse(success=True, errors=[])
+        except Exception as e:
+            logger.error(f"Error redeeming package session: {str(e)}")
+            return MutationResponse(
+                success=False,
+                errors=[ValidationError(
+                    field="package",
+                    message=str(e)
+                )]
+            )
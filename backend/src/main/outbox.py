@@ -0,0 +1,364 @@
+"""
+Transactional outbox and the worker that sends appointment reminders.
+
+Appointment mutations never talk to a delivery channel. They add an
+``OutboxMessage`` for the reminder in the same transaction as the booking
+(``schedule_reminder``), available at ``REMINDER_LEAD_MINUTES`` before the
+start, and cancel it when the appointment moves, is cancelled or is deleted.
+A reminder therefore exists exactly when its appointment was committed, and
+booking only pays for one extra INSERT.
+
+``ReminderWorker`` drains the outbox. Every ``REMINDER_POLL_SECONDS`` it
+claims the reminders due within ``REMINDER_HORIZON_SECONDS`` with
+``SELECT ... FOR UPDATE SKIP LOCKED``, leasing them so concurrent workers
+(in other processes or on other hosts) split the work instead of colliding,
+and puts them on a hashed timer wheel keyed on their due time. Each tick
+fires the due slot. Its reminders are first marked in flight (a short lease
+of ``REMINDER_LEASE_SECONDS``) in a transaction of their own, which skips
+any cancelled in the meantime, and only then handed to the delivery backend,
+with no transaction or row lock held while a slow channel is awaited. A
+final transaction records each outcome. Failed deliveries are retried with
+exponential backoff up to ``REMINDER_MAX_ATTEMPTS``; reminders of a worker
+that dies are claimed again by another once their lease runs out. Delivery
+is at least once.
+
+Delivery backends are pluggable (``register_delivery_backend``); ``log`` and
+``file`` (one JSON line per reminder) stand in for email or SMS.
+"""
+from abc import ABC, abstractmethod
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+import logging
+
+import orjson
+from sqlalchemy import delete, or_, select, update
+
+from src.main.config import settings
+from src.main.database import async_session
+from src.main.models import Appointment, AppointmentStatus, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+REMINDER_TOPIC = "appointment.reminder"
+
+# Appointments still worth a reminder
+REMINDED_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED)
+
+@dataclass(frozen=True)
+class Reminder:
+    """What a reminder tells its recipients."""
+    appointment_id: str
+    title: str
+    start_time: datetime
+    service_type: str
+    recipient_ids: List[str]
+
+    def to_payload(self) -> dict:
+        return {**asdict(self), "start_time": self.start_time.isoformat()}
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "Reminder":
+        return cls(**{**payload, "start_time": datetime.fromisoformat(payload["start_time"])})
+
+async def cancel_reminders(session, appointment_id: str) -> None:
+    """Cancel the undelivered reminders of an appointment, in the caller's transaction."""
+    await session.execute(
+        update(OutboxMessage)
+        .where(
+            OutboxMessage.aggregate_id == appointment_id,
+            OutboxMessage.topic == REMINDER_TOPIC,
+            OutboxMessage.delivered_at.is_(None),
+            OutboxMessage.cancelled_at.is_(None)
+        )
+        .values(cancelled_at=datetime.now(UTC))
+        .execution_options(synchronize_session=False)
+    )
+
+async def schedule_reminder(
+    session,
+    appointment: Appointment,
+    recipient_ids: Sequence[str],
+    replace: bool = True,
+    now: Optional[datetime] = None
+) -> Optional[OutboxMessage]:
+    """Add the reminder of ``appointment`` to the outbox, in the caller's transaction.
+
+    With ``replace``, reminders scheduled earlier for the appointment are
+    cancelled first. Appointments that are past or no longer scheduled or
+    confirmed get no reminder; ones starting within the lead time are
+    reminded right away.
+    """
+    if replace:
+        await cancel_reminders(session, appointment.id)
+    now = now or datetime.now(UTC)
+    if appointment.status not in REMINDED_STATUSES or appointment.startTime <= now:
+        return None
+
+    reminder = Reminder(
+        appointment_id=appointment.id,
+        title=appointment.title,
+        start_time=appointment.startTime,
+        service_type=str(appointment.serviceType),
+        recipient_ids=list(dict.fromkeys(recipient_ids))
+    )
+    message = OutboxMessage(
+        topic=REMINDER_TOPIC,
+        aggregate_id=appointment.id,
+        payload=reminder.to_payload(),
+        available_at=max(appointment.startTime - timedelta(minutes=settings.REMINDER_LEAD_MINUTES), now),
+        attempts=0
+    )
+    session.add(message)
+    return message
+
+class DeliveryBackend(ABC):
+    """Sends reminders to their recipients."""
+
+    @abstractmethod
+    async def deliver(self, reminder: Reminder) -> None:
+        """Send one reminder; raising marks it for a retry."""
+
+    async def close(self) -> None:
+        pass
+
+class LogDeliveryBackend(DeliveryBackend):
+    """Logs reminders instead of sending them."""
+
+    async def deliver(self, reminder: Reminder) -> None:
+        logger.info(
+            f"Reminder for appointment {reminder.appointment_id} ({reminder.title}) at "
+            f"{reminder.start_time.isoformat()} to {', '.join(reminder.recipient_ids)}"
+        )
+
+class FileDeliveryBackend(DeliveryBackend):
+    """Appends reminders to a file, one JSON object per line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    async def deliver(self, reminder: Reminder) -> None:
+        # Keep blocking file I/O off the event loop
+        await asyncio.to_thread(self._append, orjson.dumps(reminder.to_payload()) + b"\n")
+
+    def _append(self, line: bytes) -> None:
+        with self.path.open("ab") as file:
+            file.write(line)
+
+DELIVERY_BACKENDS: Dict[str, Callable[[], DeliveryBackend]] = {
+    "log": LogDeliveryBackend,
+    "file": lambda: FileDeliveryBackend(settings.REMINDER_FILE_PATH),
+}
+
+def register_delivery_backend(name: str, factory: Callable[[], DeliveryBackend]) -> None:
+    """Make a delivery backend selectable with ``REMINDER_BACKEND``."""
+    DELIVERY_BACKENDS[name] = factory
+
+def get_delivery_backend(name: str) -> DeliveryBackend:
+    try:
+        return DELIVERY_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown reminder backend: {name}")
+
+class TimerWheel:
+    """Hashed timing wheel of ``slots`` buckets, each covering ``tick`` seconds.
+
+    Scheduling and cancelling are O(1); advancing only looks at the buckets
+    of the ticks that passed. Timers further out than one revolution wait in
+    their bucket for later rounds; timers already due fire on the next advance.
+    """
+
+    def __init__(self, tick: float, slots: int, now: float):
+        self.tick = tick
+        self.slots: List[Dict[Hashable, Tuple[int, object]]] = [{} for _ in range(slots)]
+        self.position = int(now // tick)  # first tick not yet fired
+        self._slot_of: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def schedule(self, key: Hashable, when: float, item: object) -> None:
+        self.cancel(key)
+        tick = max(int(when // self.tick), self.position)
+        slot = tick % len(self.slots)
+        self.slots[slot][key] = (tick, item)
+        self._slot_of[key] = slot
+
+    def cancel(self, key: Hashable) -> None:
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+
+    def advance(self, now: float) -> List[object]:
+        """Remove and return the items due at ``now``."""
+        target = int(now // self.tick)
+        due = []
+        for offset in range(min(target - self.position + 1, len(self.slots))):
+            bucket = self.slots[(self.position + offset) % len(self.slots)]
+            for key, (tick, item) in list(bucket.items()):
+                if tick <= target:
+                    due.append(item)
+                    del bucket[key]
+                    del self._slot_of[key]
+        self.position = max(self.position, target + 1)
+        return due
+
+class ReminderWorker:
+    """Claims due reminders from the outbox and delivers them on time."""
+
+    def __init__(self, backend: Optional[DeliveryBackend] = None):
+        self.backend = backend or get_delivery_backend(settings.REMINDER_BACKEND)
+        tick = settings.REMINDER_TICK_SECONDS
+        self.wheel = TimerWheel(tick, int(settings.REMINDER_HORIZON_SECONDS / tick) + 1, time.time())
+        self._task: Optional[asyncio.Task] = None
+        self._next_purge = 0.0
+
+    async def claim(self) -> int:
+        """Lease the reminders due within the horizon and put them on the wheel."""
+        now = datetime.now(UTC)
+        horizon = timedelta(seconds=settings.REMINDER_HORIZON_SECONDS)
+        pending = (
+            select(OutboxMessage.id)
+            .where(
+                OutboxMessage.topic == REMINDER_TOPIC,
+                OutboxMessage.delivered_at.is_(None),
+                OutboxMessage.cancelled_at.is_(None),
+                OutboxMessage.available_at <= now + horizon,
+                or_(OutboxMessage.claimed_until.is_(None), OutboxMessage.claimed_until < now)
+            )
+            .order_by(OutboxMessage.available_at)
+            .limit(settings.REMINDER_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session() as session:
+            async with session.begin():
+                claimed = (await session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_(pending.scalar_subquery()))
+                    .values(claimed_until=now + horizon + timedelta(seconds=settings.REMINDER_LEASE_SECONDS))
+                    .returning(OutboxMessage.id, OutboxMessage.available_at)
+                    .execution_options(synchronize_session=False)
+                )).all()
+        for message_id, available_at in claimed:
+            self.wheel.schedule(message_id, available_at.timestamp(), message_id)
+        return len(claimed)
+
+    async def deliver(self, message_ids: Sequence[str]) -> int:
+        """Deliver the given claimed reminders unless they were cancelled; returns how many were sent."""
+        now = datetime.now(UTC)
+        # Mark in flight and commit before sending, so no lock is held meanwhile
+        async with async_session() as session:
+            async with session.begin():
+                in_flight = (await session.execute(
+                    update(OutboxMessage)
+                    .where(
+                        OutboxMessage.id.in_(message_ids),
+                        OutboxMessage.delivered_at.is_(None),
+                        OutboxMessage.cancelled_at.is_(None),
+                        OutboxMessage.claimed_until >= now  # lease not lapsed to another worker
+                    )
+                    .values(claimed_until=now + timedelta(seconds=settings.REMINDER_LEASE_SECONDS))
+                    .returning(OutboxMessage.id, OutboxMessage.payload)
+                    .execution_options(synchronize_session=False)
+                )).all()
+
+        delivered: List[str] = []
+        failed: Dict[str, Exception] = {}
+        for message_id, payload in in_flight:
+            try:
+                await self.backend.deliver(Reminder.from_payload(payload))
+                delivered.append(message_id)
+            except Exception as e:
+                failed[message_id] = e
+
+        now = datetime.now(UTC)
+        async with async_session() as session:
+            async with session.begin():
+                if delivered:
+                    await session.execute(
+                        update(OutboxMessage)
+                        .where(OutboxMessage.id.in_(delivered))
+                        .values(delivered_at=now, claimed_until=None)
+                        .execution_options(synchronize_session=False)
+                    )
+                if failed:
+                    for message in await session.scalars(
+                        select(OutboxMessage).where(OutboxMessage.id.in_(list(failed)))
+                    ):
+                        self._failed(message, failed[message.id], now)
+        return len(delivered)
+
+    def _failed(self, message: OutboxMessage, error: Exception, now: datetime) -> None:
+        message.attempts += 1
+        message.last_error = str(error)[:500]
+        message.claimed_until = None
+        if message.attempts >= settings.REMINDER_MAX_ATTEMPTS:
+            message.cancelled_at = now
+            logger.error(f"Giving up on reminder {message.id} after {message.attempts} attempts: {str(error)}")
+        else:
+            retry_in = settings.REMINDER_RETRY_SECONDS * 2 ** (message.attempts - 1)
+            message.available_at = now + timedelta(seconds=retry_in)
+            logger.warning(f"Reminder {message.id} failed, retrying in {retry_in:.0f}s: {str(error)}")
+
+    async def purge(self) -> None:
+        """Delete messages delivered or cancelled longer ago than the retention period."""
+        cutoff = datetime.now(UTC) - timedelta(days=settings.REMINDER_RETENTION_DAYS)
+        async with async_session() as session:
+            async with session.begin():
+                await session.execute(
+                    delete(OutboxMessage)
+                    .where(or_(OutboxMessage.delivered_at < cutoff, OutboxMessage.cancelled_at < cutoff))
+                    .execution_options(synchronize_session=False)
+                )
+
+    async def run(self) -> None:
+        """Claim and deliver reminders until cancelled."""
+        next_poll = 0.0
+        while True:
+            try:
+                now = time.time()
+                if now >= next_poll:
+                    next_poll = now + settings.REMINDER_POLL_SECONDS
+                    claimed = await self.claim()
+                    if claimed:
+                        logger.debug(f"Claimed {claimed} reminders, {len(self.wheel)} pending")
+                if now >= self._next_purge:
+                    self._next_purge = now + 3600
+                    await self.purge()
+                due = self.wheel.advance(now)
+                if due:
+                    delivered = await self.deliver(due)
+                    logger.info(f"Delivered {delivered} of {len(due)} due reminders")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reminder worker iteration failed: {str(e)}")
+            await asyncio.sleep(settings.REMINDER_TICK_SECONDS)
+
+    def start(self) -> None:
+        """Start delivering reminders in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Stop the worker; claimed reminders are picked up again once their lease ends."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.backend.close()
+
+__all__ = [
+    "REMINDER_TOPIC", "Reminder", "schedule_reminder", "cancel_reminders",
+    "DeliveryBackend", "LogDeliveryBackend", "FileDeliveryBackend",
+    "register_delivery_backend", "get_delivery_backend", "TimerWheel", "ReminderWorker"
+]
@@ -0,0 +1,146 @@
+"""
+Service package session redemption.
+
+A session is redeemed with one conditional ``UPDATE ... RETURNING`` that checks
+eligibility (sessions left, not expired, minimum interval respected) and
+decrements in the same statement. Two terminals redeeming the same package
+at once are serialized by the row lock that ``UPDATE`` takes, which
+PostgreSQL holds until the redeeming transaction commits or rolls back: the
+second update waits for it, re-evaluates the ``WHERE`` clause against the
+committed row and simply matches nothing when the package is used up.
+
+A rated redemption then recomputes ``average_satisfaction`` from the package's
+rated history rows, still under that row lock; sessions redeemed without a
+rating do not count towards the mean.
+
+Redemptions record a service and credit the client's visits and loyalty
+points, so the ``redeemPackageSession`` mutation is limited to
+administrators, like ``recordService``.
+"""
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+import logging
+
+from sqlalchemy import DateTime, Interval, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.main.models import Client, ServiceHistory, ServicePackage
+from src.main.service_completion import record_service
+
+logger = logging.getLogger(__name__)
+
+async def _ineligibility_reason(
+    session: AsyncSession,
+    package_id: str,
+    now: datetime,
+    user_id: Optional[str]
+) -> str:
+    """Explain why a redemption matched no row. Only runs on the failure path."""
+    row = (await session.execute(
+        select(
+            ServicePackage.sessions_remaining,
+            ServicePackage.expiry_date,
+            ServicePackage.last_session_date,
+            ServicePackage.minimum_interval,
+            Client.user_id
+        )
+        .join(Client, Client.id == ServicePackage.client_id)
+        .where(ServicePackage.id == package_id)
+    )).one_or_none()
+
+    if row is None:
+        return "Package not found"
+    sessions_remaining, expiry_date, last_session_date, minimum_interval, owner_id = row
+    if user_id is not None and str(owner_id) != str(user_id):
+        return "Not authorized to redeem this package"
+    if expiry_date <= now:
+        return "Package has expired"
+    if sessions_remaining <= 0:
+        return "No sessions remaining on this package"
+    if last_session_date is not None and last_session_date > now - timedelta(days=minimum_interval):
+        return f"Sessions must be at least {minimum_interval} day(s) apart"
+    return "Package is not eligible for redemption"
+
+async def redeem_package_session(
+    session: AsyncSession,
+    package_id: str,
+    provider_name: str,
+    satisfaction_rating: Optional[int] = None,
+    feedback: Optional[str] = None,
+    notes: Optional[str] = None,
+    user_id: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> ServiceHistory:
+    """Redeem one session of a package and record it in the client's history.
+
+    ``user_id`` restricts redemption to packages owned by that user's client
+    profile (pass None for staff/admin redemptions). Raises ValueError when
+    the package is not eligible. Must run inside the caller's transaction so
+    the decrement and the history row commit together.
+    """
+    now = now or datetime.now(UTC)
+    current = literal(now, DateTime(timezone=True))
+
+    stmt = (
+        update(ServicePackage)
+        .where(ServicePackage.id == package_id)
+        .where(ServicePackage.sessions_remaining > 0)
+        .where(ServicePackage.expiry_date > current)
+        .where(or_(
+            ServicePackage.last_session_date.is_(None),
+            ServicePackage.last_session_date <= current - func.make_interval(
+                0, 0, 0, ServicePackage.minimum_interval, type_=Interval
+            )
+        ))
+        .values(
+            sessions_remaining=ServicePackage.sessions_remaining - 1,
+            last_session_date=current,
+            updated_at=current
+        )
+        .returning(
+            ServicePackage.client_id,
+            ServicePackage.service_type,
+            ServicePackage.package_cost,
+            ServicePackage.total_sessions,
+            ServicePackage.sessions_remaining
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if user_id is not None:
+        stmt = stmt.where(ServicePackage.client_id.in_(
+            select(Client.id).where(Client.user_id == user_id)
+        ))
+
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        raise ValueError(await _ineligibility_reason(session, package_id, now, user_id))
+
+    client_id, service_type, package_cost, total_sessions, sessions_remaining = row
+    logger.info(f"Redeemed session on package {package_id}, {sessions_remaining} remaining")
+
+    history = await record_service(
+        session,
+        client_id,
+        service_type=service_type,
+        provider_name=provider_name,
+        date_of_service=now,
+        service_cost=round(package_cost / total_sessions, 2) if total_sessions else 0.0,
+        satisfaction_rating=satisfaction_rating,
+        feedback=feedback,
+        notes=notes,
+        package_id=package_id
+    )
+    if satisfaction_rating is not None:
+        await session.execute(
+            update(ServicePackage)
+            .where(ServicePackage.id == package_id)
+            .values(average_satisfaction=(
+                select(func.avg(ServiceHistory.satisfaction_rating))
+                .where(ServiceHistory.package_id == package_id)
+                .scalar_subquery()
+            ))
+            .execution_options(synchronize_session=False)
+        )
+    return history
+
+__all__ = ["redeem_package_session"]
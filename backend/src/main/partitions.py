@@ -0,0 +1,231 @@
+"""
+Monthly range partitioning for the append-only appointment and history tables.
+
+``appointments`` is partitioned on ``start_time`` and ``service_history`` on
+``date_of_service``. Each month gets its own partition named
+``<table>_pYYYY_MM`` plus a ``<table>_default`` catch-all, so hot-path queries
+bounded by time prune to one or two partitions. The ORM models are unchanged:
+the parent table keeps the same name and columns, only its storage differs.
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import List, Optional, Tuple
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.main.config import settings
+from src.main.models import Base
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """A table partitioned by month on a timestamp column."""
+    name: str
+    column: str
+
+PARTITIONED_TABLES: Tuple[PartitionedTable, ...] = (
+    PartitionedTable("appointments", "start_time"),
+    PartitionedTable("service_history", "date_of_service"),
+)
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+
+def month_start(value: datetime) -> datetime:
+    """Truncate a timestamp to the first instant of its month in UTC."""
+    value = value.astimezone(UTC) if value.tzinfo else value.replace(tzinfo=UTC)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month-start timestamp by a number of months."""
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(table: str, start: datetime) -> str:
+    """Name of the partition holding the month starting at ``start``."""
+    return f"{table}_p{start.year:04d}_{start.month:02d}"
+
+def parse_partition_month(table: str, name: str) -> Optional[datetime]:
+    """Return the month a partition covers, or None for non-monthly partitions."""
+    if not name.startswith(f"{table}_p"):
+        return None
+    match = _PARTITION_NAME.search(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=UTC)
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    """Check whether a table is already a partitioned parent."""
+    result = await conn.execute(
+        text("""
+            SELECT c.relkind = 'p' FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = :table AND n.nspname = current_schema()
+        """),
+        {"table": table}
+    )
+    return bool(result.scalar())
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[str]:
+    """List the partitions currently attached to a parent table."""
+    result = await conn.execute(
+        text("""
+            SELECT child.relname FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            JOIN pg_namespace n ON n.oid = parent.relnamespace
+            WHERE parent.relname = :table AND n.nspname = current_schema()
+        """),
+        {"table": table}
+    )
+    return [row[0] for row in result]
+
+async def create_month_partition(conn: AsyncConnection, spec: PartitionedTable, start: datetime) -> bool:
+    """Create the partition for one month if it does not exist yet.
+
+    Rows that landed in the default partition for that month are moved into
+    the new partition before it is attached, so ATTACH never fails on overlap.
+    """
+    name = partition_name(spec.name, start)
+    if name in await list_partitions(conn, spec.name):
+        return False
+
+    end = add_months(start, 1)
+    bounds = {"start": start, "end": end}
+    default = f"{spec.name}_default"
+
+    await conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{name}" (LIKE "{spec.name}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    if default in await list_partitions(conn, spec.name):
+        moved = await conn.execute(
+            text(f"""
+                WITH moved AS (
+                    DELETE FROM "{default}"
+                    WHERE "{spec.column}" >= :start AND "{spec.column}" < :end
+                    RETURNING *
+                )
+                INSERT INTO "{name}" SELECT * FROM moved
+            """),
+            bounds
+        )
+        if moved.rowcount:
+            logger.info(f"Moved {moved.rowcount} rows from {default} into {name}")
+    await conn.execute(text(
+        f"""ALTER TABLE "{spec.name}" ATTACH PARTITION "{name}" """
+        f"""FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"""
+    ))
+    logger.info(f"Created partition {name}")
+    return True
+
+async def convert_to_partitioned(conn: AsyncConnection, spec: PartitionedTable) -> None:
+    """Rebuild an existing plain table as a monthly partitioned table.
+
+    This is a one-off migration that rewrites the table, so it belongs in a
+    maintenance window. The primary key becomes ``(id, <column>)`` because
+    PostgreSQL requires the partition key in every unique constraint, and
+    foreign keys pointing *at* the table (``appointment_attendees``) are
+    dropped since they can no longer be enforced on ``id`` alone.
+    """
+    if await is_partitioned(conn, spec.name):
+        logger.info(f"{spec.name} is already partitioned")
+        return
+
+    legacy = f"{spec.name}_legacy"
+    await conn.execute(text(f'ALTER TABLE "{spec.name}" RENAME TO "{legacy}"'))
+    await conn.execute(text(
+        f'CREATE TABLE "{spec.name}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("{spec.column}")'
+    ))
+    await conn.execute(text(
+        f'CREATE TABLE "{spec.name}_default" PARTITION OF "{spec.name}" DEFAULT'
+    ))
+
+    bounds = (await conn.execute(text(
+        f'SELECT min("{spec.column}"), max("{spec.column}") FROM "{legacy}"'
+    ))).one()
+    if bounds[0] is not None:
+        current, last = month_start(bounds[0]), month_start(bounds[1])
+        while current <= last:
+            await create_month_partition(conn, spec, current)
+            current = add_months(current, 1)
+
+    await conn.execute(text(f'INSERT INTO "{spec.name}" SELECT * FROM "{legacy}"'))
+    await conn.execute(text(f'DROP TABLE "{legacy}" CASCADE'))
+    await conn.execute(text(
+        f'ALTER TABLE "{spec.name}" ADD CONSTRAINT "{spec.name}_pkey" PRIMARY KEY (id, "{spec.column}")'
+    ))
+
+    # Outgoing foreign keys and indexes are re-created from the ORM metadata
+    table = Base.metadata.tables[spec.name]
+    for fk in table.foreign_keys:
+        await conn.execute(text(
+            f'ALTER TABLE "{spec.name}" ADD FOREIGN KEY ("{fk.parent.name}") '
+            f'REFERENCES "{fk.column.table.name}" ("{fk.column.name}")'
+        ))
+    await conn.execute(text(
+        f'CREATE INDEX IF NOT EXISTS "ix_{spec.name}_{spec.column}" ON "{spec.name}" ("{spec.column}")'
+    ))
+    logger.info(f"Converted {spec.name} to monthly partitions on {spec.column}")
+
+async def ensure_future_partitions(conn: AsyncConnection, spec: PartitionedTable, months_ahead: int) -> int:
+    """Create partitions from the current month up to ``months_ahead`` months out."""
+    created = 0
+    current = month_start(datetime.now(UTC))
+    for offset in range(months_ahead + 1):
+        if await create_month_partition(conn, spec, add_months(current, offset)):
+            created += 1
+    return created
+
+async def archive_old_partitions(
+    conn: AsyncConnection,
+    spec: PartitionedTable,
+    retention_months: int,
+    archive_schema: str
+) -> List[str]:
+    """Detach partitions older than the retention window and move them to the archive schema."""
+    cutoff = add_months(month_start(datetime.now(UTC)), -retention_months)
+    archived = []
+    await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+    for name in await list_partitions(conn, spec.name):
+        month = parse_partition_month(spec.name, name)
+        if month is None or month >= cutoff:
+            continue
+        await conn.execute(text(f'ALTER TABLE "{spec.name}" DETACH PARTITION "{name}"'))
+        await conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'))
+        archived.append(name)
+        logger.info(f"Archived partition {name} to schema {archive_schema}")
+    return archived
+
+async def maintain_partitions(
+    engine: AsyncEngine,
+    months_ahead: Optional[int] = None,
+    retention_months: Optional[int] = None
+) -> None:
+    """Create upcoming partitions and archive expired ones for every partitioned table."""
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    retention_months = settings.PARTITION_RETENTION_MONTHS if retention_months is None else retention_months
+
+    for spec in PARTITIONED_TABLES:
+        async with engine.begin() as conn:
+            if not await is_partitioned(conn, spec.name):
+                logger.warning(f"{spec.name} is not partitioned, skipping maintenance")
+                continue
+            created = await ensure_future_partitions(conn, spec, months_ahead)
+            archived = []
+            if retention_months > 0:
+                archived = await archive_old_partitions(
+                    conn, spec, retention_months, settings.PARTITION_ARCHIVE_SCHEMA
+                )
+            logger.info(
+                f"Partition maintenance for {spec.name}: "
+                f"{created} created, {len(archived)} archived"
+            )
+
+__all__ = [
+    "PARTITIONED_TABLES", "PartitionedTable", "convert_to_partitioned",
+    "ensure_future_partitions", "archive_old_partitions", "maintain_partitions"
+]
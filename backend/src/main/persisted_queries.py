@@ -0,0 +1,202 @@
+"""
+Automatic persisted queries and HTTP caching for the GraphQL endpoint.
+
+Clients following the Apollo APQ protocol send only the sha256 hash of a query
+in ``extensions.persistedQuery``. The query text is registered the first time
+(hash + query) and kept in a bounded in-process LRU backed by the shared
+cache, so later requests, including GET requests a reverse proxy can cache,
+carry just the hash. GET responses get an ``ETag`` and answer ``304`` when it
+matches; public read-only operations are marked cacheable by proxies.
+Responses are encoded with orjson.
+"""
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+from fastapi import Request, Response
+from graphql import FieldNode, GraphQLError, GraphQLSyntaxError, OperationType, get_operation_ast, parse
+from strawberry import UNSET
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLHTTPResponse, GraphQLRequestData, process_result
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+import logging
+
+import orjson
+
+from src.main.cache import cache
+from src.main.config import settings
+
+logger = logging.getLogger(__name__)
+
+APQ_KEY_PREFIX = "apq"
+
+class PersistedQueryNotFound(Exception):
+    """The client sent a hash the server has not seen yet."""
+
+class PersistedQueryStore:
+    """Bounded LRU of query hash to query text, backed by the shared cache."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._queries: "OrderedDict[str, str]" = OrderedDict()
+
+    async def get(self, sha256_hash: str) -> Optional[str]:
+        query = self._queries.get(sha256_hash)
+        if query is not None:
+            self._queries.move_to_end(sha256_hash)
+            return query
+
+        # Another worker may have registered it
+        query = await cache.get(f"{APQ_KEY_PREFIX}:{sha256_hash}")
+        if query is not None:
+            self._remember(sha256_hash, query)
+        return query
+
+    async def register(self, sha256_hash: str, query: str) -> None:
+        if sha256_hash in self._queries:
+            self._queries.move_to_end(sha256_hash)
+            return
+        self._remember(sha256_hash, query)
+        await cache.set(f"{APQ_KEY_PREFIX}:{sha256_hash}", query, expire_in=settings.PERSISTED_QUERY_TTL)
+
+    def _remember(self, sha256_hash: str, query: str) -> None:
+        self._queries[sha256_hash] = query
+        if len(self._queries) > self.maxsize:
+            self._queries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+def query_hash(query: str) -> str:
+    """sha256 hex digest of a query, as computed by APQ clients."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+@lru_cache(maxsize=256)
+def root_fields(query: str, operation_name: Optional[str] = None) -> Optional[FrozenSet[str]]:
+    """Names of the root fields a query operation selects, or None if it is not a plain query.
+
+    Response keys can be aliases, so only the document says which fields ran.
+    Fragments at the root are not resolved and count as non-plain.
+    """
+    try:
+        operation = get_operation_ast(parse(query), operation_name)
+    except GraphQLSyntaxError:
+        return None
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+    selections = operation.selection_set.selections
+    if not all(isinstance(selection, FieldNode) for selection in selections):
+        return None
+    return frozenset(selection.name.value for selection in selections)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+class PersistedQueryRouter(GraphQLRouter):
+    """GraphQL router with automatic persisted queries and GET response caching."""
+
+    def __init__(self, *args, persisted_queries: Optional[PersistedQueryStore] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.persisted_queries = persisted_queries or PersistedQueryStore(settings.PERSISTED_QUERY_CACHE_SIZE)
+
+    def should_render_graphiql(self, request) -> bool:
+        # A GET carrying only a persisted query hash is an operation, not a browser visit
+        return super().should_render_graphiql(request) and request.query_params.get("extensions") is None
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        content_type = request.content_type or ""
+
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+        elif content_type.startswith("multipart/form-data"):
+            data = await self.parse_multipart(request)
+        elif request.method == "GET":
+            data = self.parse_query_params(request.query_params)
+        else:
+            raise HTTPException(400, "Unsupported content type")
+
+        query = data.get("query")
+        persisted = (self._extensions(data) or {}).get("persistedQuery")
+        if persisted:
+            sha256_hash = persisted.get("sha256Hash")
+            if not sha256_hash:
+                raise HTTPException(400, "persistedQuery extension requires sha256Hash")
+            if query:
+                if query_hash(query) != sha256_hash:
+                    raise HTTPException(400, "Provided sha256Hash does not match query")
+                await self.persisted_queries.register(sha256_hash, query)
+            else:
+                query = await self.persisted_queries.get(sha256_hash)
+                if query is None:
+                    raise PersistedQueryNotFound()
+
+        request.request.state.graphql_document = (query, data.get("operationName"))
+        return GraphQLRequestData(
+            query=query,
+            variables=data.get("variables"),  # type: ignore
+            operation_name=data.get("operationName"),
+        )
+
+    def _extensions(self, data: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        extensions = data.get("extensions")
+        if isinstance(extensions, list):
+            extensions = extensions[0]
+        if isinstance(extensions, (str, bytes)):
+            extensions = self.parse_json(extensions)
+        return extensions
+
+    async def execute_operation(self, request: Request, context, root_value) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryNotFound:
+            # Tells APQ clients to retry with the full query text
+            return ExecutionResult(
+                data=None,
+                errors=[GraphQLError(
+                    "PersistedQueryNotFound",
+                    extensions={"code": "PERSISTED_QUERY_NOT_FOUND"}
+                )]
+            )
+
+    def encode_json(self, response_data: GraphQLHTTPResponse) -> bytes:
+        # orjson is several times faster than json.dumps on large list responses
+        return orjson.dumps(response_data)
+
+    async def process_result(self, request: Request, result: ExecutionResult) -> GraphQLHTTPResponse:
+        # Only anonymous, error-free reads of whitelisted root fields may be
+        # cached by shared proxies; everything else is revalidated per client.
+        public = bool(not result.errors and result.data and "authorization" not in request.headers)
+        if public:
+            query, operation_name = getattr(request.state, "graphql_document", (None, None))
+            fields = root_fields(query, operation_name) if query else None
+            public = fields is not None and fields <= set(settings.GRAPHQL_PUBLIC_QUERY_FIELDS)
+        request.state.graphql_public = public
+        return process_result(result)
+
+    async def run(self, request: Request, context=UNSET, root_value=UNSET) -> Response:
+        response = await super().run(request, context=context, root_value=root_value)
+        if request.method != "GET" or response.status_code != 200 or response.media_type != "application/json":
+            return response
+
+        etag = f'"{hashlib.sha256(response.body).hexdigest()[:32]}"'
+        if getattr(request.state, "graphql_public", False):
+            cache_control = f"public, max-age={settings.GRAPHQL_PUBLIC_MAX_AGE}"
+        else:
+            cache_control = "private, no-cache"
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+            )
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache_control
+        response.headers["Vary"] = "Authorization"
+        return response
+
+__all__ = ["PersistedQueryRouter", "PersistedQueryStore", "query_hash", "root_fields"]
@@ -0,0 +1,94 @@
+"""
+Map GraphQL selection sets to the columns and relationships they need.
+
+A ``Projection`` knows which mapped attributes each GraphQL field of a type
+reads and which relationships back its object fields. Given the selections
+of a resolver (from ``info.selected_fields``), it returns the columns for a
+``select()`` or ``load_only()``/``selectinload()`` loader options, so the
+SQL only fetches what the client asked for. Field names are matched in their
+GraphQL (camelCase) form; fragments and inline fragments are expanded.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy.orm import load_only, selectinload
+from strawberry.types import Info
+from strawberry.types.nodes import FragmentSpread, InlineFragment, SelectedField
+from strawberry.utils.str_converters import to_camel_case
+
+def iter_fields(selections: Iterable[Any]) -> Iterator[SelectedField]:
+    """Selected fields, with fragments and inline fragments expanded."""
+    for selection in selections:
+        if isinstance(selection, (FragmentSpread, InlineFragment)):
+            yield from iter_fields(selection.selections)
+        else:
+            yield selection
+
+def descend(selections: Iterable[Any], *path: str) -> List[Any]:
+    """Selections below ``path``, merged across every occurrence of each step."""
+    for name in path:
+        selections = [
+            child
+            for selected in iter_fields(selections) if selected.name == name
+            for child in selected.selections
+        ]
+    return list(selections)
+
+def field_selections(info: Info, *path: str) -> List[Any]:
+    """Selections below ``path`` under the field being resolved."""
+    return descend(info.selected_fields[0].selections, *path)
+
+def selects(selections: Iterable[Any], name: str) -> bool:
+    """Whether ``name`` is selected anywhere in ``selections``, at any depth."""
+    pending = list(selections)
+    while pending:
+        selection = pending.pop()
+        if getattr(selection, "name", None) == name:
+            return True
+        pending.extend(getattr(selection, "selections", ()))
+    return False
+
+@dataclass(frozen=True)
+class Projection:
+    """Attributes and relationships behind the fields of one GraphQL type."""
+    model: type
+    fields: Dict[str, Tuple[str, ...]]  # GraphQL field -> mapped attributes it reads
+    relationships: Dict[str, Tuple[str, "Projection"]] = field(default_factory=dict)
+    required: Tuple[str, ...] = ("id",)
+
+    @classmethod
+    def from_converter_fields(
+        cls,
+        model: type,
+        converter_fields: Dict[str, Tuple[str, str]],
+        computed: Dict[str, Tuple[str, ...]] = None,
+        relationships: Dict[str, Tuple[str, "Projection"]] = None
+    ) -> "Projection":
+        """Projection for a type converted with ``make_converter`` from ``converter_fields``."""
+        fields = {to_camel_case(name): (attribute,) for name, (attribute, _) in converter_fields.items()}
+        fields.update({to_camel_case(name): attributes for name, attributes in (computed or {}).items()})
+        return cls(model, fields, relationships or {})
+
+    def attribute_names(self, selections: Iterable[Any], also: Sequence[str] = ()) -> List[str]:
+        names = dict.fromkeys((*self.required, *also))
+        for selected in iter_fields(selections):
+            names.update(dict.fromkeys(self.fields.get(selected.name, ())))
+        return list(names)
+
+    def columns(self, selections: Iterable[Any], also: Sequence[str] = ()) -> List[Any]:
+        """Column attributes to ``select()`` for ``selections``."""
+        return [getattr(self.model, name) for name in self.attribute_names(selections, also)]
+
+    def load_options(self, selections: Iterable[Any], also: Sequence[str] = ()) -> List[Any]:
+        """``load_only`` for the selected columns plus a ``selectinload`` per selected relationship."""
+        selections = list(selections)
+        options = [load_only(*self.columns(selections, also))]
+        for name, (relationship, projection) in self.relationships.items():
+            nested = descend(selections, name)
+            if nested:
+                options.append(
+                    selectinload(getattr(self.model, relationship)).options(*projection.load_options(nested))
+                )
+        return options
+
+__all__ = ["Projection", "iter_fields", "descend", "field_selections", "selects"]
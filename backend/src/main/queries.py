@@ -1,11 +1,45 @@
 """
 GraphQL query definitions for the application.
 """
+import base64
 import strawberry
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
+from sqlalchemy import func, or_, select, tuple_
 from strawberry.types import Info
 
+from src.main.auth import check_auth
+from src.main.calendar_feed import feed_path
+from src.main.config import settings
+from src.main.dashboard import dashboard
+from src.main.database import async_session
+from src.main.models import (
+    Appointment, AppointmentStatus, Client, ClientCategory, ClientStatus, ServiceType,
+    appointment_attendees
+)
+from src.main.projection import field_selections, selects
+from src.main.schema_types import (
+    AppointmentConnection, AppointmentEdge, AppointmentFilterInput, AppointmentType,
+    APPOINTMENT_PROJECTION, CLIENT_PROJECTION, ClientConnection, ClientEdge, ClientFilterInput, ClientType, DashboardSummary,
+    PageInfo, RevenueReport
+)
+from src.main.typing import CustomContext
+
+def encode_cursor(*parts: str) -> str:
+    """Opaque pagination cursor from the sort key of a row."""
+    return base64.urlsafe_b64encode("|".join(parts).encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[str, ...]:
+    try:
+        return tuple(base64.urlsafe_b64decode(cursor.encode()).decode().split("|"))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def page_size(first: int) -> int:
+    if first < 1:
+        raise ValueError("first must be positive")
+    return min(first, settings.MAX_PAGE_SIZE)
+
 @strawberry.type
 class SystemInfo:
     """System information type for querying server status."""
@@ -17,15 +51,17 @@ class SystemInfo:
     cache_enabled: bool
 
     @staticmethod
-    def get_current() -> 'SystemInfo':
+    async def get_current() -> 'SystemInfo':
         """Get current system information."""
         from src.main.config import settings
+        from src.main.health import health
+        status = await health.status()
         return SystemInfo(
             time=datetime.now().isoformat(),
             version=settings.APP_VERSION,
             environment=settings.ENVIRONMENT,
             debug_mode=settings.DEBUG,
-            database_connected=True,
+            database_connected=status.database,
             cache_enabled=settings.REDIS_ENABLED
         )
 
@@ -44,9 +80,9 @@ class Query:
         return "pong"
 
     @strawberry.field
-    def system_info(self) -> SystemInfo:
+    async def system_info(self) -> SystemInfo:
         """Get current system information."""
-        return SystemInfo.get_current()
+        return await SystemInfo.get_current()
 
     @strawberry.field
     def echo(self, message: str) -> str:
@@ -57,3 +93,150 @@ class Query:
     def server_time(self) -> str:
         """Get the current server time."""
         return datetime.now().isoformat()
+
+    @strawberry.field
+    async def revenue_report(
+        self,
+        info: Info[CustomContext, None],
+        date_from: datetime,
+        date_to: datetime
+    ) -> RevenueReport:
+        """Revenue, utilization and satisfaction per service type, provider and day; requires an admin account."""
+        current_user = await check_auth(info)
+        if not current_user.is_admin:
+            raise PermissionError("Only administrators can view revenue reports")
+        if date_to <= date_from:
+            raise ValueError("dateTo must be after dateFrom")
+
+        # Rarely used; keeps NumPy out of server startup
+        from src.main.analytics import revenue_report
+
+        async with async_session() as session:
+            summary = await revenue_report(session, date_from, date_to)
+        return RevenueReport.from_summary(summary, date_from, date_to)
+
+    @strawberry.field
+    async def calendar_feed_url(self, info: Info[CustomContext, None]) -> str:
+        """Path of the current user's iCalendar feed, to subscribe to from a calendar app."""
+        current_user = await check_auth(info)
+        return feed_path(current_user.id, current_user.calendar_feed_version)
+
+    @strawberry.field
+    async def dashboard_summary(self, info: Info[CustomContext, None]) -> DashboardSummary:
+        """Client and appointment counts for the dashboard, served from counters."""
+        await check_auth(info)
+        return DashboardSummary(**await dashboard.get_summary())
+
+    @strawberry.field
+    async def appointments(
+        self,
+        info: Info[CustomContext, None],
+        first: int = 20,
+        after: Optional[str] = None,
+        filter: Optional[AppointmentFilterInput] = None
+    ) -> AppointmentConnection:
+        """Appointments ordered by start time; users see those they created or attend."""
+        current_user = await check_auth(info)
+        limit = page_size(first)
+
+        conditions = []
+        if not current_user.is_admin:
+            attending = select(appointment_attendees.c.appointment_id).where(
+                appointment_attendees.c.user_id == current_user.id
+            )
+            conditions.append(or_(Appointment.creatorId == current_user.id, Appointment.id.in_(attending)))
+        if filter:
+            if filter.status:
+                conditions.append(Appointment.status == AppointmentStatus(filter.status.value))
+            if filter.date_from:
+                conditions.append(Appointment.startTime >= filter.date_from)
+            if filter.date_to:
+                conditions.append(Appointment.startTime < filter.date_to)
+            if filter.service_type:
+                conditions.append(Appointment.serviceType == ServiceType(filter.service_type))
+
+        stmt = (
+            select(Appointment)
+            .where(*conditions)
+            .options(*APPOINTMENT_PROJECTION.load_options(field_selections(info, "edges", "node"), also=("startTime",)))
+            .order_by(Appointment.startTime, Appointment.id)
+            .limit(limit + 1)
+        )
+        if after:
+            start_time, appointment_id = decode_cursor(after)
+            stmt = stmt.where(
+                tuple_(Appointment.startTime, Appointment.id) > (datetime.fromisoformat(start_time), appointment_id)
+            )
+
+        async with async_session() as session:
+            rows = (await session.execute(stmt)).scalars().all()
+            total_count = 0
+            if selects(info.selected_fields[0].selections, "totalCount"):
+                total_count = await session.scalar(select(func.count()).select_from(Appointment).where(*conditions))
+
+        edges = [
+            AppointmentEdge(
+                node=AppointmentType.from_db(appointment),
+                cursor=encode_cursor(appointment.startTime.isoformat(), appointment.id)
+            )
+            for appointment in rows[:limit]
+        ]
+        return AppointmentConnection(
+            page_info=PageInfo(
+                has_next_page=len(rows) > limit,
+                has_previous_page=after is not None,
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None
+            ),
+            edges=edges,
+            total_count=total_count
+        )
+
+    @strawberry.field
+    async def clients(
+        self,
+        info: Info[CustomContext, None],
+        first: int = 20,
+        after: Optional[str] = None,
+        filter: Optional[ClientFilterInput] = None
+    ) -> ClientConnection:
+        """Clients matching the filter; requires an admin account."""
+        current_user = await check_auth(info)
+        if not current_user.is_admin:
+            raise PermissionError("Only administrators can list clients")
+        limit = page_size(first)
+
+        conditions = []
+        if filter:
+            if filter.status:
+                conditions.append(Client.status == ClientStatus(filter.status))
+            if filter.category:
+                conditions.append(Client.category == ClientCategory(filter.category))
+            if filter.service:
+                conditions.append(Client.service == ServiceType(filter.service))
+            if filter.search:
+                conditions.append(Client.phone.contains(filter.search, autoescape=True))
+
+        columns = CLIENT_PROJECTION.columns(field_selections(info, "edges", "node"))
+        stmt = select(*columns).where(*conditions).order_by(Client.id).limit(limit + 1)
+        if after:
+            (client_id,) = decode_cursor(after)
+            stmt = stmt.where(Client.id > client_id)
+
+        async with async_session() as session:
+            rows = (await session.execute(stmt)).all()
+            total_count = 0
+            if selects(info.selected_fields[0].selections, "totalCount"):
+                total_count = await session.scalar(select(func.count()).select_from(Client).where(*conditions))
+
+        edges = [ClientEdge(node=ClientType.from_row(row), cursor=encode_cursor(row.id)) for row in rows[:limit]]
+        return ClientConnection(
+            page_info=PageInfo(
+                has_next_page=len(rows) > limit,
+                has_previous_page=after is not None,
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None
+            ),
+            edges=edges,
+            total_count=total_count
+        )
@@ -0,0 +1,243 @@
+"""
+Static depth and cost analysis for GraphQL operations.
+
+Every operation is scored from its document before any resolver runs. Object
+fields cost 1 (or their entry in ``FIELD_COSTS``), scalars are free, and the
+cost of a field's selection is multiplied by its ``first``/``last`` argument
+(a variable falls back to its default in the operation, an omitted argument
+to the field's default; capped at ``MAX_PAGE_SIZE``), or by
+``GRAPHQL_DEFAULT_LIST_SIZE`` for unpaginated lists such as
+``AppointmentType.attendees``. Operations nested deeper than
+``GRAPHQL_MAX_DEPTH`` or costing more than the caller's role budget are
+rejected with a ``QUERY_TOO_EXPENSIVE`` error, so one crafted query can no
+longer fan out into thousands of rows and drain the connection pool.
+"""
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+import logging
+
+import jwt
+from graphql import (
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    VariableNode,
+    get_named_type,
+    value_from_ast_untyped,
+)
+from graphql.type.definition import GraphQLCompositeType, GraphQLInterfaceType
+from graphql.utilities import get_operation_ast
+from sqlalchemy import select
+from strawberry.extensions import SchemaExtension
+
+from src.main.auth import Role
+from src.main.cache import cache
+from src.main.config import settings
+from src.main.database import async_session
+from src.main.models import User
+
+logger = logging.getLogger(__name__)
+
+ANONYMOUS = "anonymous"
+ROLE_KEY_PREFIX = "role"
+
+# Arguments that bound the number of items a field returns
+PAGINATION_ARGUMENTS = ("first", "last")
+
+# Costs for fields that do more work than a single row fetch, keyed "Type.field"
+FIELD_COSTS: Dict[str, int] = {
+    "Query.revenueReport": 50,
+    "Query.dashboardSummary": 3,
+}
+
+@dataclass
+class QueryCost:
+    """Static cost and maximum depth of an operation."""
+    cost: int
+    depth: int
+
+def _page_size(value: int) -> int:
+    # Resolvers never return more than MAX_PAGE_SIZE items
+    return min(max(value, 1), settings.MAX_PAGE_SIZE)
+
+def _is_list(field_type) -> bool:
+    if isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    return isinstance(field_type, GraphQLList)
+
+class _CostVisitor:
+    """Walks one operation, expanding fragments against the schema types."""
+
+    def __init__(self, fragments: Dict[str, FragmentDefinitionNode], variables: Optional[Dict[str, Any]]):
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.depth = 0
+
+    def _multiplier(self, field: FieldNode, parent: GraphQLCompositeType, definition: GraphQLField) -> int:
+        given = {argument.name.value: argument.value for argument in field.arguments or ()}
+        for name in PAGINATION_ARGUMENTS:
+            if name not in definition.args:
+                continue
+            value = given.get(name)
+            if isinstance(value, IntValueNode):
+                return _page_size(int(value.value))
+            if isinstance(value, VariableNode) and isinstance(self.variables.get(value.name.value), int):
+                return _page_size(self.variables[value.name.value])
+            # Omitted (or an unset variable): the resolver uses the argument's default
+            default = definition.args[name].default_value
+            if isinstance(default, int):
+                return _page_size(default)
+        # Lists below a connection are already bounded by the connection's `first`
+        if _is_list(definition.type) and not parent.name.endswith("Connection"):
+            return settings.GRAPHQL_DEFAULT_LIST_SIZE
+        return 1
+
+    def selection_cost(self, selection_set: Optional[SelectionSetNode], parent: GraphQLCompositeType, depth: int) -> int:
+        if selection_set is None:
+            return 0
+        self.depth = max(self.depth, depth)
+        total = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                total += self.field_cost(selection, parent, depth)
+            elif isinstance(selection, InlineFragmentNode):
+                total += self.selection_cost(selection.selection_set, parent, depth)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is not None:
+                    total += self.selection_cost(fragment.selection_set, parent, depth)
+        return total
+
+    def field_cost(self, field: FieldNode, parent: GraphQLCompositeType, depth: int) -> int:
+        name = field.name.value
+        if name.startswith("__") or not isinstance(parent, (GraphQLObjectType, GraphQLInterfaceType)):
+            return 0
+        definition = parent.fields.get(name)
+        if definition is None:
+            return 0
+
+        field_type = get_named_type(definition.type)
+        composite = isinstance(field_type, GraphQLCompositeType)
+        base = FIELD_COSTS.get(f"{parent.name}.{name}", 1 if composite else 0)
+        if not composite:
+            return base
+        children = self.selection_cost(field.selection_set, field_type, depth + 1)
+        return self._multiplier(field, parent, definition) * (base + children)
+
+def analyze_operation(
+    graphql_schema,
+    document,
+    operation_name: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None
+) -> Optional[QueryCost]:
+    """Cost and depth of the operation ``operation_name`` in ``document``."""
+    operation: Optional[OperationDefinitionNode] = get_operation_ast(document, operation_name)
+    if operation is None:
+        return None
+    root = {
+        OperationType.QUERY: graphql_schema.query_type,
+        OperationType.MUTATION: graphql_schema.mutation_type,
+        OperationType.SUBSCRIPTION: graphql_schema.subscription_type,
+    }[operation.operation]
+    if root is None:
+        return None
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    # Variables the client did not send take their default from the operation
+    defaults = {
+        definition.variable.name.value: value_from_ast_untyped(definition.default_value)
+        for definition in operation.variable_definitions or ()
+        if definition.default_value is not None
+    }
+    visitor = _CostVisitor(fragments, {**defaults, **(variables or {})})
+    cost = visitor.selection_cost(operation.selection_set, root, 1)
+    return QueryCost(cost=cost, depth=visitor.depth)
+
+async def _user_role(user_id: str) -> str:
+    key = f"{ROLE_KEY_PREFIX}:{user_id}"
+    role = await cache.get(key)
+    if role is None:
+        async with async_session() as session:
+            is_admin = await session.scalar(select(User.is_admin).where(User.id == user_id))
+        role = Role.ADMIN.value if is_admin else Role.USER.value
+        await cache.set(key, role, expire_in=settings.GRAPHQL_ROLE_CACHE_TTL)
+    return role
+
+async def request_role(context: Any) -> str:
+    """Budget role of the caller: ``anonymous`` or a ``Role`` value.
+
+    The bearer token is only decoded here, not checked for revocation; this
+    picks a budget, resolvers still enforce authentication themselves.
+    """
+    request = getattr(context, "request", None)
+    authorization = request.headers.get("authorization", "") if request is not None else ""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return ANONYMOUS
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        return await _user_role(str(payload["sub"]))
+    except Exception as e:
+        logger.debug(f"Using anonymous query budget: {str(e)}")
+        return ANONYMOUS
+
+def budget_for(role: str) -> int:
+    budgets = settings.GRAPHQL_COST_BUDGETS
+    return budgets.get(role, budgets[ANONYMOUS])
+
+def _rejection(message: str, **details) -> GraphQLExecutionResult:
+    return GraphQLExecutionResult(
+        data=None,
+        errors=[GraphQLError(message, extensions={"code": "QUERY_TOO_EXPENSIVE", **details})]
+    )
+
+class QueryCostLimiter(SchemaExtension):
+    """Reject operations that are too deep or over the caller's cost budget.
+
+    The check runs when execution starts, after parsing and validation, and
+    answers over-budget operations without calling any resolver. The role is
+    only looked up when the cost exceeds the anonymous budget.
+    """
+
+    async def on_execute(self) -> AsyncIterator[None]:
+        execution_context = self.execution_context
+        analysis = analyze_operation(
+            execution_context.schema._schema,
+            execution_context.graphql_document,
+            execution_context.operation_name,
+            execution_context.variables
+        )
+
+        if analysis is not None:
+            if analysis.depth > settings.GRAPHQL_MAX_DEPTH:
+                execution_context.result = _rejection(
+                    f"Query depth {analysis.depth} exceeds the maximum of {settings.GRAPHQL_MAX_DEPTH}",
+                    depth=analysis.depth, maxDepth=settings.GRAPHQL_MAX_DEPTH
+                )
+            elif analysis.cost > budget_for(ANONYMOUS):
+                role = await request_role(execution_context.context)
+                budget = budget_for(role)
+                if analysis.cost > budget:
+                    logger.warning(f"Rejected query costing {analysis.cost} (budget {budget} for {role})")
+                    execution_context.result = _rejection(
+                        f"Query cost {analysis.cost} exceeds the budget of {budget}",
+                        cost=analysis.cost, budget=budget
+                    )
+        yield
+
+__all__ = ["QueryCostLimiter", "QueryCost", "analyze_operation", "request_role", "FIELD_COSTS"]
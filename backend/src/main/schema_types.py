@@ -5,11 +5,14 @@ from datetime import datetime
 from enum import Enum
 import strawberry
 from typing import List, Optional
+from sqlalchemy import Row
 
+from src.main.converters import make_converter
 from src.main.models import (
     User, Appointment, Client, ServiceHistory, ServiceType, AppointmentStatus,
     ClientCategory, ClientStatus, ServicePackage
 )
+from src.main.projection import Projection
 
 # Auth Types
 @strawberry.type
@@ -45,6 +48,14 @@ class AppointmentStatusEnum(Enum):
     COMPLETED = "COMPLETED"
     DECLINED = "DECLINED"
 
+@strawberry.enum
+class AppointmentChangeKind(Enum):
+    """What happened to an appointment."""
+    CREATED = "CREATED"
+    UPDATED = "UPDATED"
+    DELETED = "DELETED"
+    COMPLETED = "COMPLETED"
+
 # Common Types
 @strawberry.type
 class PageInfo:
@@ -76,7 +87,7 @@ class LoginInput:
 class AppointmentInput:
     """Input for creating/updating appointments."""
     title: str = strawberry.field(description="Appointment title")
-    description: Optional[str] = strawberry.field(description="Optional description")
+    description: Optional[str] = strawberry.field(default=None, description="Optional description")
     start_time: datetime = strawberry.field(description="Start time")
     duration_minutes: int = strawberry.field(description="Duration in minutes")
     service_type: str = strawberry.field(description="Type of service")
@@ -84,10 +95,10 @@ class AppointmentInput:
 @strawberry.input
 class AppointmentFilterInput:
     """Input for filtering appointments."""
-    status: Optional[AppointmentStatusEnum] = strawberry.field(description="Filter by status")
-    date_from: Optional[datetime] = strawberry.field(description="Filter by start date")
-    date_to: Optional[datetime] = strawberry.field(description="Filter by end date")
-    service_type: Optional[str] = strawberry.field(description="Filter by service type")
+    status: Optional[AppointmentStatusEnum] = strawberry.field(default=None, description="Filter by status")
+    date_from: Optional[datetime] = strawberry.field(default=None, description="Filter by start date")
+    date_to: Optional[datetime] = strawberry.field(default=None, description="Filter by end date")
+    service_type: Optional[str] = strawberry.field(default=None, description="Filter by service type")
 
 @strawberry.input
 class ClientInput:
@@ -96,13 +107,26 @@ class ClientInput:
     service: str = strawberry.field(description="Preferred service")
     notes: Optional[str] = strawberry.field(description="Optional notes")
 
+@strawberry.input
+class ServiceRecordInput:
+    """Input for recording a completed service for a client."""
+    service_type: str = strawberry.field(description="Type of service")
+    provider_name: str = strawberry.field(description="Name of the provider who performed the service")
+    date_of_service: Optional[datetime] = strawberry.field(default=None, description="When the service took place, defaults to now")
+    service_cost: Optional[float] = strawberry.field(default=None, description="Amount charged (not negative), defaults to the service base cost")
+    service_duration: Optional[int] = strawberry.field(default=None, description="Duration in minutes, defaults to the service duration")
+    points_redeemed: int = strawberry.field(default=0, description="Loyalty points redeemed for this service, at most the client's balance")
+    satisfaction_rating: Optional[int] = strawberry.field(default=None, description="Client satisfaction rating from 1 to 5")
+    feedback: Optional[str] = strawberry.field(default=None, description="Client feedback")
+    notes: Optional[str] = strawberry.field(default=None, description="Optional notes")
+
 @strawberry.input
 class ClientFilterInput:
     """Input for filtering clients."""
-    status: Optional[str] = strawberry.field(description="Filter by status")
-    category: Optional[str] = strawberry.field(description="Filter by category")
-    service: Optional[str] = strawberry.field(description="Filter by preferred service")
-    search: Optional[str] = strawberry.field(description="Search in phone number")
+    status: Optional[str] = strawberry.field(default=None, description="Filter by status")
+    category: Optional[str] = strawberry.field(default=None, description="Filter by category")
+    service: Optional[str] = strawberry.field(default=None, description="Filter by preferred service")
+    search: Optional[str] = strawberry.field(default=None, description="Search in phone number")
 
 # Response/Payload Types
 @strawberry.type
@@ -125,15 +149,7 @@ class UserType:
 
     @classmethod
     def from_db(cls, user: User) -> 'UserType':
-        return cls(
-            id=strawberry.ID(str(user.id)),
-            username=str(user.username),
-            email=str(user.email),
-            first_name=str(user.first_name),
-            last_name=str(user.last_name),
-            enabled=bool(user.enabled),
-            is_admin=bool(user.is_admin)
-        )
+        return _user_converter(user)
 
 @strawberry.type
 class AppointmentEdge:
@@ -164,27 +180,13 @@ class AppointmentType:
 
     @classmethod
     def from_db(cls, appointment: Appointment) -> 'AppointmentType':
-        def get_value(obj, attr, is_enum=False, default=None):
-            val = getattr(obj, attr)
-            if val is None:
-                return default
-            if hasattr(val, 'scalar_value'):
-                val = val.scalar_value()
-            if val is None:
-                return default
-            return val.value if is_enum and hasattr(val, 'value') else val
-
-        return cls(
-            id=strawberry.ID(str(get_value(appointment, 'id', default='0'))),
-            title=str(get_value(appointment, 'title', default='')),
-            description=str(get_value(appointment, 'description')) if get_value(appointment, 'description') is not None else None,
-            start_time=datetime.fromisoformat(str(get_value(appointment, 'startTime'))) if get_value(appointment, 'startTime') is not None else datetime.now(),
-            duration_minutes=int(get_value(appointment, 'durationMinutes', default=0)),
-            status=str(get_value(appointment, 'status', is_enum=True, default="")),
-            service_type=str(get_value(appointment, 'serviceType', is_enum=True, default="")),
-            estimated_cost=float(get_value(appointment, 'estimated_cost', default=0.0)),
-            creator=UserType.from_db(appointment.creator),
-            attendees=[UserType.from_db(u) for u in appointment.attendees]
+        # Relationships the query did not load are left empty rather than lazy loaded
+        loaded = appointment.__dict__
+        creator = loaded.get("creator")
+        return _appointment_converter(
+            appointment,
+            UserType.from_db(creator) if creator is not None else None,
+            [UserType.from_db(u) for u in loaded.get("attendees", ())]
         )
 
 @strawberry.type
@@ -216,27 +218,91 @@ class ClientType:
 
     @classmethod
     def from_db(cls, client: Client) -> 'ClientType':
-        def get_value(obj, attr, is_enum=False, default=None):
-            val = getattr(obj, attr)
-            if val is None:
-                return default
-            if hasattr(val, 'scalar_value'):
-                val = val.scalar_value()
-            if val is None:
-                return default
-            return val.value if is_enum and hasattr(val, 'value') else val
+        return _client_converter(client)
+
+    @classmethod
+    def from_row(cls, row: Row) -> 'ClientType':
+        """Build from a row selected with ``CLIENT_PROJECTION`` columns."""
+        return _client_row_converter(row)
+
+# Converters generated once from the field tables below
+USER_TYPE_FIELDS = {
+    "id": ("id", "text"),
+    "username": ("username", "text"),
+    "email": ("email", "text"),
+    "first_name": ("first_name", "text"),
+    "last_name": ("last_name", "text"),
+    "enabled": ("enabled", "bool"),
+    "is_admin": ("is_admin", "bool"),
+}
+_user_converter = make_converter(UserType, USER_TYPE_FIELDS)
+
+APPOINTMENT_TYPE_FIELDS = {
+    "id": ("id", "id"),
+    "title": ("title", "str"),
+    "description": ("description", "optional_str"),
+    "start_time": ("startTime", "datetime"),
+    "duration_minutes": ("durationMinutes", "int"),
+    "status": ("status", "str"),
+    "service_type": ("serviceType", "str"),
+}
+_appointment_converter = make_converter(
+    AppointmentType,
+    APPOINTMENT_TYPE_FIELDS,
+    computed={"estimated_cost": "_float(_cost({serviceType}, {durationMinutes}))"},
+    extra=("creator", "attendees")
+)
+
+CLIENT_TYPE_FIELDS = {
+    "id": ("id", "id"),
+    "phone": ("phone", "str"),
+    "service": ("service", "str"),
+    "status": ("status", "str"),
+    "notes": ("notes", "optional_str"),
+    "loyalty_points": ("loyalty_points", "int"),
+    "total_spent": ("total_spent", "float"),
+    "visit_count": ("visit_count", "int"),
+    "last_visit": ("last_visit", "raw"),
+    "category": ("category", "str"),
+}
+_client_converter = make_converter(ClientType, CLIENT_TYPE_FIELDS)
+_client_row_converter = make_converter(ClientType, CLIENT_TYPE_FIELDS, mapped=False)
 
+# Columns each GraphQL field needs, for loading only what a query selects
+USER_PROJECTION = Projection.from_converter_fields(User, USER_TYPE_FIELDS)
+APPOINTMENT_PROJECTION = Projection.from_converter_fields(
+    Appointment,
+    APPOINTMENT_TYPE_FIELDS,
+    computed={"estimated_cost": ("serviceType", "durationMinutes")},
+    relationships={"creator": ("creator", USER_PROJECTION), "attendees": ("attendees", USER_PROJECTION)}
+)
+CLIENT_PROJECTION = Projection.from_converter_fields(Client, CLIENT_TYPE_FIELDS)
+
+@strawberry.type
+class AppointmentChange:
+    """A committed appointment change, pushed to subscribers."""
+    kind: AppointmentChangeKind = strawberry.field(description="What happened to the appointment")
+    appointment_id: strawberry.ID = strawberry.field(description="Changed appointment")
+    title: str = strawberry.field(description="Appointment title")
+    start_time: datetime = strawberry.field(description="Start time after the change")
+    previous_start_time: Optional[datetime] = strawberry.field(description="Start time before a move")
+    duration_minutes: int = strawberry.field(description="Duration in minutes")
+    status: str = strawberry.field(description="Status after the change")
+    service_type: str = strawberry.field(description="Type of service")
+    creator_id: strawberry.ID = strawberry.field(description="User who created the appointment")
+
+    @classmethod
+    def from_event(cls, event) -> 'AppointmentChange':
         return cls(
-            id=strawberry.ID(str(get_value(client, 'id', default='0'))),
-            phone=str(get_value(client, 'phone', default='')),
-            service=str(get_value(client, 'service', is_enum=True, default="")),
-            status=str(get_value(client, 'status', is_enum=True, default="")),
-            notes=str(get_value(client, 'notes')) if get_value(client, 'notes') is not None else None,
-            loyalty_points=int(get_value(client, 'loyalty_points', default=0)),
-            total_spent=float(get_value(client, 'total_spent', default=0.0)),
-            visit_count=int(get_value(client, 'visit_count', default=0)),
-            last_visit=get_value(client, 'last_visit') if get_value(client, 'last_visit') is not None else None,
-            category=str(get_value(client, 'category', is_enum=True, default=""))
+            kind=AppointmentChangeKind(event.kind),
+            appointment_id=event.appointment_id,
+            title=event.title,
+            start_time=event.start_time,
+            previous_start_time=event.previous_start_time,
+            duration_minutes=event.duration_minutes,
+            status=event.status,
+            service_type=event.service_type,
+            creator_id=event.creator_id
         )
 
 @strawberry.type
@@ -245,3 +311,53 @@ class DashboardSummary:
     total_clients: int = strawberry.field(description="Total number of active clients")
     todays_appointments_count: int = strawberry.field(description="Number of appointments today")
     upcoming_appointments_count: int = strawberry.field(description="Number of upcoming appointments")
+
+@strawberry.type
+class RevenueGroup:
+    """Revenue aggregates for one service type, provider or day."""
+    key: str = strawberry.field(description="Service type, provider name or ISO date")
+    revenue: float = strawberry.field(description="Total revenue")
+    service_count: int = strawberry.field(description="Number of services performed")
+    total_minutes: float = strawberry.field(description="Total service minutes")
+    average_satisfaction: Optional[float] = strawberry.field(description="Average satisfaction of rated services")
+    utilization: Optional[float] = strawberry.field(description="Booked share of available minutes (providers only)")
+
+@strawberry.type
+class RevenueReport:
+    """Revenue and utilization report over a date range."""
+    date_from: datetime = strawberry.field(description="Start of the range (inclusive)")
+    date_to: datetime = strawberry.field(description="End of the range (exclusive)")
+    total_revenue: float = strawberry.field(description="Total revenue")
+    service_count: int = strawberry.field(description="Number of services performed")
+    total_minutes: float = strawberry.field(description="Total service minutes")
+    average_satisfaction: Optional[float] = strawberry.field(description="Average satisfaction of rated services")
+    by_service_type: List[RevenueGroup] = strawberry.field(description="Breakdown per service type")
+    by_provider: List[RevenueGroup] = strawberry.field(description="Breakdown and utilization per provider")
+    by_day: List[RevenueGroup] = strawberry.field(description="Breakdown per day")
+
+    @classmethod
+    def from_summary(cls, summary, date_from: datetime, date_to: datetime) -> 'RevenueReport':
+        def groups(items) -> List[RevenueGroup]:
+            return [
+                RevenueGroup(
+                    key=item.key,
+                    revenue=item.revenue,
+                    service_count=item.service_count,
+                    total_minutes=item.total_minutes,
+                    average_satisfaction=item.average_satisfaction,
+                    utilization=item.utilization
+                )
+                for item in items
+            ]
+
+        return cls(
+            date_from=date_from,
+            date_to=date_to,
+            total_revenue=summary.total_revenue,
+            service_count=summary.service_count,
+            total_minutes=summary.total_minutes,
+            average_satisfaction=summary.average_satisfaction,
+            by_service_type=groups(summary.by_service_type),
+            by_provider=groups(summary.by_provider),
+            by_day=groups(summary.by_day)
+        )
@@ -9,14 +9,26 @@ from datetime import datetime
 from typing import Optional
 from fastapi import FastAPI, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, Response
 import uvicorn
 from sqlalchemy.ext.asyncio import AsyncSession
-from strawberry.fastapi import GraphQLRouter
 
+from src.main.auth import get_current_user
 from src.main.graphql_schema import schema
-from src.main.database import engine, Base, get_session
+from src.main.persisted_queries import PersistedQueryRouter
+from src.main.database import engine, Base, get_session, async_session
+from src.main.models import service_catalog
+from src.main.service_catalog import load_service_catalog
+from src.main.broadcast import appointment_events
 from src.main.cache import cache
+from src.main.calendar_feed import router as calendar_router
+from src.main.compression import CompressionMiddleware
+from src.main.partitions import maintain_partitions
+from src.main.dashboard import dashboard
+from src.main.exports import router as export_router
+from src.main.health import health
+from src.main.outbox import ReminderWorker
+from src.main.metrics import MetricsMiddleware, mark_worker_dead, render_metrics
 from src.main.config import settings
 
 # Configure logging
@@ -42,6 +54,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Brotli/GZip for large responses such as appointment and client lists
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Request latency and in-flight metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # GraphQL context class
 from strawberry.fastapi import BaseContext
 
@@ -50,13 +70,39 @@ class Context(BaseContext):
         super().__init__()
         self.session = session
         self.request_id = str(uuid.uuid4())
+        self._current_user = None
+        self._user_loaded = False
+
+    @property
+    async def current_user(self):
+        """User authenticated by the request's bearer token, loaded once per request.
+
+        Browsers cannot set headers on WebSockets, so subscriptions may send the
+        header in the ``connection_init`` payload instead.
+        """
+        if not self._user_loaded:
+            self._user_loaded = True
+            token = self.bearer_token
+            if token:
+                try:
+                    self._current_user = await get_current_user(session=self.session, token=token)
+                except Exception as e:
+                    logger.debug(f"Rejected bearer token: {str(e)}")
+        return self._current_user
+
+    @property
+    def bearer_token(self) -> Optional[str]:
+        auth_header = self.request.headers.get("Authorization", "") if self.request else ""
+        if not auth_header and isinstance(self.connection_params, dict):
+            auth_header = str(self.connection_params.get("Authorization", ""))
+        return auth_header[7:] if auth_header.startswith("Bearer ") else None
 
 # Context getter for GraphQL
 async def get_context(session: AsyncSession = Depends(get_session)) -> Context:
     return Context(session=session)
 
-# Create GraphQL router
-graphql_app = GraphQLRouter(
+# Create GraphQL router with persisted queries and cacheable GET support
+graphql_app = PersistedQueryRouter(
     schema,
     path="/",
     context_getter=get_context
@@ -65,6 +111,12 @@ graphql_app = GraphQLRouter(
 # Add GraphQL router at /graphql path
 app.include_router(graphql_app, prefix="/graphql")
 
+# Streaming CSV/NDJSON/Parquet exports
+app.include_router(export_router)
+
+# iCalendar feeds
+app.include_router(calendar_router)
+
 # Redirect root to GraphQL playground
 @app.get("/")
 async def redirect_to_graphql():
@@ -87,15 +139,47 @@ async def health_check():
             content={"status": "unhealthy", "error": str(e)}
         )
 
+# Liveness probe: the process is up and its event loop is serving requests
+@app.get("/livez")
+async def liveness_check():
+    return {"status": "alive"}
+
+# Readiness probe: dependencies answer and the connection pool has headroom
+@app.get("/readyz")
+async def readiness_check():
+    status = await health.status()
+    return JSONResponse(
+        status_code=200 if status.ready else 503,
+        content=status.to_dict()
+    )
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 # Startup event handler
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup."""
     try:
-        # Create database tables
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-            logger.info("Database tables created successfully")
+        # Create database tables, unless they are managed outside the app
+        if not settings.FAST_BOOT:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                logger.info("Database tables created successfully")
+
+        # Apply edited prices before the first appointment is priced
+        if settings.SERVICE_CATALOG_FROM_DB:
+            async with async_session() as session:
+                await load_service_catalog(session, service_catalog)
+
+        # Make sure upcoming monthly partitions exist before bookings land
+        if settings.PARTITIONING_ENABLED:
+            await maintain_partitions(engine)
 
         # Initialize cache
         if settings.REDIS_ENABLED:
@@ -104,6 +188,18 @@ async def startup_event():
         else:
             logger.info("Using in-memory cache")
 
+        # Keep dashboard counters reconciled with the database
+        if settings.DASHBOARD_RECONCILER_ENABLED:
+            dashboard.start()
+
+        # Relay appointment changes published by other workers to subscribers
+        appointment_events.start()
+
+        # Deliver appointment reminders from the outbox
+        if settings.REMINDERS_ENABLED:
+            app.state.reminder_worker = ReminderWorker()
+            app.state.reminder_worker.start()
+
         # Log startup
         logger.info(f"Server started at http://{settings.HOST}:{settings.PORT}")
         logger.info(f"GraphQL playground available at http://{settings.HOST}:{settings.PORT}/graphql")
@@ -116,9 +212,14 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     try:
+        await dashboard.stop()
+        await appointment_events.stop()
+        if getattr(app.state, "reminder_worker", None):
+            await app.state.reminder_worker.stop()
         if settings.REDIS_ENABLED:
             await cache.close()
         await engine.dispose()
+        mark_worker_dead()
         logger.info("Server shutdown complete")
     except Exception as e:
         logger.error(f"Shutdown error: {str(e)}", exc_info=True)
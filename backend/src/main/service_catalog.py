@@ -0,0 +1,120 @@
+"""
+Table-driven catalog of service durations, prices and loyalty points.
+
+The catalog is built once (from the defaults below, optionally overridden by
+rows in the ``service_catalog`` table) into flat arrays indexed by service
+position, so every lookup is a dict hit plus an array index. ``estimate_costs``
+prices a whole list of appointments in one vectorized NumPy call; NumPy is only
+imported on first use, since the catalog itself is loaded at startup.
+"""
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# service value -> (duration minutes, base cost, loyalty points)
+DEFAULT_SERVICE_TABLE: Dict[str, Tuple[int, float, int]] = {
+    "Hair Cut": (30, 30.0, 10),
+    "Manicure": (45, 25.0, 8),
+    "Pedicure": (60, 35.0, 12),
+    "Facial": (60, 65.0, 15),
+    "Massage": (60, 75.0, 20),
+    "Hair Color": (120, 100.0, 25),
+    "Hair Style": (45, 45.0, 12),
+    "Makeup": (60, 55.0, 15),
+    "Waxing": (30, 30.0, 10),
+    "Other": (30, 40.0, 10),
+}
+
+# Values used for services missing from the table
+DEFAULT_ENTRY: Tuple[int, float, int] = (30, 40.0, 10)
+
+class ServiceCatalog:
+    """Array-backed lookup tables for a set of services.
+
+    ``services`` are the known service keys in a fixed order (the members of
+    ``ServiceType``). Keys are matched by value, so enum members and their
+    raw strings resolve to the same slot. The last slot of every table holds
+    ``DEFAULT_ENTRY`` and is used for unknown services.
+    """
+
+    def __init__(self, services: Iterable[str], table: Optional[Dict[str, Tuple[int, float, int]]] = None):
+        self._services: List[str] = list(services)
+        self._index: Dict[str, int] = {str(service): i for i, service in enumerate(self._services)}
+        self._default_slot = len(self._services)
+        self.load((table or DEFAULT_SERVICE_TABLE).items())
+
+    def load(self, rows: Iterable[Tuple[str, Tuple[int, float, int]]]) -> None:
+        """Replace catalog entries; services not in ``rows`` keep their current values."""
+        entries = {}
+        if hasattr(self, "_durations"):
+            entries = {
+                service: (self._durations[i], self._costs[i], self._points[i])
+                for service, i in self._index.items()
+            }
+        for service, (duration, cost, points) in rows:
+            if str(service) not in self._index:
+                logger.warning(f"Ignoring catalog entry for unknown service: {service}")
+                continue
+            entries[str(service)] = (int(duration), float(cost), int(points))
+
+        ordered = [entries.get(str(service), DEFAULT_ENTRY) for service in self._services] + [DEFAULT_ENTRY]
+        durations, costs, points = zip(*ordered)
+
+        # Swap whole tables at once so concurrent readers never see a mix
+        self._durations, self._costs, self._points = durations, costs, points
+        self._arrays = None
+
+    def __contains__(self, service: object) -> bool:
+        return service in self._index
+
+    def slot(self, service: str) -> int:
+        """Array position of a service, or the default slot if unknown."""
+        return self._index.get(service, self._default_slot)
+
+    def duration_minutes(self, service: str) -> int:
+        return self._durations[self._index.get(service, self._default_slot)]
+
+    def base_cost(self, service: str) -> float:
+        return self._costs[self._index.get(service, self._default_slot)]
+
+    def loyalty_points(self, service: str) -> int:
+        return self._points[self._index.get(service, self._default_slot)]
+
+    def estimate_cost(self, service: str, duration_minutes: float) -> float:
+        """Base cost scaled by the booked duration relative to the standard duration."""
+        slot = self._index.get(service, self._default_slot)
+        return float(self._costs[slot] * (duration_minutes / self._durations[slot]))
+
+    def estimate_costs(self, service_types: Sequence[str], durations: Sequence[float]) -> "np.ndarray":
+        """Vectorized ``estimate_cost`` over parallel sequences of services and durations."""
+        import numpy as np
+
+        arrays = self._arrays
+        if arrays is None:
+            arrays = self._arrays = (
+                np.asarray(self._costs, dtype=np.float64),
+                np.asarray(self._durations, dtype=np.float64)
+            )
+        cost_array, duration_array = arrays
+        index, default = self._index, self._default_slot
+        slots = np.fromiter((index.get(s, default) for s in service_types), dtype=np.intp, count=len(service_types))
+        return cost_array[slots] * (np.asarray(durations, dtype=np.float64) / duration_array[slots])
+
+async def load_service_catalog(session: AsyncSession, catalog: ServiceCatalog) -> int:
+    """Override catalog entries with the rows of the ``service_catalog`` table."""
+    result = await session.execute(text(
+        "SELECT service_type, duration_minutes, base_cost, loyalty_points FROM service_catalog"
+    ))
+    rows = [(row[0], (row[1], row[2], row[3])) for row in result]
+    catalog.load(rows)
+    logger.info(f"Loaded {len(rows)} service catalog entries from the database")
+    return len(rows)
+
+__all__ = ["ServiceCatalog", "DEFAULT_SERVICE_TABLE", "load_service_catalog"]
@@ -0,0 +1,290 @@
+"""
+Service completion pipeline that keeps client aggregates in sync with history.
+
+Recording a ``ServiceHistory`` row, directly or by completing an appointment,
+updates ``Client.loyalty_points``, ``total_spent``, ``visit_count`` and
+``last_visit`` with a single relative ``UPDATE`` in the same transaction, then
+promotes the client category when a threshold is crossed. Aggregates are never
+recomputed from the full history on the request path; ``reconcile_client_aggregates``
+does that in bulk to detect (and optionally repair) drift.
+
+Redemptions never take a client's loyalty balance below zero, and an
+appointment is completed by one conditional ``UPDATE`` so that concurrent
+completions record its visit exactly once.
+"""
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import List, Optional
+import logging
+
+from sqlalchemy import select, update, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.main.models import (
+    Appointment, AppointmentStatus, Client, ClientCategory, ServiceHistory,
+    ServiceType, appointment_attendees
+)
+
+logger = logging.getLogger(__name__)
+
+SATISFACTION_RATINGS = range(1, 6)
+
+# Appointments in these states can no longer be completed
+FINAL_STATUSES = (AppointmentStatus.COMPLETED, AppointmentStatus.CANCELLED, AppointmentStatus.DECLINED)
+
+# (category, minimum visits, minimum total spent); a client qualifies for the
+# first category where either threshold is met. Categories are only promoted.
+CATEGORY_THRESHOLDS = (
+    (ClientCategory.PREMIUM, 50, 5000.0),
+    (ClientCategory.VIP, 20, 2000.0),
+    (ClientCategory.REGULAR, 3, 300.0),
+)
+
+CATEGORY_RANK = {
+    ClientCategory.NEW: 0,
+    ClientCategory.REGULAR: 1,
+    ClientCategory.VIP: 2,
+    ClientCategory.PREMIUM: 3,
+}
+
+def category_for(visit_count: int, total_spent: float) -> ClientCategory:
+    """Category a client qualifies for based on visits and spend."""
+    for category, min_visits, min_spent in CATEGORY_THRESHOLDS:
+        if visit_count >= min_visits or total_spent >= min_spent:
+            return category
+    return ClientCategory.NEW
+
+def promoted_category(current: ClientCategory, visit_count: int, total_spent: float) -> ClientCategory:
+    """Return the qualifying category if it is higher than ``current``, else ``current``."""
+    qualified = category_for(visit_count, total_spent)
+    if CATEGORY_RANK[qualified] > CATEGORY_RANK.get(current, 0):
+        return qualified
+    return current
+
+async def apply_visit(
+    session: AsyncSession,
+    client_id: str,
+    cost: float,
+    points_earned: int,
+    points_redeemed: int,
+    visited_at: datetime
+) -> Optional[ClientCategory]:
+    """Add one visit to a client's aggregates and promote them if they qualify.
+
+    Returns the client's category after the update, or None if the client
+    does not exist or has fewer than ``points_redeemed`` loyalty points.
+    """
+    stmt = (
+        update(Client)
+        .where(Client.id == client_id, Client.loyalty_points >= points_redeemed)
+        .values(
+            loyalty_points=Client.loyalty_points + (points_earned - points_redeemed),
+            total_spent=Client.total_spent + cost,
+            visit_count=Client.visit_count + 1,
+            last_visit=func.greatest(func.coalesce(Client.last_visit, literal(visited_at)), literal(visited_at))
+        )
+        .returning(Client.visit_count, Client.total_spent, Client.category)
+    )
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        return None
+
+    visit_count, total_spent, category = row
+    new_category = promoted_category(category, visit_count, total_spent)
+    if new_category != category:
+        await session.execute(
+            update(Client).where(Client.id == client_id).values(category=new_category)
+        )
+        logger.info(f"Client {client_id} promoted from {category} to {new_category}")
+    return new_category
+
+async def record_service(
+    session: AsyncSession,
+    client_id: str,
+    service_type: ServiceType,
+    provider_name: str,
+    date_of_service: Optional[datetime] = None,
+    service_cost: Optional[float] = None,
+    service_duration: Optional[int] = None,
+    points_redeemed: int = 0,
+    satisfaction_rating: Optional[int] = None,
+    feedback: Optional[str] = None,
+    notes: Optional[str] = None,
+    package_id: Optional[str] = None
+) -> ServiceHistory:
+    """Insert a ServiceHistory row and fold it into the client's aggregates.
+
+    Must be called inside the caller's transaction so the history row and the
+    aggregate update commit or roll back together. Raises ValueError for a
+    negative cost or redemption, a rating outside 1-5, or a redemption above
+    the client's loyalty balance.
+    """
+    if service_cost is not None and service_cost < 0:
+        raise ValueError("Service cost cannot be negative")
+    if points_redeemed < 0:
+        raise ValueError("Redeemed points cannot be negative")
+    if satisfaction_rating is not None and satisfaction_rating not in SATISFACTION_RATINGS:
+        raise ValueError("Satisfaction rating must be between 1 and 5")
+    service_type = ServiceType(service_type)
+    history = ServiceHistory(
+        client_id=client_id,
+        service_type=service_type,
+        provider_name=provider_name,
+        date_of_service=date_of_service or datetime.now(UTC),
+        service_cost=ServiceType.get_base_cost(service_type) if service_cost is None else service_cost,
+        service_duration=ServiceType.get_duration_minutes(service_type) if service_duration is None else service_duration,
+        loyalty_points_earned=ServiceType.get_loyalty_points(service_type),
+        points_redeemed=points_redeemed,
+        satisfaction_rating=satisfaction_rating,
+        feedback=feedback,
+        notes=notes,
+        package_id=package_id
+    )
+    session.add(history)
+    await session.flush()
+
+    category = await apply_visit(
+        session,
+        client_id,
+        cost=history.service_cost,
+        points_earned=history.loyalty_points_earned,
+        points_redeemed=history.points_redeemed,
+        visited_at=history.date_of_service
+    )
+    if category is None:
+        if await session.scalar(select(Client.id).where(Client.id == client_id)) is None:
+            raise ValueError("Client not found")
+        raise ValueError("Not enough loyalty points to redeem")
+    return history
+
+async def complete_appointment(
+    session: AsyncSession,
+    appointment: Appointment,
+    provider_name: str
+) -> Optional[List[ServiceHistory]]:
+    """Mark an appointment COMPLETED and record the service for its clients.
+
+    The clients are the client profiles of the attendees, falling back to the
+    creator's profile. Completing an already completed appointment is a no-op
+    returning ``None``, so retries never double-count a visit. The status changes through a
+    conditional ``UPDATE``: of two concurrent completions, the second waits
+    for the first's row lock and then matches nothing.
+    """
+    completed = await session.execute(
+        update(Appointment)
+        .where(Appointment.id == appointment.id, Appointment.status.not_in(FINAL_STATUSES))
+        .values(status=AppointmentStatus.COMPLETED)
+        .returning(Appointment.id)
+    )
+    if completed.scalar_one_or_none() is None:
+        await session.refresh(appointment, ["status"])
+        if appointment.status == AppointmentStatus.COMPLETED:
+            return None
+        raise ValueError(f"Cannot complete a {appointment.status.value.lower()} appointment")
+
+    attendee_ids = select(appointment_attendees.c.user_id).where(
+        appointment_attendees.c.appointment_id == appointment.id
+    )
+    client_ids = (await session.execute(
+        select(Client.id).where(Client.user_id.in_(attendee_ids))
+    )).scalars().all()
+    if not client_ids:
+        client_ids = (await session.execute(
+            select(Client.id).where(Client.user_id == appointment.creatorId)
+        )).scalars().all()
+
+    cost = float(appointment.estimated_cost)
+    return [
+        await record_service(
+            session,
+            client_id,
+            service_type=appointment.serviceType,
+            provider_name=provider_name,
+            date_of_service=appointment.startTime,
+            service_cost=cost,
+            service_duration=appointment.durationMinutes
+        )
+        for client_id in client_ids
+    ]
+
+@dataclass
+class ClientDrift:
+    """Difference between a client's stored aggregates and its service history."""
+    client_id: str
+    loyalty_points: int
+    expected_loyalty_points: int
+    total_spent: float
+    expected_total_spent: float
+    visit_count: int
+    expected_visit_count: int
+    last_visit: Optional[datetime]
+    expected_last_visit: Optional[datetime]
+
+async def reconcile_client_aggregates(session: AsyncSession, fix: bool = False) -> List[ClientDrift]:
+    """Compare every client's aggregates against its history in one set-based query.
+
+    With ``fix=True`` drifted clients are rewritten from history (and promoted
+    if they now qualify for a higher category).
+    """
+    history = (
+        select(
+            ServiceHistory.client_id.label("client_id"),
+            func.sum(ServiceHistory.loyalty_points_earned - ServiceHistory.points_redeemed).label("points"),
+            func.sum(ServiceHistory.service_cost).label("spent"),
+            func.count().label("visits"),
+            func.max(ServiceHistory.date_of_service).label("last_visit")
+        )
+        .group_by(ServiceHistory.client_id)
+        .subquery()
+    )
+    expected_points = func.coalesce(history.c.points, 0)
+    expected_spent = func.coalesce(history.c.spent, 0.0)
+    expected_visits = func.coalesce(history.c.visits, 0)
+
+    stmt = (
+        select(
+            Client.id, Client.category,
+            Client.loyalty_points, expected_points,
+            Client.total_spent, expected_spent,
+            Client.visit_count, expected_visits,
+            Client.last_visit, history.c.last_visit
+        )
+        .outerjoin(history, history.c.client_id == Client.id)
+        .where(
+            (Client.loyalty_points != expected_points)
+            | (func.abs(Client.total_spent - expected_spent) > 0.005)
+            | (Client.visit_count != expected_visits)
+            | Client.last_visit.is_distinct_from(history.c.last_visit)
+        )
+    )
+    drifts = []
+    for row in await session.execute(stmt):
+        drift = ClientDrift(
+            client_id=row[0],
+            loyalty_points=row[2], expected_loyalty_points=int(row[3]),
+            total_spent=row[4], expected_total_spent=float(row[5]),
+            visit_count=row[6], expected_visit_count=int(row[7]),
+            last_visit=row[8], expected_last_visit=row[9]
+        )
+        drifts.append(drift)
+        if fix:
+            await session.execute(
+                update(Client)
+                .where(Client.id == drift.client_id)
+                .values(
+                    loyalty_points=drift.expected_loyalty_points,
+                    total_spent=drift.expected_total_spent,
+                    visit_count=drift.expected_visit_count,
+                    last_visit=drift.expected_last_visit,
+                    category=promoted_category(row[1], drift.expected_visit_count, drift.expected_total_spent)
+                )
+            )
+
+    if drifts:
+        logger.warning(f"Found {len(drifts)} clients with aggregate drift{' (fixed)' if fix else ''}")
+    return drifts
+
+__all__ = [
+    "category_for", "promoted_category", "apply_visit", "record_service",
+    "complete_appointment", "reconcile_client_aggregates", "ClientDrift"
+]
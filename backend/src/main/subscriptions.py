@@ -0,0 +1,102 @@
+"""
+GraphQL subscription definitions for the application.
+
+A subscription authenticates once, then releases the request's database
+session: a WebSocket can stay open for hours and must not hold a pooled
+connection (idle in transaction) for all that time. While it runs, the
+stream ends with an error when the bearer token expires, and the user's
+account is re-checked every ``SUBSCRIPTION_AUTH_RECHECK_SECONDS`` in a
+short-lived session: disabling a user ends their subscriptions, and a
+change of ``is_admin`` changes which appointments they see.
+"""
+import asyncio
+from datetime import datetime, UTC
+import time
+from typing import AsyncGenerator, Optional, Tuple
+import logging
+
+import jwt
+import strawberry
+from sqlalchemy import select
+from strawberry.types import Info
+
+from src.main.auth import check_auth
+from src.main.broadcast import Subscription as EventSubscription, appointment_events
+from src.main.config import settings
+from src.main.database import async_session
+from src.main.models import User
+from src.main.schema_types import AppointmentChange
+from src.main.typing import CustomContext
+
+logger = logging.getLogger(__name__)
+
+def token_expiry(token: Optional[str]) -> Optional[float]:
+    """Expiry (epoch seconds) of an already verified bearer token, if it has one."""
+    if not token:
+        return None
+    payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    return float(payload["exp"]) if "exp" in payload else None
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """``value`` as an aware datetime; naive values are taken to be UTC."""
+    if value is None:
+        return None
+    return value.astimezone(UTC) if value.tzinfo else value.replace(tzinfo=UTC)
+
+async def user_access(user_id: str) -> Tuple[bool, bool]:
+    """Whether the user is still enabled, and whether they are an administrator."""
+    async with async_session() as session:
+        row = (await session.execute(select(User.enabled, User.is_admin).where(User.id == user_id))).one_or_none()
+    return (bool(row.enabled), bool(row.is_admin)) if row is not None else (False, False)
+
+async def authorized_events(subscription: EventSubscription, user, expires_at: Optional[float]):
+    """Events from ``subscription`` the user may see while authorized; raises PermissionError once not."""
+    user_id, is_admin = user.id, bool(user.is_admin)
+    recheck_at = time.monotonic() + settings.SUBSCRIPTION_AUTH_RECHECK_SECONDS
+    while True:
+        timeout = recheck_at - time.monotonic()
+        if expires_at is not None:
+            timeout = min(timeout, expires_at - time.time())
+        event = None
+        if timeout > 0:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        if expires_at is not None and time.time() >= expires_at:
+            raise PermissionError("Token has expired")
+        if time.monotonic() >= recheck_at:
+            enabled, is_admin = await user_access(user_id)
+            if not enabled:
+                logger.info(f"Ending subscriptions of disabled user {user_id}")
+                raise PermissionError("User account is disabled")
+            recheck_at = time.monotonic() + settings.SUBSCRIPTION_AUTH_RECHECK_SECONDS
+        if event is not None and event.visible_to(user_id, is_admin):
+            yield event
+
+@strawberry.type
+class Subscription:
+    """Root subscription type for the GraphQL schema."""
+
+    @strawberry.subscription
+    async def appointment_changed(
+        self,
+        info: Info[CustomContext, None],
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> AsyncGenerator[AppointmentChange, None]:
+        """Appointments created, updated, deleted or completed from now on, starting in [dateFrom, dateTo)."""
+        current_user = await check_auth(info)
+        expires_at = token_expiry(getattr(info.context, "bearer_token", None))
+        # Ends the transaction and returns the connection to the pool
+        await info.context.session.close()
+        # Event start times are aware; the DateTime scalar also accepts naive values
+        date_from, date_to = as_utc(date_from), as_utc(date_to)
+
+        with appointment_events.subscribe() as subscription:
+            async for event in authorized_events(subscription, current_user, expires_at):
+                if event.starts_between(date_from, date_to):
+                    yield AppointmentChange.from_event(event)
+
+__all__ = ["Subscription", "authorized_events", "as_utc", "token_expiry"]
@@ -0,0 +1,378 @@
+"""
+Synthetic dataset generation for scale and load testing.
+
+``SyntheticDataset`` describes a dataset of staff providers, clients (each
+with its user), appointments and their attendees, service history and
+service packages as streams of row tuples. Nothing is materialized: every
+stream is driven by its own seeded ``random.Random``, so the same spec always
+produces the same rows and the appointment stream can be replayed to derive
+attendees and history without keeping appointments in memory. Memory grows
+with the number of clients and providers (their ids), not with row counts.
+
+Distributions come from the service catalog: services are drawn with
+salon-like popularity weights, durations are the catalog duration, sometimes
+extended, and prices are the catalog estimate with a small spread. Clients
+visit with a heavy-tailed frequency, so a few regulars account for a large
+share of the history. Each provider's appointments never overlap: they are
+placed one after another within opening hours with exponential gaps sized to
+spread the provider's bookings over the dataset window, and never later than
+what still lets the provider's remaining bookings end within the window. A
+spec asking for more bookings than its providers can take is rejected.
+
+``load_dataset`` bulk-loads the streams with PostgreSQL ``COPY`` in batches
+and then derives client aggregates from the history in one set-based update.
+"""
+import base64
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+from itertools import accumulate, islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.main.models import AppointmentStatus, ClientCategory, ClientStatus, ServiceType, service_catalog
+from src.main.service_completion import CATEGORY_THRESHOLDS
+
+logger = logging.getLogger(__name__)
+
+# Relative popularity of each service
+SERVICE_WEIGHTS: Dict[ServiceType, int] = {
+    ServiceType.HAIRCUT: 30,
+    ServiceType.MANICURE: 14,
+    ServiceType.PEDICURE: 10,
+    ServiceType.MASSAGE: 10,
+    ServiceType.HAIRCOLOR: 9,
+    ServiceType.FACIAL: 8,
+    ServiceType.HAIRSTYLE: 8,
+    ServiceType.WAXING: 5,
+    ServiceType.MAKEUP: 4,
+    ServiceType.OTHER: 2,
+}
+
+# Extra minutes added to the catalog duration, with weights
+EXTENSIONS = ((0, 70), (15, 20), (30, 10))
+
+PAST_STATUSES = ((AppointmentStatus.COMPLETED, 85), (AppointmentStatus.CANCELLED, 10), (AppointmentStatus.DECLINED, 5))
+FUTURE_STATUSES = ((AppointmentStatus.SCHEDULED, 60), (AppointmentStatus.CONFIRMED, 30), (AppointmentStatus.CANCELLED, 10))
+CLIENT_STATUSES = ((ClientStatus.ACTIVE, 90), (ClientStatus.INACTIVE, 8), (ClientStatus.BLOCKED, 2))
+RATINGS = ((None, 30), (5, 35), (4, 24), (3, 7), (2, 2), (1, 2))
+
+FIRST_NAMES = (
+    "Ana", "Ben", "Chloe", "David", "Elena", "Farah", "George", "Hana", "Ivan", "Julia",
+    "Kofi", "Lena", "Mateo", "Nora", "Omar", "Priya", "Quinn", "Rosa", "Sam", "Tariq",
+)
+LAST_NAMES = (
+    "Almeida", "Brown", "Chen", "Diaz", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Jones",
+    "Kowalski", "Lopez", "Moreau", "Nguyen", "Okafor", "Patel", "Rossi", "Silva", "Tanaka", "Weber",
+)
+FEEDBACK = ("Great service", "Very relaxing", "Ran a bit late", "Will book again", "Friendly staff")
+
+# Opening hours (UTC) and open days (Monday=0 .. Saturday=5)
+OPENING_HOUR = 9
+CLOSING_HOUR = 18
+OPEN_WEEKDAYS = 6
+
+USER_COLUMNS = ("id", "username", "email", "password", "first_name", "last_name", "enabled", "is_admin")
+CLIENT_COLUMNS = (
+    "id", "phone", "service", "status", "notes", "category",
+    "loyalty_points", "total_spent", "last_visit", "visit_count", "user_id"
+)
+APPOINTMENT_COLUMNS = (
+    "id", "title", "description", "start_time", "duration_minutes", "end_time",
+    "status", "service_type", "creator_id"
+)
+ATTENDEE_COLUMNS = ("user_id", "appointment_id")
+HISTORY_COLUMNS = (
+    "id", "client_id", "service_type", "provider_name", "date_of_service", "notes", "service_cost",
+    "loyalty_points_earned", "points_redeemed", "satisfaction_rating", "feedback", "service_duration"
+)
+PACKAGE_COLUMNS = (
+    "id", "client_id", "service_type", "total_sessions", "sessions_remaining", "purchase_date",
+    "expiry_date", "package_cost", "minimum_interval", "last_session_date", "average_satisfaction"
+)
+
+def _weighted(options: Iterable[Tuple[object, int]]) -> Tuple[List[object], List[int]]:
+    values, weights = zip(*options)
+    return list(values), list(accumulate(weights))
+
+def _choose(rng: random.Random, table: Tuple[List[object], List[int]]):
+    values, cum_weights = table
+    return rng.choices(values, cum_weights=cum_weights)[0]
+
+def make_id(rng: random.Random) -> str:
+    """21 character id from the nanoid alphabet, drawn from ``rng``."""
+    return base64.urlsafe_b64encode(rng.randbytes(16))[:21].decode()
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Size and shape of a synthetic dataset."""
+    password_hash: str
+    clients: int = 100_000
+    providers: int = 300  # enough for the default appointments to fit the window
+    appointments: int = 2_000_000
+    packages: int = 200_000
+    days: int = 3 * 365  # window the appointments are spread over
+    future_days: int = 60  # part of the window after ``now``
+    now: datetime = field(default_factory=lambda: datetime.now(UTC))
+    prefix: str = "synthetic"
+    seed: int = 42
+
+class PlannedAppointment(NamedTuple):
+    id: str
+    provider: int
+    client: int
+    service: ServiceType
+    start: datetime
+    duration: int
+    status: AppointmentStatus
+    cost_factor: float
+    rating: Optional[int]
+    feedback: Optional[str]
+    history_id: str
+
+class SyntheticDataset:
+    """Row streams for every table of a synthetic dataset."""
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        rng = random.Random(f"{spec.seed}:ids")
+        self.provider_ids = [make_id(rng) for _ in range(spec.providers)]
+        self.provider_names = [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(spec.providers)]
+        self.client_ids = [make_id(rng) for _ in range(spec.clients)]
+        self.client_user_ids = [make_id(rng) for _ in range(spec.clients)]
+        # Zipf-like visit frequency: client i is (i + 1) ** 0.8 times rarer than client 0
+        self._client_weights = list(accumulate(1 / (i + 1) ** 0.8 for i in range(spec.clients)))
+        self._services = _weighted(SERVICE_WEIGHTS.items())
+        self.start = (spec.now - timedelta(days=spec.days - spec.future_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        self.mean_duration = sum(
+            service_catalog.duration_minutes(service) * weight for service, weight in SERVICE_WEIGHTS.items()
+        ) / sum(SERVICE_WEIGHTS.values()) + sum(minutes * weight for minutes, weight in EXTENSIONS) / 100
+        # Bookable minutes per provider in the window; on average half a booking is lost at closing time
+        self.bookable_minutes = spec.days * OPEN_WEEKDAYS / 7 * (
+            (CLOSING_HOUR - OPENING_HOUR) * 60 - self.mean_duration / 2
+        )
+        # Bookings beyond a provider's capacity would spill past the end of the window
+        busiest = -(-spec.appointments // spec.providers) if spec.providers else 0
+        if busiest * self.mean_duration > self.bookable_minutes:
+            raise ValueError(
+                f"{busiest:,} appointments per provider need about {busiest * self.mean_duration:,.0f} minutes, "
+                f"but {spec.days} days only have {self.bookable_minutes:,.0f}; add providers or days"
+            )
+
+    def _pick_client(self, rng: random.Random) -> int:
+        return rng.choices(range(self.spec.clients), cum_weights=self._client_weights)[0]
+
+    def _pick_service(self, rng: random.Random) -> ServiceType:
+        return _choose(rng, self._services)
+
+    def users(self) -> Iterator[tuple]:
+        rng = random.Random(f"{self.spec.seed}:users")
+        prefix, password = self.spec.prefix, self.spec.password_hash
+        for i, (user_id, name) in enumerate(zip(self.provider_ids, self.provider_names)):
+            first, last = name.split(" ")
+            username = f"{prefix}_provider{i}"
+            yield (user_id, username, f"{username}@example.com", password, first, last, True, False)
+        for i, user_id in enumerate(self.client_user_ids):
+            username = f"{prefix}_client{i}"
+            yield (
+                user_id, username, f"{username}@example.com", password,
+                rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), True, False
+            )
+
+    def clients(self) -> Iterator[tuple]:
+        """Clients with zeroed aggregates; ``load_dataset`` derives them from history."""
+        rng = random.Random(f"{self.spec.seed}:clients")
+        statuses = _weighted(CLIENT_STATUSES)
+        for client_id, user_id in zip(self.client_ids, self.client_user_ids):
+            yield (
+                client_id, f"+1{rng.randrange(2_000_000_000, 10_000_000_000)}",
+                self._pick_service(rng).value, _choose(rng, statuses).value, None,
+                ClientCategory.NEW.value, 0, 0.0, None, 0, user_id
+            )
+
+    def _latest_starts(self, durations: List[int]) -> List[datetime]:
+        """Latest start of each booking that still lets the ones after it end within the window."""
+        opening, closing = timedelta(hours=OPENING_HOUR), timedelta(hours=CLOSING_HOUR)
+        day = self.start + timedelta(days=self.spec.days - 1)
+        limit = day + closing
+        latest = []
+        for duration in reversed(durations):
+            duration = timedelta(minutes=duration)
+            while day.weekday() >= OPEN_WEEKDAYS or limit - duration < day + opening:
+                day -= timedelta(days=1)
+                limit = day + closing
+                if day < self.start:
+                    raise ValueError(
+                        f"{len(durations):,} appointments for one provider do not fit in {self.spec.days} days; "
+                        "add providers or days"
+                    )
+            limit -= duration
+            latest.append(limit)
+        return latest[::-1]
+
+    def appointment_plan(self) -> Iterator[PlannedAppointment]:
+        """Every appointment, provider by provider, in start order per provider."""
+        spec = self.spec
+        opening, closing = timedelta(hours=OPENING_HOUR), timedelta(hours=CLOSING_HOUR)
+        extensions = _weighted(EXTENSIONS)
+        past, future, ratings = _weighted(PAST_STATUSES), _weighted(FUTURE_STATUSES), _weighted(RATINGS)
+
+        for provider in range(spec.providers):
+            count = spec.appointments // spec.providers + (provider < spec.appointments % spec.providers)
+            if not count:
+                continue
+            rng = random.Random(f"{spec.seed}:appointments:{provider}")
+            services = [self._pick_service(rng) for _ in range(count)]
+            durations = [service_catalog.duration_minutes(service) + _choose(rng, extensions) for service in services]
+            latest_starts = self._latest_starts(durations)
+            # Idle time between bookings that spreads them over the window
+            mean_gap = max(self.bookable_minutes / count - self.mean_duration, 1.0)
+            day = self.start
+            cursor = day + opening
+
+            for service, duration, latest_start in zip(services, durations, latest_starts):
+                start = cursor + timedelta(minutes=15 * round(rng.expovariate(1 / mean_gap) / 15))
+                while day.weekday() >= OPEN_WEEKDAYS or start + timedelta(minutes=duration) > day + closing:
+                    # Carry the part of the gap past closing time over to the next open day
+                    if day.weekday() >= OPEN_WEEKDAYS:
+                        spill = start - (day + opening)
+                    else:
+                        spill = max(start - (day + closing), timedelta(0))
+                    day += timedelta(days=1)
+                    start = day + opening + spill
+                if start > latest_start:
+                    # Random gaps ran ahead; the remaining bookings must still fit the window
+                    start = latest_start
+                    day = start.replace(hour=0, minute=0)
+                cursor = start + timedelta(minutes=duration)
+
+                status = _choose(rng, past if start < spec.now else future)
+                rating = _choose(rng, ratings)
+                yield PlannedAppointment(
+                    id=make_id(rng),
+                    provider=provider,
+                    client=self._pick_client(rng),
+                    service=service,
+                    start=start,
+                    duration=duration,
+                    status=status,
+                    cost_factor=rng.uniform(0.9, 1.15),
+                    rating=rating,
+                    feedback=rng.choice(FEEDBACK) if rating is not None and rng.random() < 0.2 else None,
+                    history_id=make_id(rng)
+                )
+
+    def appointments(self) -> Iterator[tuple]:
+        for plan in self.appointment_plan():
+            yield (
+                plan.id, plan.service.value, None, plan.start, plan.duration,
+                plan.start + timedelta(minutes=plan.duration), plan.status.value,
+                plan.service.value, self.provider_ids[plan.provider]
+            )
+
+    def attendees(self) -> Iterator[tuple]:
+        for plan in self.appointment_plan():
+            yield (self.client_user_ids[plan.client], plan.id)
+
+    def service_history(self) -> Iterator[tuple]:
+        """One history row per completed appointment."""
+        for plan in self.appointment_plan():
+            if plan.status != AppointmentStatus.COMPLETED:
+                continue
+            cost = service_catalog.estimate_cost(plan.service, plan.duration) * plan.cost_factor
+            yield (
+                plan.history_id, self.client_ids[plan.client], plan.service.value,
+                self.provider_names[plan.provider], plan.start, None, round(cost, 2),
+                service_catalog.loyalty_points(plan.service), 0, plan.rating, plan.feedback, plan.duration
+            )
+
+    def packages(self) -> Iterator[tuple]:
+        spec = self.spec
+        rng = random.Random(f"{spec.seed}:packages")
+        window = spec.days * 24 * 60
+        for _ in range(spec.packages):
+            service = self._pick_service(rng)
+            sessions = rng.choice((5, 6, 8, 10, 12))
+            purchased = self.start + timedelta(minutes=rng.randrange(window))
+            expiry = purchased + timedelta(days=rng.choice((180, 365)))
+            remaining = rng.randrange(0, sessions // 2 + 1) if expiry < spec.now else rng.randrange(0, sessions + 1)
+            last_session = None
+            if remaining < sessions:
+                last_session = min(purchased + timedelta(days=rng.randrange(1, 180)), spec.now)
+            cost = service_catalog.estimate_cost(service, service_catalog.duration_minutes(service)) * sessions
+            yield (
+                make_id(rng), self.client_ids[self._pick_client(rng)], service.value, sessions, remaining,
+                purchased, expiry, round(cost * rng.uniform(0.8, 0.9), 2), rng.choice((7, 14)),
+                last_session, round(rng.uniform(3.5, 5.0), 1) if last_session else None
+            )
+
+    def tables(self) -> List[Tuple[str, Tuple[str, ...], Iterator[tuple]]]:
+        """(table, columns, rows) in foreign key order."""
+        return [
+            ("users", USER_COLUMNS, self.users()),
+            ("clients", CLIENT_COLUMNS, self.clients()),
+            ("appointments", APPOINTMENT_COLUMNS, self.appointments()),
+            ("appointment_attendees", ATTENDEE_COLUMNS, self.attendees()),
+            ("service_history", HISTORY_COLUMNS, self.service_history()),
+            ("service_packages", PACKAGE_COLUMNS, self.packages()),
+        ]
+
+async def copy_rows(connection, table: str, columns: Tuple[str, ...], rows: Iterator[tuple], batch_size: int) -> int:
+    """COPY ``rows`` into ``table`` in batches over an asyncpg connection; returns the row count."""
+    total = 0
+    while batch := list(islice(rows, batch_size)):
+        await connection.copy_records_to_table(table, records=batch, columns=columns)
+        total += len(batch)
+        logger.info(f"{table}: {total:,} rows")
+    return total
+
+def _category_case() -> str:
+    # CASE expression mirroring service_completion.category_for
+    branches = " ".join(
+        f"WHEN h.visits >= {visits} OR h.spent >= {spent} THEN '{category.value}'"
+        for category, visits, spent in CATEGORY_THRESHOLDS
+    )
+    return f"CASE {branches} ELSE '{ClientCategory.NEW.value}' END"
+
+async def refresh_client_aggregates(connection, client_ids: List[str]) -> None:
+    """Set loyalty points, spend, visits, last visit and category of clients from their history."""
+    await connection.execute(f"""
+        UPDATE clients c SET
+            loyalty_points = h.points,
+            total_spent = h.spent,
+            visit_count = h.visits,
+            last_visit = h.last_visit,
+            category = {_category_case()}
+        FROM (
+            SELECT client_id,
+                   SUM(loyalty_points_earned - points_redeemed) AS points,
+                   SUM(service_cost) AS spent,
+                   COUNT(*) AS visits,
+                   MAX(date_of_service) AS last_visit
+            FROM service_history
+            WHERE client_id = ANY($1::varchar[])
+            GROUP BY client_id
+        ) h
+        WHERE c.id = h.client_id
+    """, client_ids)
+
+async def load_dataset(engine: AsyncEngine, dataset: SyntheticDataset, batch_size: int = 50_000) -> Dict[str, int]:
+    """Load every table of ``dataset`` in one transaction; returns rows per table."""
+    counts = {}
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        connection = raw.driver_connection
+        async with connection.transaction():
+            for table, columns, rows in dataset.tables():
+                counts[table] = await copy_rows(connection, table, columns, rows, batch_size)
+            await refresh_client_aggregates(connection, dataset.client_ids)
+    return counts
+
+__all__ = [
+    "DatasetSpec", "SyntheticDataset", "PlannedAppointment", "SERVICE_WEIGHTS",
+    "make_id", "copy_rows", "refresh_client_aggregates", "load_dataset"
+]
@@ -0,0 +1,235 @@
+"""
+Per-request tracing of resolvers, SQL statements and cache lookups.
+
+A traced operation records the duration of every resolver by field path, the
+number and duration of SQL statements issued through ``engine`` (attributed
+to the resolver that issued them, so an N+1 shows up as one field path with a
+statement count equal to the list size) and the shared cache hits and misses.
+
+Operations are traced when ``TRACING_ENABLED`` is set, in which case a summary
+is logged, or when the request carries the ``TRACING_HEADER`` header in debug
+mode; the trace is then returned in the Apollo tracing format under
+``extensions.tracing`` together with ``extensions.sql`` and ``extensions.cache``.
+Untraced requests pay one context variable lookup per resolver and statement.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from inspect import isawaitable
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from sqlalchemy import event
+from strawberry.extensions import SchemaExtension
+
+from src.main.cache import RedisCache
+from src.main.config import settings
+from src.main.database import engine
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ResolverTiming:
+    """One resolver call, offsets in nanoseconds from the start of the request."""
+    path: Tuple[Any, ...]
+    parent_type: str
+    field_name: str
+    return_type: str
+    start_offset: int
+    duration: int = 0
+    sql_count: int = 0
+
+@dataclass
+class RequestTrace:
+    """Everything recorded for one traced operation."""
+    started_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    start_ns: int = field(default_factory=time.perf_counter_ns)
+    end_ns: int = 0
+    parsing: Tuple[int, int] = (0, 0)
+    validation: Tuple[int, int] = (0, 0)
+    resolvers: List[ResolverTiming] = field(default_factory=list)
+    sql_count: int = 0
+    sql_duration_ns: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def offset(self) -> int:
+        return time.perf_counter_ns() - self.start_ns
+
+    def to_apollo(self) -> Dict[str, Any]:
+        """Apollo tracing (version 1) representation."""
+        ended_at = datetime.fromtimestamp(
+            self.started_at.timestamp() + (self.end_ns - self.start_ns) / 1e9, UTC
+        )
+        return {
+            "version": 1,
+            "startTime": self.started_at.isoformat(),
+            "endTime": ended_at.isoformat(),
+            "duration": self.end_ns - self.start_ns,
+            "parsing": {"startOffset": self.parsing[0], "duration": self.parsing[1]},
+            "validation": {"startOffset": self.validation[0], "duration": self.validation[1]},
+            "execution": {
+                "resolvers": [
+                    {
+                        "path": list(resolver.path),
+                        "parentType": resolver.parent_type,
+                        "fieldName": resolver.field_name,
+                        "returnType": resolver.return_type,
+                        "startOffset": resolver.start_offset,
+                        "duration": resolver.duration,
+                        "sqlCount": resolver.sql_count,
+                    }
+                    for resolver in self.resolvers
+                ]
+            },
+        }
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+_current_resolver: ContextVar[Optional[ResolverTiming]] = ContextVar("current_resolver", default=None)
+
+def current_trace() -> Optional[RequestTrace]:
+    """Trace of the operation being executed in this context, if any."""
+    return _current_trace.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_trace.get() is not None:
+        conn.info.setdefault("trace_query_start", []).append(time.perf_counter_ns())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current_trace.get()
+    if trace is None or not conn.info.get("trace_query_start"):
+        return
+    trace.sql_count += 1
+    trace.sql_duration_ns += time.perf_counter_ns() - conn.info["trace_query_start"].pop()
+    resolver = _current_resolver.get()
+    if resolver is not None:
+        resolver.sql_count += 1
+
+def _record_cache_lookup(key: str, hit: bool) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        if hit:
+            trace.cache_hits += 1
+        else:
+            trace.cache_misses += 1
+
+def install_listeners() -> None:
+    """Hook SQL execution and cache lookups into the current trace."""
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    RedisCache.add_lookup_listener(_record_cache_lookup)
+
+install_listeners()
+
+def _header_requested(context: Any) -> bool:
+    request = getattr(context, "request", None)
+    return bool(
+        request is not None
+        and request.headers.get(settings.TRACING_HEADER)
+        and (settings.DEBUG or settings.TRACING_ENABLED)
+    )
+
+class RequestTracing(SchemaExtension):
+    """Record resolver, SQL and cache timings for traced operations."""
+
+    def __init__(self, *, execution_context=None):
+        self.execution_context = execution_context
+        self.trace: Optional[RequestTrace] = None
+        self.expose = False
+
+    def on_operation(self) -> Iterator[None]:
+        self.expose = _header_requested(self.execution_context.context)
+        if not (self.expose or settings.TRACING_ENABLED):
+            yield
+            return
+
+        self.trace = RequestTrace()
+        token = _current_trace.set(self.trace)
+        try:
+            yield
+        finally:
+            _current_trace.reset(token)
+            self.trace.end_ns = time.perf_counter_ns()
+            if settings.TRACING_ENABLED:
+                self._log_summary()
+
+    def on_parse(self) -> Iterator[None]:
+        if self.trace is None:
+            yield
+            return
+        start = self.trace.offset()
+        yield
+        self.trace.parsing = (start, self.trace.offset() - start)
+
+    def on_validate(self) -> Iterator[None]:
+        if self.trace is None:
+            yield
+            return
+        start = self.trace.offset()
+        yield
+        self.trace.validation = (start, self.trace.offset() - start)
+
+    def resolve(self, _next: Callable, root, info, *args, **kwargs) -> Any:
+        if self.trace is None or info.field_name.startswith("__"):
+            return _next(root, info, *args, **kwargs)
+
+        timing = ResolverTiming(
+            path=tuple(info.path.as_list()),
+            parent_type=info.parent_type.name,
+            field_name=info.field_name,
+            return_type=str(info.return_type),
+            start_offset=self.trace.offset()
+        )
+        self.trace.resolvers.append(timing)
+        token = _current_resolver.set(timing)
+        try:
+            result = _next(root, info, *args, **kwargs)
+        finally:
+            _current_resolver.reset(token)
+
+        if isawaitable(result):
+            return self._finish_async(timing, result)
+        timing.duration = self.trace.offset() - timing.start_offset
+        return result
+
+    async def _finish_async(self, timing: ResolverTiming, result) -> Any:
+        # Statements issued while awaiting belong to this resolver as well
+        token = _current_resolver.set(timing)
+        try:
+            return await result
+        finally:
+            _current_resolver.reset(token)
+            timing.duration = self.trace.offset() - timing.start_offset
+
+    def get_results(self) -> Dict[str, Any]:
+        if self.trace is None or not self.expose:
+            return {}
+        return {
+            "tracing": self.trace.to_apollo(),
+            "sql": {
+                "count": self.trace.sql_count,
+                "duration": self.trace.sql_duration_ns,
+            },
+            "cache": {
+                "hits": self.trace.cache_hits,
+                "misses": self.trace.cache_misses,
+            },
+        }
+
+    def _log_summary(self) -> None:
+        trace = self.trace
+        name = self.execution_context.operation_name or "anonymous"
+        logger.info(
+            f"GraphQL {name}: {(trace.end_ns - trace.start_ns) / 1e6:.1f} ms, "
+            f"{trace.sql_count} SQL ({trace.sql_duration_ns / 1e6:.1f} ms), "
+            f"cache {trace.cache_hits} hits / {trace.cache_misses} misses"
+        )
+        slow_ns = settings.TRACING_SLOW_RESOLVER_MS * 1e6
+        for resolver in trace.resolvers:
+            if resolver.duration >= slow_ns:
+                path = ".".join(str(part) for part in resolver.path)
+                logger.info(f"  slow resolver {path}: {resolver.duration / 1e6:.1f} ms, {resolver.sql_count} SQL")
+
+__all__ = ["RequestTracing", "RequestTrace", "current_trace", "install_listeners"]
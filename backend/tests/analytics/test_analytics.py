@@ -0,0 +1,42 @@
+import pytest
+
+from src.main.analytics import columns_from_rows, summarize
+
+pytestmark = [pytest.mark.unit]
+
+DAY = 86_400
+
+ROWS = [
+    ("Hair Cut", "Ann", 0 * DAY + 3600, 30.0, 30, 5),
+    ("Hair Cut", "Bo", 0 * DAY + 7200, 30.0, 30, None),
+    ("Manicure", "Ann", 1 * DAY + 3600, 25.0, 45, 3),
+    ("Unknown", "Ann", 3 * DAY, 10.0, 15, None),
+]
+
+def test_summarize_groups_by_service_provider_and_day():
+    """Test vectorized group-bys match a hand computed report."""
+    providers = {}
+    summary = summarize(columns_from_rows(ROWS, providers), minutes_per_day=60)
+
+    assert summary.total_revenue == 95.0
+    assert summary.service_count == 4
+    assert summary.average_satisfaction == 4.0
+
+    services = {group.key: group for group in summary.by_service_type}
+    assert services["Hair Cut"].revenue == 60.0
+    assert services["Hair Cut"].average_satisfaction == 5.0
+    assert services["Other"].service_count == 1
+
+    ann = next(group for group in summary.by_provider if group.key == "Ann")
+    assert ann.service_count == 3
+    # 90 booked minutes over three worked days of 60 minutes
+    assert ann.utilization == 0.5
+
+    assert [group.key for group in summary.by_day] == ["1970-01-01", "1970-01-02", "1970-01-04"]
+
+def test_summarize_empty_history():
+    """Test an empty range produces an empty report."""
+    summary = summarize(columns_from_rows([], {}))
+    assert summary.service_count == 0
+    assert summary.average_satisfaction is None
+    assert summary.by_provider == [] and summary.by_day == []
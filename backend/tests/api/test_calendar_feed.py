@@ -0,0 +1,87 @@
+import random
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from src.main.calendar_feed import (
+    entity_tag, feed_path, feed_token, fold, not_modified, render_event, rotate_feed_token
+)
+from src.main.database import async_session
+from src.main.models import Appointment, AppointmentStatus, ServiceType, User
+from src.main.server import app
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+def request_with(**headers) -> Request:
+    return Request({"type": "http", "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]})
+
+async def test_events_render_and_validators_match():
+    """Test events are escaped and folded and matching validators mean not modified."""
+    start = datetime(2024, 6, 1, 9, tzinfo=UTC)
+    row = SimpleNamespace(
+        id="V1StGXR8_Z5jdHi6B-myT", title="Cut, colour; and " + "é" * 60, startTime=start,
+        end_time=start.replace(hour=10), serviceType=ServiceType.HAIRCUT,
+        status=AppointmentStatus.CANCELLED, updated_at=start
+    )
+    event = render_event(row)
+    assert b"DTSTART:20240601T090000Z\r\n" in event and b"STATUS:CANCELLED\r\n" in event
+    assert "SUMMARY:Cut\\, colour\\; and é".encode() in event
+    assert all(len(line) <= 75 for line in event.split(b"\r\n"))
+    assert fold("SUMMARY:" + "é" * 60).decode().replace("\r\n ", "") == "SUMMARY:" + "é" * 60 + "\r\n"
+
+    etag = entity_tag("u1", start, start, 3)
+    assert etag != entity_tag("u1", start, start, 2)
+    assert not_modified(request_with(if_none_match=etag), etag, start)
+    assert not not_modified(request_with(if_none_match='"other"'), etag, start)
+    assert not_modified(request_with(if_modified_since="Sat, 01 Jun 2024 09:00:00 GMT"), etag, start)
+    assert not not_modified(request_with(), etag, start)
+
+@pytest.mark.database
+async def test_rotating_the_feed_token_revokes_old_urls(database):
+    """Test a feed URL works until the user resets it, and tokens never cross users."""
+    async with async_session() as session:
+        async with session.begin():
+            user = User(username=f"calendar-{random.getrandbits(48):x}", enabled=True, is_admin=False)
+            session.add(user)
+    old_path = feed_path(user.id, 0)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get(old_path)).status_code == 200
+        response = await client.get(f"/calendar/{user.id}.ics", params={"token": feed_token("someone-else", 0)})
+        assert response.status_code == 404
+
+        async with async_session() as session:
+            async with session.begin():
+                new_path = await rotate_feed_token(session, user.id)
+        assert new_path == feed_path(user.id, 1)
+        assert (await client.get(old_path)).status_code == 404
+        response = await client.get(new_path)
+        assert response.status_code == 200 and response.text.startswith("BEGIN:VCALENDAR")
+
+@pytest.mark.database
+async def test_feed_renders_appointments(database):
+    """Test a feed streams the user's appointments and answers 304 to its own ETag."""
+    async with async_session() as session:
+        async with session.begin():
+            user = User(username=f"calendar-{random.getrandbits(48):x}", enabled=True, is_admin=False)
+            session.add(user)
+            await session.flush()
+            appointment = Appointment(
+                title="Cut", durationMinutes=30, serviceType=ServiceType.HAIRCUT, creatorId=user.id,
+                # Far from any other test data, which the overlap check would reject
+                startTime=datetime(2100, 1, 1, tzinfo=UTC) + timedelta(hours=random.randrange(1_000_000)),
+                status=AppointmentStatus.CONFIRMED
+            )
+            session.add(appointment)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(feed_path(user.id, 0))
+        assert response.status_code == 200
+        assert f"UID:{appointment.id}@".encode() in response.content
+        assert b"SUMMARY:Cut\r\n" in response.content and b"STATUS:CONFIRMED\r\n" in response.content
+        assert response.content.endswith(b"END:VCALENDAR\r\n")
+        response = await client.get(feed_path(user.id, 0), headers={"If-None-Match": response.headers["ETag"]})
+        assert response.status_code == 304
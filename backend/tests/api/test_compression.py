@@ -0,0 +1,25 @@
+import httpx
+import pytest
+
+from src.main.compression import choose_encoding
+from src.main.server import app
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+async def test_large_responses_compressed_small_ones_not():
+    """Test responses above the size threshold are gzipped and decode to the same JSON."""
+    query = {"query": "query Echo($m: String!) { echo(message: $m) }"}
+    headers = {"Accept-Encoding": "gzip"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        large = await client.post("/graphql/", json={**query, "variables": {"m": "x" * 5000}}, headers=headers)
+        small = await client.post("/graphql/", json={**query, "variables": {"m": "x"}}, headers=headers)
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.json()["data"]["echo"].endswith("x" * 5000)
+    assert "content-encoding" not in small.headers
+
+async def test_encoding_negotiation():
+    """Test refused encodings are never chosen."""
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip; q=0, deflate") is None
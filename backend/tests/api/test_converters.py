@@ -0,0 +1,42 @@
+import pytest
+from collections import namedtuple
+from datetime import datetime, UTC
+
+from src.main.models import Appointment, AppointmentStatus, Client, ClientCategory, ServiceType, User
+from src.main.schema_types import CLIENT_TYPE_FIELDS, AppointmentType, ClientType
+
+pytestmark = pytest.mark.api
+
+def test_appointment_converter_matches_field_semantics():
+    """Test enums become their values, missing optionals stay None and cost comes from the catalog."""
+    user = User(id="u1", username="ana", email="ana@example.com", first_name="Ana", last_name="Silva",
+                enabled=True, is_admin=False)
+    appointment = Appointment(
+        id="a1", title="Color", startTime=datetime(2025, 6, 2, 9, tzinfo=UTC), durationMinutes=60,
+        status=AppointmentStatus.CONFIRMED, serviceType=ServiceType.HAIRCOLOR
+    )
+    appointment.creator = user
+    appointment.attendees = [user]
+
+    result = AppointmentType.from_db(appointment)
+    assert (result.id, result.title, result.description) == ("a1", "Color", None)
+    assert (result.status, result.service_type) == ("CONFIRMED", "Hair Color")
+    assert result.estimated_cost == pytest.approx(appointment.estimated_cost)
+    assert result.creator.username == "ana" and [u.id for u in result.attendees] == ["u1"]
+
+def test_computed_fields_skip_unloaded_inputs():
+    """Test an appointment loaded without the cost's inputs converts instead of failing."""
+    appointment = Appointment(id="a1", title="Color")
+    result = AppointmentType.from_db(appointment)
+    assert (result.title, result.estimated_cost) == ("Color", None)
+
+def test_client_converters_agree_for_instances_and_rows():
+    """Test from_db and from_row build the same client, with defaults for unset columns."""
+    client = Client(id="c1", phone="+15550100", service=ServiceType.MASSAGE, category=ClientCategory.VIP)
+    Row = namedtuple("Row", [attribute for attribute, _ in CLIENT_TYPE_FIELDS.values()])
+    row = Row(*(getattr(client, attribute) for attribute in Row._fields))
+
+    from_db, from_row = ClientType.from_db(client), ClientType.from_row(row)
+    assert from_db == from_row
+    assert (from_db.service, from_db.category, from_db.status) == ("Massage", "VIP", "")
+    assert (from_db.notes, from_db.loyalty_points, from_db.total_spent) == (None, 0, 0.0)
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import func, select
+
+from src.main import dashboard
+from src.main.cache import cache
+from src.main.dashboard import CLIENTS_KEY, UPCOMING_KEY, DashboardCounters, day_key
+from src.main.database import async_session
+from src.main.models import Client, ClientStatus
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+@pytest.fixture
+def local_cache(monkeypatch):
+    monkeypatch.setattr(cache, "redis", None)
+    monkeypatch.setattr(cache, "_local_cache", {})
+    return cache
+
+async def _counters(today):
+    return await cache.get_counters([CLIENTS_KEY, day_key(today), UPCOMING_KEY])
+
+async def test_mutations_adjust_and_move_counters(local_cache):
+    """Test bookings, moves and removals adjust today's and the upcoming counters."""
+    counters = DashboardCounters()
+    now = datetime.now(UTC)
+    today = now.date()
+    for key in (CLIENTS_KEY, day_key(today), UPCOMING_KEY):
+        await cache.set_counter(key, 10, expire_in=60)
+
+    await counters.appointment_added(now + timedelta(seconds=5))
+    await counters.client_added()
+    assert await _counters(today) == [11, 11, 11]
+
+    # Moved to next week: no longer today, still upcoming
+    await counters.appointment_moved(now + timedelta(seconds=5), now + timedelta(days=7))
+    assert await _counters(today) == [11, 10, 11]
+
+    await counters.appointment_removed(now + timedelta(days=7))
+    assert await _counters(today) == [11, 10, 10]
+
+async def test_expired_counters_are_not_recreated(local_cache):
+    """Test an increment after expiry leaves the counter missing instead of a partial count."""
+    counters = DashboardCounters()
+    await cache.set_counter(UPCOMING_KEY, 10, expire_in=-1)
+    await counters.appointment_added(datetime.now(UTC) + timedelta(days=1))
+    await counters.client_added()
+    assert await cache.incr_existing(UPCOMING_KEY) is None
+    assert await cache.get_counters([UPCOMING_KEY, CLIENTS_KEY]) == [None, None]
+
+async def test_concurrent_polls_recount_once(local_cache, monkeypatch):
+    """Test polls that all find the counters missing share a single recount."""
+    recounts = []
+
+    class CountingSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        async def execute(self, stmt):
+            recounts.append(stmt)
+            await asyncio.sleep(0.05)
+            return type("Result", (), {"one": lambda self: (4, 2, 3)})()
+
+    monkeypatch.setattr(dashboard, "async_session", CountingSession)
+    counters = DashboardCounters()
+
+    summaries = await asyncio.gather(*(counters.get_summary() for _ in range(5)))
+
+    assert len(recounts) == 1
+    assert all(summary == summaries[0] for summary in summaries)
+    assert summaries[0]["upcoming_appointments_count"] == 3
+
+@pytest.mark.database
+async def test_reconcile_overwrites_drift(local_cache, database):
+    """Test reconciliation replaces drifted counters with counts from the database."""
+    today = datetime.now(UTC).date()
+    for key in (CLIENTS_KEY, day_key(today), UPCOMING_KEY):
+        await cache.set_counter(key, -999, expire_in=60)
+
+    summary = await DashboardCounters().reconcile()
+    async with async_session() as session:
+        active = await session.scalar(
+            select(func.count()).select_from(Client).where(Client.status == ClientStatus.ACTIVE)
+        )
+    assert summary["total_clients"] == active
+    assert await _counters(today) == [
+        summary["total_clients"], summary["todays_appointments_count"], summary["upcoming_appointments_count"]
+    ]
+    assert -999 not in await _counters(today)
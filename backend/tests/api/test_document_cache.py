@@ -0,0 +1,30 @@
+import pytest
+
+from src.main.document_cache import document_cache
+from src.main.graphql_schema import schema
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+async def test_repeated_query_served_from_document_cache():
+    """Test a repeated query skips parsing and validation."""
+    document_cache.clear()
+    query = "query Repeat { hello ping }"
+
+    first = await schema.execute(query)
+    second = await schema.execute(query)
+
+    assert first.data == second.data == {"hello": "Hello from GraphQL!", "ping": "pong"}
+    stats = document_cache.stats()
+    assert (stats["parse_hits"], stats["parse_misses"]) == (1, 1)
+    assert (stats["validation_hits"], stats["validation_misses"]) == (1, 1)
+
+async def test_validation_errors_are_cached():
+    """Test invalid documents keep returning their validation errors from the cache."""
+    document_cache.clear()
+    query = "{ doesNotExist }"
+
+    for _ in range(2):
+        result = await schema.execute(query)
+        assert result.errors and "doesNotExist" in result.errors[0].message
+
+    assert document_cache.stats()["validation_hits"] == 1
@@ -0,0 +1,58 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import orjson
+import pytest
+
+from src.main import exports
+from src.main.config import settings
+from src.main.database import async_session
+from src.main.models import Appointment, AppointmentStatus, ServiceType, User, service_catalog
+from src.main.server import app
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+async def test_exports_require_auth():
+    """Test anonymous export requests and unknown datasets are rejected."""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/exports/appointments", params={"start": "2024-06-01", "end": "2024-07-01"})
+        assert response.status_code == 401
+        response = await client.get("/exports/unknown", params={"start": "2024-06-01", "end": "2024-07-01"})
+        assert response.status_code == 404
+
+@pytest.mark.database
+async def test_exports_stream_each_batch(database, monkeypatch):
+    """Test CSV and NDJSON exports read real rows and encode them batch by batch."""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 1)
+    # Far from any other test data, which the overlap check would reject
+    start = datetime(2100, 1, 1, tzinfo=timezone.utc) + timedelta(hours=random.randrange(1_000_000))
+    async with async_session() as session:
+        async with session.begin():
+            user = User(username=f"export-{random.getrandbits(48):x}", enabled=True, is_admin=False)
+            session.add(user)
+            await session.flush()
+            session.add_all([
+                Appointment(
+                    title="Back, neck", durationMinutes=30, serviceType=ServiceType.MASSAGE, creatorId=user.id,
+                    startTime=start, status=AppointmentStatus.SCHEDULED
+                ),
+                Appointment(
+                    title="Glow", durationMinutes=20, serviceType=ServiceType.FACIAL, creatorId=user.id,
+                    startTime=start + timedelta(minutes=30), status=AppointmentStatus.COMPLETED
+                ),
+            ])
+    dataset = exports.EXPORTS["appointments"]
+    end = start + timedelta(hours=1)
+
+    chunks = [chunk async for chunk in exports.stream_csv(dataset, start, end)]
+    assert len(chunks) == 2
+    lines = b"".join(chunks).decode().splitlines()
+    assert lines[0].split(",") == [column.name for column in dataset.columns]
+    assert '"Back, neck"' in lines[1] and ",Massage," in lines[1]
+
+    chunks = [chunk async for chunk in exports.stream_ndjson(dataset, start, end)]
+    records = [orjson.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [record["title"] for record in records] == ["Back, neck", "Glow"]
+    assert records[1]["creator_id"] == user.id and records[1]["duration_minutes"] == 20
+    assert records[1]["estimated_cost"] == round(service_catalog.estimate_cost(ServiceType.FACIAL, 20), 2)
@@ -0,0 +1,27 @@
+import httpx
+import pytest
+
+from src.main.health import health
+from src.main.server import app
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+async def test_readiness_reflects_database_and_is_cached(monkeypatch):
+    """Test /readyz reports an unreachable database and reuses the cached result."""
+    calls = []
+
+    async def failing_database():
+        calls.append(1)
+        return False
+
+    monkeypatch.setattr(health, "_status", None)
+    monkeypatch.setattr(health, "_check_database", failing_database)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/livez")).status_code == 200
+        first = await client.get("/readyz")
+        second = await client.get("/readyz")
+
+    assert first.status_code == second.status_code == 503
+    assert first.json()["database"] is False
+    assert len(calls) == 1
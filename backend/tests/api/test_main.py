@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from src.main import main
+from src.main.config import settings
+
+pytestmark = [pytest.mark.unit]
+
+def test_worker_count_falls_back_to_setting_then_cpus(monkeypatch):
+    """Test --workers wins over WORKERS, which wins over the CPU count."""
+    monkeypatch.setattr(os, "cpu_count", lambda: 6)
+    monkeypatch.setattr(settings, "WORKERS", None)
+    assert main.worker_count() == 6
+    assert main.worker_count(2) == 2
+
+    monkeypatch.setattr(settings, "WORKERS", 3)
+    assert main.worker_count() == 3
+
+    monkeypatch.setattr(settings, "WORKERS", None)
+    monkeypatch.setattr(os, "cpu_count", lambda: None)
+    assert main.worker_count() == 1
+
+def test_start_passes_production_options_to_uvicorn(monkeypatch, tmp_path):
+    """Test the production launcher's uvicorn options and multi-process metrics directory."""
+    calls = []
+    monkeypatch.setattr(main.uvicorn, "run", lambda app, **kwargs: calls.append((app, kwargs)))
+    metrics_dir = tmp_path / "metrics"
+    metrics_dir.mkdir()
+    (metrics_dir / "stale.db").write_bytes(b"old")
+    (metrics_dir / "unrelated.txt").write_text("keep")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(metrics_dir))
+
+    main.start(["--workers", "4", "--port", "9000"])
+
+    app, kwargs = calls[0]
+    assert app == main.APP
+    assert kwargs["workers"] == 4 and kwargs["port"] == 9000
+    assert kwargs["backlog"] == settings.BACKLOG
+    assert kwargs["timeout_keep_alive"] == settings.KEEP_ALIVE_TIMEOUT
+    assert kwargs["timeout_graceful_shutdown"] == settings.GRACEFUL_SHUTDOWN_TIMEOUT
+    assert kwargs["limit_max_requests"] == settings.MAX_REQUESTS_PER_WORKER
+    assert kwargs["proxy_headers"] is True
+    assert kwargs["loop"] in ("uvloop", "asyncio") and kwargs["http"] in ("httptools", "h11")
+    assert [path.name for path in metrics_dir.iterdir()] == ["unrelated.txt"]
+
+def test_missing_metrics_directory_is_created(monkeypatch, tmp_path):
+    """Test a configured multi-process metrics directory that does not exist yet is created."""
+    metrics_dir = tmp_path / "missing" / "metrics"
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(metrics_dir))
+    main._prepare_multiprocess_metrics()
+    assert metrics_dir.is_dir()
@@ -0,0 +1,20 @@
+import httpx
+import pytest
+
+from src.main.server import app
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+async def test_metrics_label_latency_by_operation_name():
+    """Test /metrics exposes latency per GraphQL operation and the in-flight gauge."""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/graphql/", json={"query": "query MetricsPing { ping }"})
+        await client.get("/health")
+        response = await client.get("/metrics")
+
+    body = response.text
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{operation="MetricsPing"}' in body
+    assert 'http_request_duration_seconds_count{operation="/health"}' in body
+    assert "http_requests_in_flight" in body
+    assert "db_pool_checked_out" in body
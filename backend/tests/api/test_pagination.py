@@ -0,0 +1,18 @@
+import pytest
+
+from src.main.config import settings
+from src.main.queries import decode_cursor, encode_cursor, page_size
+
+pytestmark = pytest.mark.api
+
+def test_cursor_round_trip_and_page_size_cap():
+    """Test cursors decode to the sort key they encode and page sizes are capped."""
+    cursor = encode_cursor("2024-06-01T09:00:00+00:00", "V1StGXR8_Z5jdHi6B-myT")
+    assert decode_cursor(cursor) == ("2024-06-01T09:00:00+00:00", "V1StGXR8_Z5jdHi6B-myT")
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!")
+
+    assert page_size(5) == 5
+    assert page_size(10_000) == settings.MAX_PAGE_SIZE
+    with pytest.raises(ValueError):
+        page_size(0)
@@ -0,0 +1,50 @@
+import json
+
+import httpx
+import pytest
+
+from src.main.persisted_queries import query_hash, root_fields
+from src.main.server import app
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+QUERY = "{ systemInfo { version } }"
+
+def persisted(sha256_hash: str) -> dict:
+    return {"persistedQuery": {"version": 1, "sha256Hash": sha256_hash}}
+
+async def test_persisted_query_registration_and_get_caching():
+    """Test APQ registration, hash-only GET and ETag revalidation."""
+    sha256_hash = query_hash(QUERY)
+    params = {"extensions": json.dumps(persisted(sha256_hash))}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/graphql/", json={"query": QUERY, "extensions": persisted(sha256_hash)})
+        assert response.json()["data"]["systemInfo"]["version"]
+
+        response = await client.get("/graphql/", params=params)
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public")
+        etag = response.headers["etag"]
+
+        response = await client.get("/graphql/", params=params, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+async def test_unknown_persisted_query_asks_for_full_text():
+    """Test an unregistered hash returns the APQ not-found error."""
+    params = {"extensions": json.dumps(persisted("0" * 64))}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/graphql/", params=params)
+    assert response.json()["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+async def test_aliases_do_not_make_private_fields_public():
+    """Test public caching checks the selected root fields, not the response keys."""
+    aliased = '{ systemInfo: echo(message: "hi") }'
+    assert root_fields(aliased) == frozenset({"echo"})
+    assert root_fields("query A { systemInfo { version } } query B { echo(message: \"hi\") }", "B") == frozenset({"echo"})
+    assert root_fields("{ ...F } fragment F on Query { echo(message: \"hi\") }") is None
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/graphql/", params={"query": aliased})
+    assert response.json()["data"]["systemInfo"] == "You said: hi"
+    assert response.headers["cache-control"] == "private, no-cache"
@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import select
+from strawberry.types.nodes import InlineFragment, SelectedField
+
+from src.main.models import User
+from src.main.projection import descend
+from src.main.schema_types import APPOINTMENT_PROJECTION, USER_PROJECTION
+
+pytestmark = pytest.mark.api
+
+def field(name, *selections):
+    return SelectedField(name=name, directives={}, arguments={}, selections=list(selections))
+
+def test_login_selection_loads_only_selected_user_columns():
+    """Test fields inside an inline fragment map to just their columns plus the required ones."""
+    login = [field("__typename"), InlineFragment("LoginSuccess", [field("token"), field("user", field("firstName"))], {})]
+    statement = select(User).options(*USER_PROJECTION.load_options(descend(login, "user"), also=("password",)))
+    sql = str(statement.compile())
+    assert "users.first_name" in sql and "users.password" in sql and "users.id" in sql
+    assert "users.email" not in sql and "users.username" not in sql
+
+def test_appointment_selection_maps_computed_fields_and_relationships():
+    """Test computed fields load their inputs and only selected relationships are eager loaded."""
+    node = [field("title"), field("estimatedCost"), field("creator", field("username"))]
+    assert APPOINTMENT_PROJECTION.attribute_names(node) == ["id", "title", "serviceType", "durationMinutes"]
+
+    options = APPOINTMENT_PROJECTION.load_options(node)
+    assert len(options) == 2  # load_only plus selectinload(creator); attendees are not selected
+    assert "creator" in str(options[1].path)
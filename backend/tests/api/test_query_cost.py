@@ -0,0 +1,50 @@
+from graphql import parse
+import pytest
+
+from src.main.config import settings
+from src.main.graphql_schema import schema
+from src.main.query_cost import analyze_operation
+
+pytestmark = [pytest.mark.api]
+
+REPORT = "revenueReport(dateFrom: \"2024-01-01T00:00:00\", dateTo: \"2024-02-01T00:00:00\") { byDay { key revenue } }"
+
+def test_list_fields_multiply_selection_cost():
+    """Test unpaginated lists are charged the default list size."""
+    analysis = analyze_operation(schema._schema, parse(f"{{ {REPORT} hello }}"))
+
+    # revenueReport (50) + byDay object (1) x default list size
+    assert analysis.cost == 50 + settings.GRAPHQL_DEFAULT_LIST_SIZE
+    assert analysis.depth == 3
+
+@pytest.mark.asyncio
+async def test_over_budget_query_rejected_before_execution():
+    """Test an anonymous over-budget query is rejected without running resolvers."""
+    query = "{ " + " ".join(f"r{i}: {REPORT}" for i in range(6)) + " }"
+
+    result = await schema.execute(query)
+
+    assert result.data is None
+    assert result.errors[0].extensions["code"] == "QUERY_TOO_EXPENSIVE"
+
+def test_omitted_page_size_uses_the_argument_default():
+    """Test connections without `first` are charged their default page size, and sizes are capped."""
+    def cost(arguments: str) -> int:
+        return analyze_operation(
+            schema._schema, parse(f"query Q($n: Int) {{ appointments{arguments} {{ edges {{ node {{ id }} }} }} }}"),
+            variables={}
+        ).cost
+
+    assert cost("") == cost("(first: 20)") == 20 * cost("(first: 1)")
+    assert cost("(first: $n)") == cost("")
+    assert cost("(first: 100000)") == settings.MAX_PAGE_SIZE * cost("(first: 1)")
+
+def test_variable_defaults_are_charged():
+    """Test a page size given as an operation variable default costs the same as the literal."""
+    def cost(query: str, variables=None) -> int:
+        return analyze_operation(schema._schema, parse(query), variables=variables).cost
+
+    selection = "{ edges { node { id attendees { id } } } }"
+    literal = cost(f"{{ appointments(first: 100) {selection} }}")
+    assert cost(f"query Q($n: Int = 100) {{ appointments(first: $n) {selection} }}") == literal
+    assert cost(f"query Q($n: Int = 100) {{ appointments(first: $n) {selection} }}", {"n": 1}) < literal
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from datetime import datetime, UTC
+from types import SimpleNamespace
+
+import pytest
+
+from src.main import subscriptions
+from src.main.broadcast import AppointmentBroadcast, AppointmentEvent
+from src.main.config import settings
+from src.main.graphql_schema import schema
+from src.main.subscriptions import as_utc, authorized_events
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+def make_event(**overrides) -> AppointmentEvent:
+    values = dict(
+        kind="UPDATED", appointment_id="a1", title="Cut", start_time=datetime(2024, 6, 2, 9, tzinfo=UTC),
+        duration_minutes=30, status="SCHEDULED", service_type="Hair Cut", creator_id="u1",
+        attendee_ids=["u2"], previous_start_time=datetime(2024, 6, 1, 9, tzinfo=UTC)
+    )
+    values.update(overrides)
+    return AppointmentEvent(**values)
+
+async def test_broadcast_fans_out_and_filters_events():
+    """Test events reach every subscriber, slow subscribers drop the oldest and filters apply."""
+    broadcast = AppointmentBroadcast("test")
+    with broadcast.subscribe() as first, broadcast.subscribe() as second:
+        first.queue = asyncio.Queue(maxsize=1)
+        await broadcast.publish(make_event(appointment_id="a1"))
+        await broadcast.publish(make_event(appointment_id="a2"))
+        assert (await first.get()).appointment_id == "a2" and first.dropped == 1
+        assert [(await second.get()).appointment_id for _ in range(2)] == ["a1", "a2"]
+    assert broadcast.subscriber_count == 0
+
+    event = make_event()
+    assert AppointmentEvent.from_json(event.to_json()) == event
+    assert event.visible_to("u2", is_admin=False)
+    assert not event.visible_to("u3", is_admin=False) and event.visible_to("u3", is_admin=True)
+    # A move out of the range is still reported to screens showing the old day
+    day = datetime(2024, 6, 1, tzinfo=UTC)
+    assert event.starts_between(day, datetime(2024, 6, 2, tzinfo=UTC))
+    assert not event.starts_between(datetime(2024, 6, 3, tzinfo=UTC), None)
+    # Naive bounds, which the DateTime scalar accepts, are read as UTC
+    assert event.starts_between(as_utc(datetime(2024, 6, 2, 9)), as_utc(datetime(2024, 6, 2, 10)))
+
+    assert "appointmentChanged(dateFrom: DateTime = null, dateTo: DateTime = null): AppointmentChange!" in str(schema)
+
+async def test_subscriptions_end_when_the_token_expires_or_user_is_disabled(monkeypatch):
+    """Test the event stream stops with an error on token expiry and after the user is disabled."""
+    user = SimpleNamespace(id="u1", is_admin=False)
+    broadcast = AppointmentBroadcast("test")
+    with broadcast.subscribe() as subscription:
+        events = authorized_events(subscription, user, expires_at=time.time() + 0.2)
+        await broadcast.publish(make_event())
+        assert (await events.__anext__()).appointment_id == "a1"
+        with pytest.raises(PermissionError, match="expired"):
+            await asyncio.wait_for(events.__anext__(), 1)
+
+    access = [(True, False), (False, False)]
+    async def user_access(user_id):
+        return access.pop(0)
+    monkeypatch.setattr(subscriptions, "user_access", user_access)
+    monkeypatch.setattr(settings, "SUBSCRIPTION_AUTH_RECHECK_SECONDS", 0.1)
+    with broadcast.subscribe() as subscription:
+        events = authorized_events(subscription, user, expires_at=None)
+        with pytest.raises(PermissionError, match="disabled"):
+            await asyncio.wait_for(events.__anext__(), 1)
+    assert access == []
+
+async def test_subscriptions_follow_admin_changes(monkeypatch):
+    """Test events of other users are delivered only while the subscriber is an administrator."""
+    user = SimpleNamespace(id="u9", is_admin=False)
+    access = [(True, True), (True, False)]
+    async def user_access(user_id):
+        return access.pop(0) if access else (True, False)
+    monkeypatch.setattr(subscriptions, "user_access", user_access)
+    monkeypatch.setattr(settings, "SUBSCRIPTION_AUTH_RECHECK_SECONDS", 0.2)
+    broadcast = AppointmentBroadcast("test")
+    received = []
+    with broadcast.subscribe() as subscription:
+        async def collect():
+            async for event in authorized_events(subscription, user, expires_at=None):
+                received.append(event.appointment_id)
+        task = asyncio.create_task(collect())
+        # Rechecks run at 0.2s (promoted) and 0.4s (demoted)
+        for appointment_id in ("hidden", "promoted", "demoted"):
+            await asyncio.sleep(0.1)
+            await broadcast.publish(make_event(appointment_id=appointment_id))
+            await asyncio.sleep(0.1)
+        task.cancel()
+    assert received == ["promoted"]
@@ -0,0 +1,23 @@
+import httpx
+import pytest
+
+from src.main.config import settings
+from src.main.server import app
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.api]
+
+QUERY = "{ hello systemInfo { version } }"
+
+async def test_trace_returned_only_with_debug_header(monkeypatch):
+    """Test Apollo tracing is added to extensions when the debug header is sent."""
+    monkeypatch.setattr(settings, "DEBUG", True)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        plain = await client.post("/graphql/", json={"query": QUERY})
+        traced = await client.post("/graphql/", json={"query": QUERY}, headers={settings.TRACING_HEADER: "1"})
+
+    assert "extensions" not in plain.json()
+    extensions = traced.json()["extensions"]
+    paths = [resolver["path"] for resolver in extensions["tracing"]["execution"]["resolvers"]]
+    assert ["hello"] in paths and ["systemInfo", "version"] in paths
+    assert extensions["sql"]["count"] == 0
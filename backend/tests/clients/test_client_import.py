@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from src.main.client_import import read_batches, validate_batch
+
+pytestmark = [pytest.mark.unit]
+
+CSV = """email,phone,service,first_name,last_name,category,notes
+Ana@Example.com,(555) 010-2000,haircut,Ana,Lopez,,
+bad-email,5550102001,MASSAGE,,,,
+ben@example.com,12,MASSAGE,,,,
+ana@example.com,5550102002,FACIAL,,,,
+cy@example.com,+44 20 7946 0000,PEELING,,,,
+di@example.com,5550102003,FACIAL,,,GOLD,
+ed@example.com,5550102004,hair cut,Ed,,vip,"Prefers, mornings"
+"""
+
+def test_validate_batch_normalizes_and_rejects_rows():
+    """Test a batch is normalized, invalid rows name their column and repeated emails are dropped."""
+    (lines, rows), = read_batches(io.StringIO(CSV), batch_size=100)
+    records, issues = validate_batch(lines, rows)
+
+    assert records == [
+        (2, "ana@example.com", "Ana", "Lopez", "5550102000", "Hair Cut", "ACTIVE", "NEW", None),
+        (8, "ed@example.com", "Ed", None, "5550102004", "Hair Cut", "ACTIVE", "VIP", "Prefers, mornings"),
+    ]
+    assert [(issue.line, issue.field) for issue in issues] == [
+        (3, "email"), (4, "phone"), (5, "email"), (6, "service"), (7, "category")
+    ]
+
+def test_read_batches_requires_columns():
+    """Test files without the required columns are refused before any row is read."""
+    with pytest.raises(ValueError, match="phone, service"):
+        next(read_batches(io.StringIO("email\nana@example.com\n"), batch_size=10))
@@ -0,0 +1,77 @@
+import random
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from src.main.database import async_session
+from src.main.models import Client, ServicePackage, ServiceType, User
+from src.main.packages import _ineligibility_reason, redeem_package_session
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.database]
+
+NOW = datetime(2025, 3, 1, 12, tzinfo=UTC)
+
+async def _package(**values) -> str:
+    async with async_session() as session:
+        async with session.begin():
+            user = User(username=f"package-{random.getrandbits(48):x}", enabled=True, is_admin=False)
+            session.add(user)
+            await session.flush()
+            client = Client(phone="5550100", service=ServiceType.MASSAGE, user_id=user.id)
+            session.add(client)
+            await session.flush()
+            package = ServicePackage(**{
+                "client_id": client.id,
+                "service_type": ServiceType.MASSAGE,
+                "total_sessions": 5,
+                "sessions_remaining": 5,
+                "purchase_date": NOW - timedelta(days=30),
+                "expiry_date": NOW + timedelta(days=30),
+                "package_cost": 400.0,
+                "minimum_interval": 1,
+                **values
+            })
+            session.add(package)
+    return package.id
+
+async def _redeem(package_id: str, now: datetime, rating=None):
+    async with async_session() as session:
+        async with session.begin():
+            await redeem_package_session(session, package_id, "Sam", satisfaction_rating=rating, now=now)
+
+@pytest.mark.parametrize("values, reason", [
+    ({"sessions_remaining": 0}, "No sessions remaining"),
+    ({"expiry_date": NOW}, "expired"),
+    ({"last_session_date": NOW - timedelta(hours=12)}, "at least 1 day"),
+])
+async def test_ineligible_packages_are_not_redeemed(database, values, reason):
+    """Test exhausted, expired and too-recently used packages are refused and left unchanged."""
+    package_id = await _package(**values)
+    with pytest.raises(ValueError, match=reason):
+        await _redeem(package_id, NOW)
+    async with async_session() as session:
+        package = await session.get(ServicePackage, package_id)
+        assert package.sessions_remaining == values.get("sessions_remaining", 5)
+
+async def test_average_satisfaction_ignores_unrated_sessions(database):
+    """Test the package mean only counts sessions that were rated."""
+    package_id = await _package()
+    for day, rating in enumerate((None, 5, 1)):
+        await _redeem(package_id, NOW + timedelta(days=day), rating)
+    async with async_session() as session:
+        package = await session.get(ServicePackage, package_id)
+        assert package.sessions_remaining == 2
+        assert package.average_satisfaction == pytest.approx(3.0)
+
+async def test_ineligibility_reason_names_the_failing_check(database):
+    """Test a past session only blames the interval when it is actually too recent."""
+    package_id = await _package(expiry_date=NOW - timedelta(days=1), last_session_date=NOW - timedelta(days=10))
+    async with async_session() as session:
+        assert await _ineligibility_reason(session, package_id, NOW, None) == "Package has expired"
+        assert await _ineligibility_reason(session, package_id, NOW, "someone-else") == "Not authorized to redeem this package"
+
+    package_id = await _package(last_session_date=NOW - timedelta(days=10))
+    async with async_session() as session:
+        assert await _ineligibility_reason(session, package_id, NOW, None) == "Package is not eligible for redemption"
+        reason = await _ineligibility_reason(session, package_id, NOW - timedelta(days=9, hours=12), None)
+        assert reason == "Sessions must be at least 1 day(s) apart"
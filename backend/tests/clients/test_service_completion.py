@@ -0,0 +1,110 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import select
+
+from src.main.database import async_session
+from src.main.models import (
+    Appointment, AppointmentStatus, Client, ClientCategory, ServiceHistory, ServiceType, User
+)
+from src.main.service_completion import (
+    category_for, complete_appointment, promoted_category, record_service
+)
+
+pytestmark = [pytest.mark.unit]
+
+def test_category_thresholds():
+    """Test categories are assigned from visit count or spend."""
+    assert category_for(0, 0.0) == ClientCategory.NEW
+    assert category_for(3, 0.0) == ClientCategory.REGULAR
+    assert category_for(1, 2500.0) == ClientCategory.VIP
+    assert category_for(50, 0.0) == ClientCategory.PREMIUM
+
+def test_categories_are_never_demoted():
+    """Test promotion only moves clients up the category ladder."""
+    assert promoted_category(ClientCategory.VIP, 3, 0.0) == ClientCategory.VIP
+    assert promoted_category(ClientCategory.REGULAR, 25, 0.0) == ClientCategory.VIP
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("values, message", [
+    ({"service_cost": -1.0}, "cost"),
+    ({"points_redeemed": -5}, "Redeemed points"),
+    ({"satisfaction_rating": 0}, "rating"),
+    ({"satisfaction_rating": 6}, "rating"),
+])
+async def test_record_service_rejects_invalid_values(values, message):
+    """Test negative costs and redemptions and out-of-range ratings are rejected before any write."""
+    with pytest.raises(ValueError, match=message):
+        await record_service(None, "c1", ServiceType.HAIRCUT, "Sam", **values)
+
+async def _client_with_appointment(loyalty_points: int = 0):
+    async with async_session() as session:
+        async with session.begin():
+            user = User(username=f"completion-{random.getrandbits(48):x}", enabled=True, is_admin=False)
+            session.add(user)
+            await session.flush()
+            client = Client(
+                phone="5550100", service=ServiceType.HAIRCUT, loyalty_points=loyalty_points, user_id=user.id
+            )
+            appointment = Appointment(
+                title="Cut", durationMinutes=30, serviceType=ServiceType.HAIRCUT, creatorId=user.id,
+                # Far from any other test data, which the overlap check would reject
+                startTime=datetime(2100, 1, 1, tzinfo=UTC) + timedelta(hours=random.randrange(1_000_000)),
+                status=AppointmentStatus.CONFIRMED
+            )
+            session.add_all([client, appointment])
+    return client.id, appointment.id
+
+async def _visits(client_id: str) -> int:
+    async with async_session() as session:
+        return await session.scalar(select(Client.visit_count).where(Client.id == client_id))
+
+@pytest.mark.database
+@pytest.mark.asyncio
+async def test_redemption_above_balance_is_rejected(database):
+    """Test redeeming more points than the client holds fails and writes nothing."""
+    client_id, _ = await _client_with_appointment(loyalty_points=5)
+    with pytest.raises(ValueError, match="Not enough loyalty points"):
+        async with async_session() as session:
+            async with session.begin():
+                await record_service(session, client_id, ServiceType.HAIRCUT, "Sam", points_redeemed=6)
+    async with async_session() as session:
+        assert await session.scalar(select(ServiceHistory.id).where(ServiceHistory.client_id == client_id)) is None
+    assert await _visits(client_id) == 0
+
+@pytest.mark.database
+@pytest.mark.asyncio
+async def test_completing_twice_is_a_no_op(database):
+    """Test completing an already completed appointment records nothing more."""
+    client_id, appointment_id = await _client_with_appointment()
+    for expected in (1, None):
+        async with async_session() as session:
+            async with session.begin():
+                appointment = await session.get(Appointment, appointment_id)
+                recorded = await complete_appointment(session, appointment, "Sam")
+                assert (recorded if recorded is None else len(recorded)) == expected
+                assert appointment.status == AppointmentStatus.COMPLETED
+    assert await _visits(client_id) == 1
+
+@pytest.mark.database
+@pytest.mark.asyncio
+async def test_concurrent_completions_record_one_visit(database):
+    """Test a completion racing a committed one from a stale read records nothing."""
+    client_id, appointment_id = await _client_with_appointment()
+    async with async_session() as first, async_session() as second:
+        await first.begin()
+        await second.begin()
+        # Both load the appointment before either completes it
+        first_appointment = await first.get(Appointment, appointment_id)
+        second_appointment = await second.get(Appointment, appointment_id)
+        assert len(await complete_appointment(first, first_appointment, "Sam")) == 1
+
+        racing = asyncio.create_task(complete_appointment(second, second_appointment, "Sam"))
+        await asyncio.sleep(0.2)
+        assert not racing.done()  # waiting for the first transaction's row lock
+        await first.commit()
+        assert await racing is None
+        await second.commit()
+    assert await _visits(client_id) == 1
@@ -1,5 +1,6 @@
-"""Configure pytest with HTML reporting."""
+"""Configure pytest with HTML reporting and a shared database fixture."""
 import pytest
+import pytest_asyncio
 from pathlib import Path
 
 def pytest_html_report_title(report):
@@ -55,3 +56,22 @@ def pytest_runtest_makereport(item, call):
     category = item.get_closest_marker('category')
     if category:
         report.category = category.name
+
+@pytest_asyncio.fixture
+async def database():
+    """Engine of the configured database with the schema created; skips when it is unreachable."""
+    from sqlalchemy import text
+    from src.main.database import engine
+    from src.main.models import Base
+
+    # Pooled asyncpg connections are bound to the event loop that opened them;
+    # drop any left behind by earlier tests without touching their closed loops
+    await engine.dispose(close=False)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE SEQUENCE IF NOT EXISTS user_sequential_id_seq"))
+            await conn.run_sync(Base.metadata.create_all)
+    except (OSError, ConnectionError) as e:
+        pytest.skip(f"Database not available: {e}")
+    yield engine
+    await engine.dispose()
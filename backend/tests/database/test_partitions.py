@@ -0,0 +1,37 @@
+import pytest
+from types import SimpleNamespace
+from datetime import datetime, timezone, timedelta, UTC
+
+from src.main.models import MAX_APPOINTMENT_DURATION, validate_appointment
+from src.main.partitions import (
+    month_start, add_months, partition_name, parse_partition_month
+)
+
+pytestmark = [pytest.mark.unit]
+
+def test_month_start_normalizes_to_utc():
+    """Test timestamps are truncated to the UTC month they fall in."""
+    local = datetime(2025, 4, 1, 1, 30, tzinfo=timezone(timedelta(hours=3)))
+    assert month_start(local) == datetime(2025, 3, 1, tzinfo=UTC)
+
+def test_add_months_crosses_year_boundaries():
+    """Test month arithmetic in both directions."""
+    start = datetime(2025, 11, 1, tzinfo=UTC)
+    assert add_months(start, 2) == datetime(2026, 1, 1, tzinfo=UTC)
+    assert add_months(start, -11) == datetime(2024, 12, 1, tzinfo=UTC)
+
+def test_partition_names_round_trip():
+    """Test partition names encode and decode their month."""
+    start = datetime(2025, 3, 1, tzinfo=UTC)
+    name = partition_name("service_history", start)
+    assert name == "service_history_p2025_03"
+    assert parse_partition_month("service_history", name) == start
+    assert parse_partition_month("service_history", "service_history_default") is None
+    assert parse_partition_month("appointments", name) is None
+
+@pytest.mark.parametrize("minutes", [0, -30, int(MAX_APPOINTMENT_DURATION.total_seconds() // 60) + 1])
+def test_appointment_duration_is_bounded(minutes):
+    """Test durations the bounded overlap check cannot see are rejected before it runs."""
+    target = SimpleNamespace(id=None, startTime=datetime(2025, 4, 1, 9, tzinfo=UTC), durationMinutes=minutes)
+    with pytest.raises(ValueError, match="Duration"):
+        validate_appointment(None, None, target)
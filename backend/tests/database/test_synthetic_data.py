@@ -0,0 +1,60 @@
+import pytest
+from collections import defaultdict
+from datetime import datetime, timedelta, UTC
+
+from src.main.models import AppointmentStatus
+from src.main.synthetic_data import DatasetSpec, SyntheticDataset, copy_rows
+
+pytestmark = [pytest.mark.unit, pytest.mark.database]
+
+SPEC = DatasetSpec(
+    password_hash="hash", clients=50, providers=3, appointments=600, packages=20,
+    days=60, future_days=10, now=datetime(2025, 6, 1, tzinfo=UTC)
+)
+
+def test_dataset_is_deterministic_and_consistent():
+    """Test rows repeat for a seed, providers are never double booked and history follows completions."""
+    dataset = SyntheticDataset(SPEC)
+    plan = list(dataset.appointment_plan())
+    assert plan == list(SyntheticDataset(SPEC).appointment_plan())
+    assert len(plan) == SPEC.appointments
+
+    by_provider = defaultdict(list)
+    for appointment in plan:
+        by_provider[appointment.provider].append(appointment)
+    for appointments in by_provider.values():
+        for previous, current in zip(appointments, appointments[1:]):
+            assert current.start >= previous.start + timedelta(minutes=previous.duration)
+            assert 9 <= current.start.hour < 18 and current.start.weekday() < 6
+
+    completed = [appointment for appointment in plan if appointment.status == AppointmentStatus.COMPLETED]
+    history = list(dataset.service_history())
+    assert [row[0] for row in history] == [appointment.history_id for appointment in completed]
+
+    for table, columns, rows in dataset.tables():
+        assert all(len(row) == len(columns) for row in rows), table
+
+@pytest.mark.parametrize("appointments", [600, 1_260])
+def test_appointments_stay_within_the_window(appointments):
+    """Test every appointment starts before now + future_days, even when providers are nearly full."""
+    spec = DatasetSpec(**{**vars(SPEC), "appointments": appointments})
+    end = spec.now + timedelta(days=spec.future_days)
+    assert all(appointment.start < end for appointment in SyntheticDataset(spec).appointment_plan())
+
+def test_specs_beyond_provider_capacity_are_rejected():
+    """Test a spec with more bookings than its providers can take within the window is rejected."""
+    with pytest.raises(ValueError, match="add providers or days"):
+        SyntheticDataset(DatasetSpec(**{**vars(SPEC), "appointments": 3_000}))
+
+@pytest.mark.asyncio
+async def test_copy_rows_streams_in_batches():
+    """Test rows are sent to COPY in batches of at most batch_size."""
+    batches = []
+
+    class Connection:
+        async def copy_records_to_table(self, table, records, columns):
+            batches.append(len(records))
+
+    rows = ((i,) for i in range(25))
+    assert await copy_rows(Connection(), "t", ("id",), rows, batch_size=10) == 25
+    assert batches == [10, 10, 5]
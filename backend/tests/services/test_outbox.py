@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, UTC
+from types import SimpleNamespace
+
+import orjson
+import pytest
+from sqlalchemy import select
+
+from src.main.config import settings
+from src.main.database import async_session
+from src.main.models import AppointmentStatus, OutboxMessage, ServiceType, generate_nanoid
+from src.main.outbox import (
+    DeliveryBackend, FileDeliveryBackend, LogDeliveryBackend, Reminder, ReminderWorker, TimerWheel,
+    schedule_reminder
+)
+
+pytestmark = [pytest.mark.unit]
+
+class RecordingSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+def test_timer_wheel_fires_due_items_once():
+    """Test items fire on the tick they are due, across revolutions, and cancelled items never fire."""
+    wheel = TimerWheel(tick=1.0, slots=4, now=100.0)
+    wheel.schedule("a", 101.5, "a")
+    wheel.schedule("b", 106.0, "b")  # beyond one revolution
+    wheel.schedule("c", 90.0, "c")   # already due
+    wheel.schedule("d", 102.0, "d")
+    wheel.cancel("d")
+
+    assert wheel.advance(100.2) == ["c"]
+    assert wheel.advance(101.9) == ["a"]
+    assert wheel.advance(105.0) == []
+    assert "b" in wheel and len(wheel) == 1
+    assert wheel.advance(120.0) == ["b"]
+    assert len(wheel) == 0
+
+@pytest.mark.asyncio
+async def test_reminders_are_scheduled_before_the_start_and_written_to_file(tmp_path):
+    """Test reminders are due the lead time before the start and the file backend writes JSON lines."""
+    now = datetime(2024, 6, 1, 8, tzinfo=UTC)
+    appointment = SimpleNamespace(
+        id="a1", title="Cut", startTime=now + timedelta(days=1), serviceType=ServiceType.HAIRCUT,
+        status=AppointmentStatus.SCHEDULED
+    )
+    session = RecordingSession()
+    message = await schedule_reminder(session, appointment, ["u1", "u2", "u1"], replace=False, now=now)
+    assert session.added == [message] and isinstance(message, OutboxMessage)
+    assert message.available_at == appointment.startTime - timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+
+    soon = SimpleNamespace(**{**vars(appointment), "startTime": now + timedelta(minutes=5)})
+    assert (await schedule_reminder(session, soon, ["u1"], replace=False, now=now)).available_at == now
+    cancelled = SimpleNamespace(**{**vars(appointment), "status": AppointmentStatus.CANCELLED})
+    assert await schedule_reminder(session, cancelled, ["u1"], replace=False, now=now) is None
+
+    reminder = Reminder.from_payload(message.payload)
+    assert reminder.recipient_ids == ["u1", "u2"]
+    backend = FileDeliveryBackend(tmp_path / "reminders.ndjson")
+    await backend.deliver(reminder)
+    await backend.deliver(reminder)
+    lines = (tmp_path / "reminders.ndjson").read_bytes().splitlines()
+    assert [orjson.loads(line)["appointment_id"] for line in lines] == ["a1", "a1"]
+    assert orjson.loads(lines[0])["start_time"] == "2024-06-02T08:00:00+00:00"
+
+class LockProbingBackend(DeliveryBackend):
+    """Fails the first reminder; checks no row lock is held while delivering."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def deliver(self, reminder: Reminder) -> None:
+        async with async_session() as session:
+            async with session.begin():
+                # NOWAIT raises if the worker still held the row lock
+                await session.execute(
+                    select(OutboxMessage.id)
+                    .where(OutboxMessage.aggregate_id == reminder.appointment_id)
+                    .with_for_update(nowait=True)
+                )
+        self.sent.append(reminder.appointment_id)
+        if len(self.sent) == 1:
+            raise ConnectionError("channel down")
+
+@pytest.mark.database
+@pytest.mark.asyncio
+async def test_worker_delivers_without_holding_locks_and_records_outcomes(database):
+    """Test reminders are sent outside any transaction and successes and failures are recorded."""
+    with pytest.raises(TypeError):
+        DeliveryBackend()
+
+    now = datetime.now(UTC)
+    appointments = [
+        SimpleNamespace(
+            id=generate_nanoid(), title="Cut", startTime=now + timedelta(minutes=1),
+            serviceType=ServiceType.HAIRCUT, status=AppointmentStatus.SCHEDULED
+        )
+        for _ in range(2)
+    ]
+    async with async_session() as session:
+        async with session.begin():
+            messages = [await schedule_reminder(session, appointment, ["u1"], replace=False) for appointment in appointments]
+    ids = [message.id for message in messages]
+
+    backend = LockProbingBackend()
+    worker = ReminderWorker(backend=backend)
+    await worker.claim()
+    assert await worker.deliver(ids) == 1
+    assert sorted(backend.sent) == sorted(appointment.id for appointment in appointments)
+
+    async with async_session() as session:
+        rows = {
+            row.aggregate_id: row
+            for row in await session.scalars(select(OutboxMessage).where(OutboxMessage.id.in_(ids)))
+        }
+    failed, sent = rows[backend.sent[0]], rows[backend.sent[1]]
+    assert sent.delivered_at is not None and sent.attempts == 0
+    assert failed.delivered_at is None and failed.attempts == 1 and failed.last_error == "channel down"
+    assert failed.claimed_until is None and failed.available_at > now
+
+    # Already delivered or unclaimed reminders are not sent again
+    assert await ReminderWorker(backend=LogDeliveryBackend()).deliver(ids) == 0
@@ -0,0 +1,29 @@
+import pytest
+
+from src.main.models import ServiceType, calculate_appointment_cost
+from src.main.service_catalog import ServiceCatalog
+
+pytestmark = [pytest.mark.unit]
+
+def test_lookups_accept_members_and_raw_values():
+    """Test enum members and their string values share catalog entries."""
+    catalog = ServiceCatalog(ServiceType)
+    assert catalog.duration_minutes(ServiceType.HAIRCOLOR) == 120
+    assert catalog.base_cost("Hair Color") == 100.0
+    assert catalog.loyalty_points("unknown") == 10
+
+def test_load_overrides_only_given_services():
+    """Test database rows replace defaults for the listed services only."""
+    catalog = ServiceCatalog(ServiceType)
+    catalog.load([("Manicure", (30, 20.0, 5)), ("Tattoo", (60, 90.0, 30))])
+    assert catalog.base_cost(ServiceType.MANICURE) == 20.0
+    assert catalog.base_cost(ServiceType.PEDICURE) == 35.0
+    assert "Tattoo" not in catalog
+
+def test_estimate_costs_matches_scalar_pricing():
+    """Test the vectorized estimate prices each appointment like the scalar path."""
+    catalog = ServiceCatalog(ServiceType)
+    services = [ServiceType.HAIRCUT, ServiceType.MASSAGE, ServiceType.HAIRCOLOR]
+    durations = [45, 60, 90]
+    expected = [calculate_appointment_cost(s, d) for s, d in zip(services, durations)]
+    assert catalog.estimate_costs(services, durations).tolist() == expected